@@ -1,28 +1,89 @@
 # agent.py
 
-from google.adk.agents import LlmAgent
+import os
+
+from google.adk.agents import BaseAgent, LlmAgent, ParallelAgent, SequentialAgent
 from google.adk.tools.agent_tool import AgentTool
 from .sub_agents.impact_agent.agent import root_agent as impact_agent
 from .sub_agents.research_agent.agent import root_agent as research_agent
 
-## Simplistic implementation of a supply chain agent. A more sophisticated implementation could use a SequentialAgent to enforce control flow
-root_agent = LlmAgent(
-    name="RapidResolveAgent",
-    description="A proactive agent that assesses impact and finds solutions for supply chain disruptions by orchestrating sub-agents.",
-    instruction="""
-        You are the RapidResolve Agent, a proactive supply chain co-pilot that orchestrates specialist sub-agents.
-        Your goal is to comprehensively respond to supply chain disruption alerts.
-
-        When you receive a disruption alert, you MUST use your specialist agent tools in this exact sequence:
-        1. First, call the `ImpactAgent` tool to understand the scope of the problem.
-        2. Second, call the `ResearchAgent` tool to find mitigation strategies from the corporate knowledge base.
-        3. Finally, synthesize all the information from the tools into a single, clear, actionable recommendation for the user.
-
-        Present the final output in a clean, readable format.
-    """,
-    model="gemini-2.5-flash",
-    tools=[
-        AgentTool(agent=impact_agent),
-        AgentTool(agent=research_agent),
-    ],
-)
\ No newline at end of file
+MODEL = "gemini-2.5-flash"
+# How RapidResolveAgent runs its sub-agents; "sequential" or "parallel".
+ORCHESTRATION_MODES = ("sequential", "parallel")
+
+
+def build_sequential_agent() -> BaseAgent:
+    """
+    Builds the orchestrating LLM agent, which calls ImpactAgent and then
+    ResearchAgent as tools before writing its recommendation.
+    """
+    return LlmAgent(
+        name="RapidResolveAgent",
+        description="A proactive agent that assesses impact and finds solutions for supply chain disruptions by orchestrating sub-agents.",
+        instruction="""
+            You are the RapidResolve Agent, a proactive supply chain co-pilot that orchestrates specialist sub-agents.
+            Your goal is to comprehensively respond to supply chain disruption alerts.
+
+            When you receive a disruption alert, you MUST use your specialist agent tools in this exact sequence:
+            1. First, call the `ImpactAgent` tool to understand the scope of the problem. If the alert reports several disruptions, pass all of them in a single call.
+            2. Second, call the `ResearchAgent` tool to find mitigation strategies from the corporate knowledge base.
+            3. Finally, synthesize all the information from the tools into a single, clear, actionable recommendation for the user.
+
+            Present the final output in a clean, readable format.
+        """,
+        model=MODEL,
+        tools=[
+            AgentTool(agent=impact_agent),
+            AgentTool(agent=research_agent),
+        ],
+    )
+
+
+def build_parallel_agent() -> BaseAgent:
+    """
+    Builds a workflow that runs ImpactAgent and ResearchAgent concurrently on
+    the alert, then has a synthesis agent write the recommendation from their
+    results. This saves the orchestrator's model calls between the two.
+    """
+    assess = ParallelAgent(
+        name="AssessAndResearch",
+        sub_agents=[
+            impact_agent.clone(update={"output_key": "impact_assessment"}),
+            research_agent.clone(update={"output_key": "research_findings"}),
+        ],
+    )
+    synthesize = LlmAgent(
+        name="SynthesisAgent",
+        model=MODEL,
+        description="Combines the impact assessment and research findings into a recommendation.",
+        instruction="""
+            You are the RapidResolve Agent, a proactive supply chain co-pilot.
+            Specialist agents have already analyzed the user's disruption alert.
+
+            Impact assessment:
+            {impact_assessment}
+
+            Mitigation research from the corporate knowledge base:
+            {research_findings}
+
+            Synthesize this information into a single, clear, actionable recommendation for the user.
+            Present the final output in a clean, readable format.
+        """,
+    )
+    return SequentialAgent(
+        name="RapidResolveAgent",
+        description="A proactive agent that assesses impact and finds solutions for supply chain disruptions by orchestrating sub-agents.",
+        sub_agents=[assess, synthesize],
+    )
+
+
+def build_root_agent(orchestration: str = "sequential") -> BaseAgent:
+    """Builds RapidResolveAgent for one of ORCHESTRATION_MODES."""
+    if orchestration == "parallel":
+        return build_parallel_agent()
+    if orchestration == "sequential":
+        return build_sequential_agent()
+    raise ValueError(f"Unknown orchestration mode '{orchestration}'; expected one of {', '.join(ORCHESTRATION_MODES)}.")
+
+
+root_agent = build_root_agent(os.environ.get("RAPID_RESOLVE_ORCHESTRATION", "sequential").lower())
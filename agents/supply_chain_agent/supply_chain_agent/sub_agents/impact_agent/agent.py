@@ -1,13 +1,17 @@
 
 from google.adk.agents import LlmAgent
-from ...tools.impact_calculator import calculate_impact
+from ...tools.impact_calculator import calculate_batch_impact, calculate_impact
 
 MODEL = "gemini-2.5-flash"
 
 root_agent = LlmAgent(
     name="ImpactAgent",
     model=MODEL,
-    description="A specialist agent that calculates the financial impact of a supply chain disruption.",
-    instruction="Your sole purpose is to use the calculate_impact tool with the information provided in the user's request.",
-    tools=[calculate_impact],
+    description="A specialist agent that calculates the financial impact of one or more supply chain disruptions.",
+    instruction=(
+        "Your sole purpose is to assess impact with the information provided in the user's request. "
+        "If the request describes a single disruption, use the calculate_impact tool. "
+        "If it describes more than one, call the calculate_batch_impact tool once with every disruption as a separate list item."
+    ),
+    tools=[calculate_impact, calculate_batch_impact],
 )
@@ -1,6 +1,7 @@
 
 from google.adk.agents import LlmAgent
 from ...tools.knowledge_retriever import research_solutions
+from ...tools.shipment_analytics import get_shipment_statistics
 
 MODEL = "gemini-2.5-flash"
 
@@ -13,6 +14,8 @@ root_agent = LlmAgent(
 To do this, you MUST follow these steps:
 1. Call the `research_solutions` tool with the user's original query. This tool will return a complete, pre-formatted prompt containing the relevant knowledge base data.
 2. Take the entire prompt string returned by the tool and execute it using your own language model to generate the final, grounded answer.
+
+If the query asks about transit times, delays or carrier reliability, also call the `get_shipment_statistics` tool, filtered by the ports or carrier the query mentions, and use its figures rather than estimating them from shipment rows.
 """,
-    tools=[research_solutions],
+    tools=[research_solutions, get_shipment_statistics],
 )
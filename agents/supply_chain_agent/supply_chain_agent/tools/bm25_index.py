@@ -0,0 +1,152 @@
+import json
+import math
+import os
+import threading
+from collections import Counter
+from typing import Dict, List, Optional, Tuple
+
+from .knowledge_base import Chunk, chunk_document, tokenize
+
+# Bumped whenever the persisted layout or the chunking changes, so stale
+# index files are rebuilt instead of misread.
+INDEX_FORMAT = 1
+
+
+class BM25Index:
+    """
+    An inverted BM25 index over the chunks of a directory of documents.
+
+    `sync()` compares each file's mtime and size with the ones recorded in the
+    index and re-chunks only files that were added or changed, dropping the
+    chunks of changed and deleted files. The chunks and their term counts are
+    saved to `index_path`, so a restart loads the index without tokenizing the
+    corpus again.
+    """
+
+    def __init__(self, documents_dir: str, index_path: Optional[str] = None, k1: float = 1.5, b: float = 0.75):
+        self.documents_dir = documents_dir
+        self.index_path = index_path
+        self.k1 = k1
+        self.b = b
+        self._lock = threading.Lock()
+        # source -> {"fingerprint": [mtime_ns, size], "chunks": [chunk_id, ...]}
+        self._files: Dict[str, dict] = {}
+        self._chunks: Dict[str, Chunk] = {}
+        self._term_counts: Dict[str, Dict[str, int]] = {}
+        self._lengths: Dict[str, int] = {}
+        # term -> {chunk_id: term frequency}
+        self._postings: Dict[str, Dict[str, int]] = {}
+        self._total_length = 0
+        self._load()
+
+    def __len__(self) -> int:
+        return len(self._chunks)
+
+    def _add_chunk(self, chunk: Chunk, term_counts: Dict[str, int]) -> None:
+        self._chunks[chunk.chunk_id] = chunk
+        self._term_counts[chunk.chunk_id] = term_counts
+        length = sum(term_counts.values())
+        self._lengths[chunk.chunk_id] = length
+        self._total_length += length
+        for term, count in term_counts.items():
+            self._postings.setdefault(term, {})[chunk.chunk_id] = count
+
+    def _remove_file(self, source: str) -> None:
+        for chunk_id in self._files.pop(source)["chunks"]:
+            del self._chunks[chunk_id]
+            self._total_length -= self._lengths.pop(chunk_id)
+            for term in self._term_counts.pop(chunk_id):
+                postings = self._postings[term]
+                del postings[chunk_id]
+                if not postings:
+                    del self._postings[term]
+
+    def _index_file(self, source: str, fingerprint: list) -> None:
+        with open(os.path.join(self.documents_dir, source), "r", encoding="utf-8") as f:
+            chunks = chunk_document(source, f.read())
+        for chunk in chunks:
+            self._add_chunk(chunk, dict(Counter(tokenize(chunk.text))))
+        self._files[source] = {"fingerprint": fingerprint, "chunks": [chunk.chunk_id for chunk in chunks]}
+
+    def _load(self) -> None:
+        if not self.index_path or not os.path.exists(self.index_path):
+            return
+        try:
+            with open(self.index_path, "r", encoding="utf-8") as f:
+                saved = json.load(f)
+        except (OSError, ValueError):
+            return
+        if saved.get("format") != INDEX_FORMAT:
+            return
+        for source, entry in saved["files"].items():
+            for chunk in entry["chunks"]:
+                self._add_chunk(Chunk(chunk["id"], source, chunk["part"], chunk["text"]), chunk["terms"])
+            self._files[source] = {"fingerprint": entry["fingerprint"], "chunks": [chunk["id"] for chunk in entry["chunks"]]}
+
+    def _save(self) -> None:
+        if not self.index_path:
+            return
+        saved = {
+            "format": INDEX_FORMAT,
+            "files": {
+                source: {
+                    "fingerprint": entry["fingerprint"],
+                    "chunks": [
+                        {
+                            "id": chunk_id,
+                            "part": self._chunks[chunk_id].part,
+                            "text": self._chunks[chunk_id].text,
+                            "terms": self._term_counts[chunk_id],
+                        }
+                        for chunk_id in entry["chunks"]
+                    ],
+                }
+                for source, entry in self._files.items()
+            },
+        }
+        os.makedirs(os.path.dirname(self.index_path), exist_ok=True)
+        with open(f"{self.index_path}.tmp", "w", encoding="utf-8") as f:
+            json.dump(saved, f)
+        os.replace(f"{self.index_path}.tmp", self.index_path)
+
+    def sync(self) -> bool:
+        """Brings the index up to date with the documents. Returns True if anything changed."""
+        current = {}
+        for name in os.listdir(self.documents_dir):
+            path = os.path.join(self.documents_dir, name)
+            if os.path.isfile(path) and not name.startswith("."):
+                stat = os.stat(path)
+                current[name] = [stat.st_mtime_ns, stat.st_size]
+
+        with self._lock:
+            changed = False
+            for source in list(self._files):
+                if current.get(source) != self._files[source]["fingerprint"]:
+                    self._remove_file(source)
+                    changed = True
+            for source, fingerprint in sorted(current.items()):
+                if source not in self._files:
+                    self._index_file(source, fingerprint)
+                    changed = True
+            if changed:
+                self._save()
+            return changed
+
+    def search(self, query: str, top_k: int = 4) -> List[Tuple[float, Chunk]]:
+        """Returns up to `top_k` chunks that share terms with the query, best first."""
+        with self._lock:
+            if not self._chunks:
+                return []
+            count = len(self._chunks)
+            average_length = self._total_length / count or 1.0
+            scores: Dict[str, float] = {}
+            for term in set(tokenize(query)):
+                postings = self._postings.get(term)
+                if not postings:
+                    continue
+                idf = math.log(1 + (count - len(postings) + 0.5) / (len(postings) + 0.5))
+                for chunk_id, frequency in postings.items():
+                    norm = self.k1 * (1 - self.b + self.b * self._lengths[chunk_id] / average_length)
+                    scores[chunk_id] = scores.get(chunk_id, 0.0) + idf * frequency * (self.k1 + 1) / (frequency + norm)
+            ranked = sorted(scores.items(), key=lambda item: (-item[1], item[0]))[:top_k]
+            return [(score, self._chunks[chunk_id]) for chunk_id, score in ranked]
@@ -0,0 +1,118 @@
+import functools
+import inspect
+import json
+import os
+import threading
+from collections import OrderedDict
+from typing import Callable, Optional, Sequence
+
+
+def _fingerprint(path: str) -> tuple:
+    """
+    Identifies the current version of a file by its modification time and
+    size. A directory is fingerprinted by the files directly inside it, so
+    adding, removing or editing a document invalidates it.
+    """
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return (path, None)
+    if not os.path.isdir(path):
+        return (path, stat.st_mtime_ns, stat.st_size)
+    entries = []
+    for name in sorted(os.listdir(path)):
+        child = os.path.join(path, name)
+        if os.path.isfile(child):
+            child_stat = os.stat(child)
+            entries.append((name, child_stat.st_mtime_ns, child_stat.st_size))
+    return (path, tuple(entries))
+
+
+def cached_tool(
+    depends_on: Sequence[str] = (), maxsize: int = 128, settings: Optional[Callable[[], object]] = None
+) -> Callable:
+    """
+    Memoizes a pure tool function.
+
+    Results are keyed on the tool's arguments, normalized against its
+    signature so positional, keyword and default arguments are equivalent,
+    together with a fingerprint of every file or directory in `depends_on`.
+    Editing a data file therefore invalidates the results computed from it.
+    Inputs that are not arguments, such as settings read from the
+    environment, are included by passing `settings`, a function called on
+    every call whose result is added to the key.
+    At most `maxsize` results are kept, least recently used first out.
+
+    The wrapped function keeps its name, docstring and signature, so ADK
+    builds the same tool declaration for it. `cache_status(args)` reports
+    whether the latest call with those arguments was a hit or a miss.
+    """
+    paths = [os.path.abspath(path) for path in depends_on]
+
+    def decorator(func: Callable) -> Callable:
+        signature = inspect.signature(func)
+        results: "OrderedDict[tuple, object]" = OrderedDict()
+        # Tools may be called from a thread pool, so the latest outcome is
+        # kept per argument key rather than in a context variable.
+        last_outcome: "OrderedDict[str, str]" = OrderedDict()
+        counts = {"hits": 0, "misses": 0}
+        lock = threading.Lock()
+
+        def _arguments_key(args: tuple, kwargs: dict) -> str:
+            bound = signature.bind(*args, **kwargs)
+            bound.apply_defaults()
+            return json.dumps(bound.arguments, sort_keys=True, default=repr)
+
+        def _remember_outcome(arguments_key: str, outcome: str) -> None:
+            last_outcome[arguments_key] = outcome
+            last_outcome.move_to_end(arguments_key)
+            while len(last_outcome) > maxsize:
+                last_outcome.popitem(last=False)
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            arguments_key = _arguments_key(args, kwargs)
+            key = (
+                arguments_key,
+                tuple(_fingerprint(path) for path in paths),
+                settings() if settings is not None else None,
+            )
+            with lock:
+                if key in results:
+                    results.move_to_end(key)
+                    counts["hits"] += 1
+                    _remember_outcome(arguments_key, "hit")
+                    return results[key]
+
+            result = func(*args, **kwargs)
+            with lock:
+                results[key] = result
+                while len(results) > maxsize:
+                    results.popitem(last=False)
+                counts["misses"] += 1
+                _remember_outcome(arguments_key, "miss")
+            return result
+
+        def cache_status(tool_args: dict) -> Optional[dict]:
+            """Returns the outcome of the latest call with these arguments, or None if there was none."""
+            try:
+                arguments_key = _arguments_key((), tool_args)
+            except TypeError:
+                return None
+            with lock:
+                outcome = last_outcome.get(arguments_key)
+                if outcome is None:
+                    return None
+                return {"status": outcome, "size": len(results), **counts}
+
+        def cache_clear() -> None:
+            with lock:
+                results.clear()
+                last_outcome.clear()
+                counts.update(hits=0, misses=0)
+
+        wrapper.cache_status = cache_status
+        wrapper.cache_clear = cache_clear
+        return wrapper
+
+    return decorator
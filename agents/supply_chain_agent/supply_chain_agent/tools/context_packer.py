@@ -0,0 +1,124 @@
+import csv
+import math
+import os
+import re
+from typing import List, NamedTuple, Sequence, Tuple
+
+from .knowledge_base import Chunk
+
+# Default token budget for knowledge base context, overridable per process.
+DEFAULT_TOKEN_BUDGET = 2000
+# Tables up to this size are inserted as they are; larger ones are summarized.
+TABLE_INLINE_TOKENS = 200
+# Chunks sharing at least this fraction of their word trigrams count as duplicates.
+DUPLICATE_SIMILARITY = 0.8
+
+
+class PackedChunk(NamedTuple):
+    chunk: Chunk
+    text: str
+    tokens: int
+    summarized: bool
+
+
+class PackedContext(NamedTuple):
+    chunks: List[PackedChunk]
+    budget: int
+    used_tokens: int
+    dropped: List[Tuple[str, str]]
+
+    def report(self) -> str:
+        """Describes the token usage and what was left out, for the tool's output."""
+        summary = f"{self.used_tokens} of {self.budget} context tokens used"
+        summarized = [packed.chunk.citation for packed in self.chunks if packed.summarized]
+        if summarized:
+            summary += f"; summarized: {', '.join(summarized)}"
+        if self.dropped:
+            summary += "; dropped: " + ", ".join(f"{citation} ({reason})" for citation, reason in self.dropped)
+        return summary
+
+
+def token_budget() -> int:
+    """Returns the context token budget from RESEARCH_TOKEN_BUDGET, or the default."""
+    try:
+        return max(int(os.environ.get("RESEARCH_TOKEN_BUDGET", DEFAULT_TOKEN_BUDGET)), 0)
+    except ValueError:
+        return DEFAULT_TOKEN_BUDGET
+
+
+def estimate_tokens(text: str) -> int:
+    """Estimates the token count of text at roughly four characters per token."""
+    return math.ceil(len(text) / 4)
+
+
+def _trigrams(text: str) -> set:
+    words = re.findall(r"\w+", text.lower())
+    if len(words) < 3:
+        return {tuple(words)}
+    return {tuple(words[i:i + 3]) for i in range(len(words) - 2)}
+
+
+def _is_table(chunk: Chunk) -> bool:
+    return chunk.source.lower().endswith(".csv")
+
+
+def summarize_table(text: str) -> str:
+    """Compresses CSV text into its row count, numeric ranges and the distinct values of other columns."""
+    rows = list(csv.reader(text.splitlines()))
+    if not rows:
+        return ""
+    header, rows = rows[0], [row for row in rows[1:] if row]
+    lines = [f"Table with {len(rows)} rows and columns {', '.join(header)}."]
+    for index, name in enumerate(header):
+        values = [row[index].strip() for row in rows if index < len(row) and row[index].strip()]
+        if not values:
+            continue
+        try:
+            numbers = [float(value) for value in values]
+        except ValueError:
+            distinct = list(dict.fromkeys(values))
+            shown = ", ".join(distinct[:8]) + (f" and {len(distinct) - 8} more" if len(distinct) > 8 else "")
+            lines.append(f"- {name}: {shown}")
+        else:
+            lines.append(
+                f"- {name}: min {min(numbers):g}, mean {sum(numbers) / len(numbers):.4g}, max {max(numbers):g}"
+            )
+    return "\n".join(lines)
+
+
+def pack_context(candidates: Sequence[Chunk], budget: int) -> PackedContext:
+    """
+    Fills a token budget with chunks in ranked order. Near-duplicates of a
+    chunk already packed are skipped, large tables are replaced by a summary,
+    and a chunk that does not fit is dropped so smaller ones after it can
+    still use the remaining budget.
+    """
+    packed: List[PackedChunk] = []
+    dropped: List[Tuple[str, str]] = []
+    packed_trigrams: List[Tuple[str, set]] = []
+    used = 0
+
+    for chunk in candidates:
+        trigrams = _trigrams(chunk.text)
+        duplicate_of = next(
+            (citation for citation, other in packed_trigrams
+             if len(trigrams & other) >= DUPLICATE_SIMILARITY * min(len(trigrams), len(other))),
+            None,
+        )
+        if duplicate_of:
+            dropped.append((chunk.citation, f"duplicate of {duplicate_of}"))
+            continue
+
+        text, summarized = chunk.text, False
+        if _is_table(chunk) and estimate_tokens(text) > TABLE_INLINE_TOKENS:
+            text, summarized = summarize_table(text), True
+        tokens = estimate_tokens(text)
+        if used + tokens > budget:
+            dropped.append((chunk.citation, "over budget"))
+            continue
+
+        packed.append(PackedChunk(chunk, text, tokens, summarized))
+        packed_trigrams.append((chunk.citation, trigrams))
+        used += tokens
+
+    return PackedContext(packed, budget, used, dropped)
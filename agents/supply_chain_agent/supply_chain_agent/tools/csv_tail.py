@@ -0,0 +1,90 @@
+import csv
+import io
+import os
+from typing import Dict, List, Optional, Sequence, Tuple
+
+# Bytes kept from the end of the consumed part of the file, used to tell an
+# append (the tail is unchanged) from a rewrite.
+_TAIL_BYTES = 256
+
+
+class IncrementalCsvFile:
+    """
+    Reads the rows of a CSV file that grows by appends.
+
+    `read_changes()` is a stat call when the file has not changed. When rows
+    were appended it parses only the new complete lines; any other change (a
+    rewrite, truncation or edit) reads the whole file again.
+    """
+
+    def __init__(self, path: str, required_columns: Sequence[str] = ()):
+        self.path = path
+        self.required_columns = tuple(required_columns)
+        self.reset()
+
+    def reset(self) -> None:
+        """Forgets what was read, so the next read starts from the header."""
+        self.columns: Dict[str, int] = {}
+        self._offset = 0
+        self._line_count = 0
+        self._tail = b""
+        self._mtime_ns = None
+
+    def _is_append(self, f, stat: os.stat_result) -> bool:
+        """Returns True if the file only grew since the last read."""
+        if not self._offset or stat.st_size <= self._offset:
+            return False
+        f.seek(self._offset - len(self._tail))
+        return f.read(len(self._tail)) == self._tail
+
+    def read_changes(self) -> Optional[Tuple[bool, List[Tuple[int, List[str]]]]]:
+        """
+        Returns None if the file is unchanged. Otherwise returns whether it was
+        read from the start, along with the new rows and their line numbers.
+        """
+        stat = os.stat(self.path)
+        if stat.st_mtime_ns == self._mtime_ns and stat.st_size == self._offset:
+            return None
+        try:
+            with open(self.path, "rb") as f:
+                appended = self._is_append(f, stat)
+                if not appended:
+                    self.reset()
+                    f.seek(0)
+                data = f.read()
+            rows = self._parse(data, to_end=not appended)
+        except Exception:
+            self.reset()
+            raise
+        self._mtime_ns = stat.st_mtime_ns
+        return not appended, rows
+
+    def _parse(self, data: bytes, to_end: bool) -> List[Tuple[int, List[str]]]:
+        """
+        Parses the bytes that follow the current offset. A read from the start
+        parses through the end of the file, last line included whether or not
+        it ends in a newline. An appended read leaves a trailing partial line
+        unread, so a row whose append is still in progress is parsed whole by
+        a later read.
+        """
+        end = len(data) if to_end else data.rfind(b"\n") + 1
+        if not end:
+            return []
+        consumed = data[:end]
+        text = consumed.decode("utf-8")
+        if self._tail and not self._tail.endswith(b"\n") and text.startswith(("\r\n", "\n")):
+            # The row before ended the file without a newline and was parsed then; this is its line ending.
+            text = text[2:] if text.startswith("\r\n") else text[1:]
+        reader = csv.reader(io.StringIO(text, newline=""))
+        if not self._offset:
+            header = next(reader, [])
+            self.columns = {name.strip(): index for index, name in enumerate(header)}
+            missing = set(self.required_columns) - set(self.columns)
+            if missing:
+                raise ValueError(f"{self.path} is missing the columns: {', '.join(sorted(missing))}")
+
+        rows = [(self._line_count + reader.line_num, row) for row in reader if row]
+        self._line_count += reader.line_num
+        self._offset += len(consumed)
+        self._tail = consumed[-_TAIL_BYTES:]
+        return rows
@@ -0,0 +1,115 @@
+import csv
+import os
+import threading
+from collections import deque
+from typing import Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+
+class DisruptionRule(NamedTuple):
+    pattern: str
+    entity_type: str
+    affected_skus: tuple
+
+
+class AhoCorasick:
+    """
+    Finds every occurrence of a set of patterns in a single pass over the
+    text, however many patterns there are.
+    """
+
+    def __init__(self, patterns: Sequence[str]):
+        # State 0 is the root. Each state has its transitions, the state to
+        # fall back to when no transition matches, and the patterns ending there.
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._output: List[List[int]] = [[]]
+
+        for index, pattern in enumerate(patterns):
+            state = 0
+            for char in pattern:
+                next_state = self._goto[state].get(char)
+                if next_state is None:
+                    next_state = len(self._goto)
+                    self._goto[state][char] = next_state
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._output.append([])
+                state = next_state
+            self._output[state].append(index)
+
+        # Breadth first, so a state's fallback is always resolved before its children.
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fallback = self._fail[state]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                self._fail[next_state] = self._goto[fallback].get(char, 0)
+                self._output[next_state] = self._output[next_state] + self._output[self._fail[next_state]]
+
+    def find(self, text: str) -> List[int]:
+        """Returns the indices of the patterns found in the text, in the order their first match ends."""
+        found = {}
+        state = 0
+        for char in text:
+            while state and char not in self._goto[state]:
+                state = self._fail[state]
+            state = self._goto[state].get(char, 0)
+            for index in self._output[state]:
+                found.setdefault(index, None)
+        return list(found)
+
+
+class DisruptionMatcher:
+    """
+    Maps disruption text to the rules it mentions, from a CSV of
+    Pattern,EntityType,AffectedSKUs rows (SKUs separated by ';'). Patterns
+    match case-insensitively anywhere in the text. The automaton is rebuilt
+    only when the rules file changes.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._fingerprint: Optional[tuple] = None
+        # The rules and their automaton, swapped together so a concurrent match never pairs one with the other's indexes.
+        self._state: Tuple[List[DisruptionRule], AhoCorasick] = ([], AhoCorasick([]))
+
+    def _load(self) -> None:
+        rules = []
+        with open(self.path, "r", encoding="utf-8", newline="") as f:
+            for row in csv.DictReader(f):
+                pattern = (row.get("Pattern") or "").strip().lower()
+                if not pattern:
+                    continue
+                skus = tuple(sku.strip() for sku in (row.get("AffectedSKUs") or "").split(";") if sku.strip())
+                rules.append(DisruptionRule(pattern, (row.get("EntityType") or "").strip(), skus))
+        self._state = (rules, AhoCorasick([rule.pattern for rule in rules]))
+
+    def refresh(self) -> None:
+        """Rebuilds the automaton if the rules file changed."""
+        stat = os.stat(self.path)
+        fingerprint = (stat.st_mtime_ns, stat.st_size)
+        with self._lock:
+            if fingerprint != self._fingerprint:
+                self._load()
+                self._fingerprint = fingerprint
+
+    def match(self, text: str) -> List[DisruptionRule]:
+        """Returns the rules whose pattern occurs in the text, in the order their first match ends."""
+        self.refresh()
+        rules, automaton = self._state
+        return [rules[index] for index in automaton.find(text.lower())]
+
+
+_matchers: Dict[str, DisruptionMatcher] = {}
+_matchers_lock = threading.Lock()
+
+
+def get_disruption_matcher(path: str) -> DisruptionMatcher:
+    """Returns the shared matcher for a rules file."""
+    path = os.path.abspath(path)
+    with _matchers_lock:
+        return _matchers.setdefault(path, DisruptionMatcher(path))
@@ -1,13 +1,26 @@
 
-import csv
 import os
+from typing import List
 
+from .caching import cached_tool
+from .disruption_matcher import get_disruption_matcher
+from .inventory import describe_stock_positions, get_inventory_table
+from .order_store import get_order_store
+
+# Determine the absolute path to the data files
+DATA_DIR = os.path.join(os.path.dirname(__file__), '..', 'data')
+ORDERS_FILE_PATH = os.path.join(DATA_DIR, 'orders.csv')
+RULES_FILE_PATH = os.path.join(DATA_DIR, 'disruption_rules.csv')
+INVENTORY_FILE_PATH = os.path.join(DATA_DIR, 'inventory.csv')
+
+@cached_tool(depends_on=[ORDERS_FILE_PATH, RULES_FILE_PATH, INVENTORY_FILE_PATH])
 def calculate_impact(disruption_event: str) -> str:
     """
     Calculates the impact of a supply chain disruption event.
 
-    For this demo, it checks for specific keywords in the disruption event
-    and calculates the total revenue at risk from affected orders.
+    It matches the disruption event against a table of known ports,
+    suppliers, lanes and regions and calculates the total revenue at risk
+    from orders for the SKUs they affect.
 
     Args:
         disruption_event: A string describing the disruption.
@@ -15,46 +28,95 @@ def calculate_impact(disruption_event: str) -> str:
     Returns:
         A string summarizing the impact.
     """
-    # For the demo, we'll hardcode the logic. A real implementation would be more dynamic.
-    if "shanghai" not in disruption_event.lower() and "supplier abc" not in disruption_event.lower():
-        return "No direct impact identified for the given event."
+    try:
+        # Every rule is matched in a single pass over the text.
+        matched_rules = get_disruption_matcher(RULES_FILE_PATH).match(disruption_event)
+    except FileNotFoundError:
+        return f"Error: The file at {RULES_FILE_PATH} was not found."
 
-    affected_skus = []
-    if "shanghai" in disruption_event.lower():
-        # Port of Shanghai closure affects products shipped from there.
-        affected_skus.append("8675") # ProductX
-    if "supplier abc" in disruption_event.lower():
-        # Supplier ABC delay affects products they supply.
-        if "8675" not in affected_skus:
-            affected_skus.append("8675")
+    if not matched_rules:
+        return "No direct impact identified for the given event."
 
+    affected_skus = list(dict.fromkeys(sku for rule in matched_rules for sku in rule.affected_skus))
     if not affected_skus:
         return "No affected SKUs found for the given event."
 
-    # Determine the absolute path to the data files
-    script_dir = os.path.dirname(__file__)
-    data_dir = os.path.join(script_dir, '..', 'data')
-    orders_file_path = os.path.join(data_dir, 'orders.csv')
+    try:
+        # Orders are loaded once and aggregated per SKU; this only re-reads what changed.
+        affected_orders, _, total_revenue_at_risk = get_order_store(ORDERS_FILE_PATH).totals(affected_skus)
+        stock_positions = get_inventory_table(INVENTORY_FILE_PATH, ORDERS_FILE_PATH).positions(affected_skus)
+    except FileNotFoundError as e:
+        return f"Error: The file at {e.filename} was not found."
+    except Exception as e:
+        return f"An error occurred: {e}"
+
+    return "\n".join([
+        "Impact Assessment Complete:",
+        f"- Disruption: '{disruption_event}'",
+        f"- Affected SKUs: {', '.join(affected_skus)}",
+        f"- Number of Affected Orders: {affected_orders}",
+        f"- Total Revenue at Risk: ${total_revenue_at_risk:,.2f}",
+        "- Stockout Projection:",
+        *describe_stock_positions(stock_positions),
+    ])
 
-    total_revenue_at_risk = 0
-    affected_orders = 0
+
+@cached_tool(depends_on=[ORDERS_FILE_PATH, RULES_FILE_PATH, INVENTORY_FILE_PATH])
+def calculate_batch_impact(disruption_events: List[str]) -> str:
+    """
+    Calculates the impact of several supply chain disruption events at once.
+
+    Use this instead of calling calculate_impact once per event when more than
+    one disruption is reported. Each event is matched against the table of
+    known ports, suppliers, lanes and regions, and the combined impact counts
+    every affected order only once, even if several events affect it.
+
+    Args:
+        disruption_events: A list of strings, each describing one disruption.
+
+    Returns:
+        A string summarizing the impact of each event and of all events combined.
+    """
+    if not disruption_events:
+        return "No disruption events were provided."
 
     try:
-        with open(orders_file_path, mode='r', encoding='utf-8') as csvfile:
-            reader = csv.DictReader(csvfile)
-            for row in reader:
-                if row['SKU'] in affected_skus:
-                    total_revenue_at_risk += float(row['Revenue'])
-                    affected_orders += 1
-    except FileNotFoundError:
-        return f"Error: The file at {orders_file_path} was not found."
+        matcher = get_disruption_matcher(RULES_FILE_PATH)
+        # Loaded here so a missing rules file is reported rather than raised from the loop below.
+        matcher.refresh()
+        store = get_order_store(ORDERS_FILE_PATH)
+        inventory = get_inventory_table(INVENTORY_FILE_PATH, ORDERS_FILE_PATH)
+        inventory.refresh()
+    except FileNotFoundError as e:
+        return f"Error: The file at {e.filename} was not found."
     except Exception as e:
         return f"An error occurred: {e}"
 
-    return (
-        f"Impact Assessment Complete:\n"
-        f"- Disruption: '{disruption_event}'\n"
-        f"- Affected SKUs: {', '.join(affected_skus)}\n"
-        f"- Number of Affected Orders: {affected_orders}\n"
-        f"- Total Revenue at Risk: ${total_revenue_at_risk:,.2f}"
-    )
+    lines = ["Batch Impact Assessment Complete:"]
+    all_affected_skus = {}
+    for index, disruption_event in enumerate(disruption_events, start=1):
+        affected_skus = list(dict.fromkeys(
+            sku for rule in matcher.match(disruption_event) for sku in rule.affected_skus
+        ))
+        if not affected_skus:
+            lines.append(f"{index}. '{disruption_event}': No direct impact identified.")
+            continue
+        all_affected_skus.update(dict.fromkeys(affected_skus))
+        affected_orders, _, revenue_at_risk = store.totals(affected_skus)
+        lines.append(
+            f"{index}. '{disruption_event}': SKUs {', '.join(affected_skus)}; "
+            f"{affected_orders} affected orders; ${revenue_at_risk:,.2f} revenue at risk"
+        )
+
+    # Each SKU is counted once, so orders hit by several events are not double counted.
+    affected_orders, _, revenue_at_risk = store.totals(all_affected_skus)
+    lines += [
+        "Combined (deduplicated):",
+        f"- Affected SKUs: {', '.join(all_affected_skus) or 'none'}",
+        f"- Number of Affected Orders: {affected_orders}",
+        f"- Total Revenue at Risk: ${revenue_at_risk:,.2f}",
+    ]
+    if all_affected_skus:
+        lines.append("- Stockout Projection:")
+        lines += describe_stock_positions(inventory.positions(all_affected_skus))
+    return "\n".join(lines)
@@ -0,0 +1,148 @@
+import csv
+import math
+import os
+import threading
+from typing import Dict, Iterable, List, NamedTuple, Optional
+
+import numpy as np
+
+from .order_store import get_order_store
+
+
+class StockPosition(NamedTuple):
+    sku: str
+    product_name: str
+    quantity_on_hand: int
+    days_of_supply: float
+    committed_quantity: int
+    daily_demand: float
+    unit_revenue: float
+    days_to_stockout: Optional[float]
+    revenue_at_risk_per_day: float
+
+
+class InventoryTable:
+    """
+    Inventory joined with open orders per SKU.
+
+    Daily demand is implied by the inventory itself (QuantityOnHand over
+    DaysOfSupply). Stock committed to open orders is set aside first, and the
+    rest lasts `days_to_stockout` days at that demand. Once stock runs out,
+    each day of delay loses a day of demand at the SKU's average order price,
+    which is the revenue at risk per day.
+
+    The inventory is held as columns and joined with the order store's per-SKU
+    totals in one vectorized pass. The whole table is joined again when
+    inventory.csv changed or the order store reloaded its file; when orders
+    were only appended, just the rows of the SKUs they name are.
+    """
+
+    def __init__(self, inventory_path: str, orders_path: str):
+        self.inventory_path = inventory_path
+        self.orders_path = orders_path
+        self._lock = threading.Lock()
+        self._inventory_version: Optional[tuple] = None
+        self._order_reloads: Optional[int] = None
+        self._order_count = 0
+        self._read_inventory_columns([])
+        self._positions: Dict[str, StockPosition] = {}
+
+    def _read_inventory(self) -> List[dict]:
+        with open(self.inventory_path, "r", encoding="utf-8", newline="") as f:
+            return list(csv.DictReader(f))
+
+    def _read_inventory_columns(self, rows: List[dict]) -> None:
+        """Holds the inventory column by column, so joins are computed over arrays."""
+        on_hand = np.array([int(row["QuantityOnHand"]) for row in rows], dtype=np.int64)
+        days_of_supply = np.array([float(row["DaysOfSupply"]) for row in rows], dtype=np.float64)
+        # Assigned only once every row parsed, so a bad file leaves the previous columns whole.
+        self._on_hand, self._days_of_supply = on_hand, days_of_supply
+        self._skus = [row["SKU"].strip() for row in rows]
+        self._product_names = [row.get("ProductName", "").strip() for row in rows]
+        self._row_by_sku = {sku: index for index, sku in enumerate(self._skus)}
+
+    def _join(self, rows: np.ndarray, orders) -> Dict[str, StockPosition]:
+        """Joins the given inventory rows with the order totals of their SKUs in one pass over the columns."""
+        skus = [self._skus[row] for row in rows]
+        committed, revenue = orders.totals_by_sku(skus)
+        on_hand, days_of_supply = self._on_hand[rows], self._days_of_supply[rows]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            daily_demand = np.where(days_of_supply > 0, on_hand / days_of_supply, 0.0)
+            unit_revenue = np.where(committed != 0, revenue / committed, 0.0)
+            available = on_hand - committed
+            # NaN marks SKUs with stock left but no demand, which never run out.
+            days_to_stockout = np.where(available <= 0, 0.0, np.where(daily_demand != 0, available / daily_demand, np.nan))
+        columns = zip(
+            skus, rows.tolist(), on_hand.tolist(), days_of_supply.tolist(), committed.tolist(),
+            daily_demand.tolist(), unit_revenue.tolist(), days_to_stockout.tolist(), (daily_demand * unit_revenue).tolist(),
+        )
+        return {
+            sku: StockPosition(
+                sku=sku,
+                product_name=self._product_names[row],
+                quantity_on_hand=quantity_on_hand,
+                days_of_supply=days,
+                committed_quantity=committed_quantity,
+                daily_demand=demand,
+                unit_revenue=price,
+                days_to_stockout=None if math.isnan(stockout) else stockout,
+                revenue_at_risk_per_day=at_risk,
+            )
+            for sku, row, quantity_on_hand, days, committed_quantity, demand, price, stockout, at_risk in columns
+        }
+
+    def refresh(self) -> None:
+        """Brings the joined table up to date with both files."""
+        orders = get_order_store(self.orders_path)
+        stat = os.stat(self.inventory_path)
+        inventory_version = (stat.st_mtime_ns, stat.st_size)
+        order_reloads, order_count = orders.reloads, len(orders)
+        with self._lock:
+            rebuild = (inventory_version, order_reloads) != (self._inventory_version, self._order_reloads)
+            if rebuild or order_count < self._order_count:
+                self._read_inventory_columns(self._read_inventory())
+                self._positions = self._join(np.arange(len(self._skus)), orders)
+            elif order_count > self._order_count:
+                touched = orders.skus_since(self._order_count)
+                rows = np.array(sorted(self._row_by_sku[sku] for sku in touched if sku in self._row_by_sku), dtype=np.int64)
+                # Replaced rather than updated in place, for readers holding the previous table.
+                self._positions = {**self._positions, **self._join(rows, orders)}
+            self._inventory_version, self._order_reloads, self._order_count = inventory_version, order_reloads, order_count
+
+    def positions(self, skus: Iterable[str]) -> Dict[str, Optional[StockPosition]]:
+        """Returns the stock position of each SKU, or None for SKUs without an inventory record."""
+        self.refresh()
+        positions = self._positions
+        return {sku: positions.get(sku) for sku in skus}
+
+
+_tables: Dict[tuple, InventoryTable] = {}
+_tables_lock = threading.Lock()
+
+
+def get_inventory_table(inventory_path: str, orders_path: str) -> InventoryTable:
+    """Returns the shared joined table for an inventory and an orders file."""
+    key = (os.path.abspath(inventory_path), os.path.abspath(orders_path))
+    with _tables_lock:
+        return _tables.setdefault(key, InventoryTable(*key))
+
+
+def describe_stock_positions(positions: Dict[str, Optional[StockPosition]]) -> List[str]:
+    """Formats stock positions as report lines, one per SKU."""
+    lines = []
+    for sku, position in positions.items():
+        if position is None:
+            lines.append(f"  - SKU {sku}: no inventory record")
+            continue
+        if position.days_to_stockout is None:
+            stockout = "no demand recorded"
+        elif position.days_to_stockout == 0:
+            stockout = "out of stock once open orders ship"
+        else:
+            stockout = f"stockout in {position.days_to_stockout:.1f} days"
+        lines.append(
+            f"  - SKU {sku} ({position.product_name}): {position.quantity_on_hand} on hand, "
+            f"{position.committed_quantity} committed to open orders, {stockout}; "
+            f"${position.revenue_at_risk_per_day:,.2f} revenue at risk per day of delay"
+        )
+    return lines
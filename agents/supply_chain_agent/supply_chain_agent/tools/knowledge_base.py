@@ -0,0 +1,65 @@
+import re
+from typing import List, NamedTuple
+
+# Words too common to say anything about relevance.
+STOPWORDS = frozenset(
+    "a an and are as at be by for from has have if in is it its of on or that the this "
+    "to was were will with we our you your what how which do does should can".split()
+)
+
+_TOKEN_PATTERN = re.compile(r"[a-z0-9]+(?:\.[0-9]+)?")
+
+# Chunk sizes: prose is split into overlapping windows of words, tables into
+# groups of rows that each repeat the header.
+MAX_CHUNK_WORDS = 120
+CHUNK_OVERLAP_WORDS = 20
+ROWS_PER_TABLE_CHUNK = 20
+
+
+class Chunk(NamedTuple):
+    chunk_id: str
+    source: str
+    part: int
+    text: str
+
+    @property
+    def citation(self) -> str:
+        return f"{self.source}, part {self.part}"
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercases text and splits it into index terms, dropping stopwords."""
+    return [token for token in _TOKEN_PATTERN.findall(text.lower()) if token not in STOPWORDS]
+
+
+def _split_words(paragraph: str) -> List[str]:
+    words = paragraph.split()
+    if len(words) <= MAX_CHUNK_WORDS:
+        return [paragraph]
+    step = MAX_CHUNK_WORDS - CHUNK_OVERLAP_WORDS
+    return [" ".join(words[start:start + MAX_CHUNK_WORDS]) for start in range(0, len(words) - CHUNK_OVERLAP_WORDS, step)]
+
+
+def _split_table(text: str) -> List[str]:
+    lines = [line for line in text.splitlines() if line.strip()]
+    if not lines:
+        return []
+    header, rows = lines[0], lines[1:]
+    return [
+        "\n".join([header] + rows[start:start + ROWS_PER_TABLE_CHUNK])
+        for start in range(0, max(len(rows), 1), ROWS_PER_TABLE_CHUNK)
+    ]
+
+
+def chunk_document(source: str, text: str) -> List[Chunk]:
+    """Splits a knowledge base document into chunks that can be retrieved on their own."""
+    if source.lower().endswith(".csv"):
+        pieces = _split_table(text)
+    else:
+        pieces = [
+            piece
+            for paragraph in re.split(r"\n\s*\n", text)
+            if paragraph.strip()
+            for piece in _split_words(paragraph.strip())
+        ]
+    return [Chunk(f"{source}#{part}", source, part, piece) for part, piece in enumerate(pieces, start=1)]
@@ -1,12 +1,47 @@
 
 import os
 
+from .bm25_index import BM25Index
+from .caching import cached_tool
+from .context_packer import pack_context, token_budget
+from .vector_index import VectorIndex, reciprocal_rank_fusion
+
+DATA_DIR = os.path.join(os.path.dirname(__file__), '..', 'data')
+KNOWLEDGE_BASE_DIR = os.path.join(DATA_DIR, 'knowledge_base')
+INDEX_PATH = os.path.join(DATA_DIR, '.index', 'bm25.json')
+VECTOR_INDEX_PATH = os.path.join(DATA_DIR, '.index', 'vectors')
+
+# Number of ranked chunks considered for the prompt; the token budget
+# (RESEARCH_TOKEN_BUDGET) decides how many of them are inserted.
+MAX_CANDIDATES = 8
+# Vector matches below this cosine similarity are treated as unrelated.
+MIN_VECTOR_SCORE = 0.1
+
+_index = None
+_vector_index = None
+
+def get_knowledge_index() -> BM25Index:
+    """Returns the knowledge base index, loading it from disk on first use."""
+    global _index
+    if _index is None:
+        _index = BM25Index(KNOWLEDGE_BASE_DIR, index_path=INDEX_PATH)
+    return _index
+
+def get_vector_index() -> VectorIndex:
+    """Returns the dense knowledge base index, mapping it from disk on first use."""
+    global _vector_index
+    if _vector_index is None:
+        _vector_index = VectorIndex(KNOWLEDGE_BASE_DIR, VECTOR_INDEX_PATH)
+    return _vector_index
+
+# The packed context depends on the token budget as well as the query.
+@cached_tool(depends_on=[KNOWLEDGE_BASE_DIR], settings=token_budget)
 def research_solutions(query: str) -> str:
     """
     Performs Retrieval-Augmented Generation (RAG) by preparing a prompt.
 
-    It reads documents from the knowledge base and combines them with the
-    user's query into a detailed prompt for an LLM to execute.
+    It retrieves the knowledge base passages most relevant to the user's
+    query and combines them into a detailed prompt for an LLM to execute.
 
     Args:
         query: The user's question about how to solve a problem.
@@ -14,33 +49,39 @@ def research_solutions(query: str) -> str:
     Returns:
         A string containing the fully constructed RAG prompt.
     """
-    # 1. Locate and read the knowledge base files
-    script_dir = os.path.dirname(__file__)
-    knowledge_base_dir = os.path.join(script_dir, '..', 'data', 'knowledge_base')
-
-    knowledge_content = []
-    sources = []
+    # 1. Find the most relevant chunks of the knowledge base
     try:
-        for filename in os.listdir(knowledge_base_dir):
-            file_path = os.path.join(knowledge_base_dir, filename)
-            if os.path.isfile(file_path):
-                with open(file_path, 'r', encoding='utf-8') as f:
-                    knowledge_content.append(f.read())
-                    sources.append(filename)
+        index = get_knowledge_index()
+        index.sync()
+        vector_index = get_vector_index()
+        vector_index.sync()
     except FileNotFoundError:
-        return f"Error: The knowledge base directory at {knowledge_base_dir} was not found."
+        return f"Error: The knowledge base directory at {KNOWLEDGE_BASE_DIR} was not found."
 
-    if not knowledge_content:
+    if not len(index):
         return "Error: No documents found in the knowledge base."
 
-    knowledge_base_text = "\n\n---\n\n".join(knowledge_content)
-    source_list = ", ".join(sources)
+    # Keyword matches and semantically similar chunks are merged by rank.
+    results = reciprocal_rank_fusion([
+        [chunk for _, chunk in index.search(query, top_k=MAX_CANDIDATES)],
+        [chunk for _, chunk in vector_index.search(query, top_k=MAX_CANDIDATES, min_score=MIN_VECTOR_SCORE)],
+    ])[:MAX_CANDIDATES]
+    if not results:
+        return "No documents in the knowledge base are relevant to the query."
 
-    # 2. Construct and return the prompt
+    # 2. Fit the best of them into the token budget
+    context = pack_context(results, token_budget())
+    knowledge_base_text = "\n\n---\n\n".join(
+        f"[{number}] {packed.chunk.citation}{' (summary)' if packed.summarized else ''}\n{packed.text}"
+        for number, packed in enumerate(context.chunks, start=1)
+    )
+    source_list = ", ".join(dict.fromkeys(packed.chunk.source for packed in context.chunks))
+
+    # 3. Construct and return the prompt
     prompt = f"""
     You are an expert supply chain analyst. Your task is to answer the user's question
     based *only* on the provided context from the corporate knowledge base.
-    Do not use any external knowledge. After your answer, cite the sources you used.
+    Do not use any external knowledge. After your answer, cite the sources you used by their [number].
 
     **Knowledge Base Context:**
     ---
@@ -54,5 +95,7 @@ def research_solutions(query: str) -> str:
     (Begin your answer here)
 
     *Sources: {source_list}*
+
+    *Context: {context.report()}*
     """
     return prompt
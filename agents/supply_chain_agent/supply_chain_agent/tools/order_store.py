@@ -0,0 +1,133 @@
+import os
+import sys
+import threading
+from array import array
+from typing import Dict, Iterable, List, Sequence, Set, Tuple
+
+import numpy as np
+
+from .csv_tail import IncrementalCsvFile
+
+
+class OrderStore:
+    """
+    Orders from a CSV file, held column by column.
+
+    Each row is reduced to an interned SKU id, a quantity and a revenue stored
+    in typed arrays, and revenue, quantity and order counts are aggregated
+    per SKU as rows are loaded. Queries are lookups into those aggregates.
+
+    `refresh()` is cheap when the file has not changed. When rows were
+    appended it parses only the new bytes; any other change reloads the file.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._file = IncrementalCsvFile(path, required_columns=("SKU", "Quantity", "Revenue"))
+        self._lock = threading.Lock()
+        # Incremented whenever loaded orders are discarded, so derived tables
+        # know that more changed than the orders appended since they last looked.
+        self.reloads = 0
+        self._reset()
+
+    def _reset(self) -> None:
+        self.reloads += 1
+        self._skus: List[str] = []
+        self._sku_ids: Dict[str, int] = {}
+        self.sku_column = array("I")
+        self.quantity_column = array("q")
+        self.revenue_column = array("d")
+        self._orders_by_sku = array("q")
+        self._quantity_by_sku = array("q")
+        self._revenue_by_sku = array("d")
+
+    def __len__(self) -> int:
+        return len(self.sku_column)
+
+    def _sku_id(self, sku: str) -> int:
+        sku_id = self._sku_ids.get(sku)
+        if sku_id is None:
+            sku_id = len(self._skus)
+            self._skus.append(sys.intern(sku))
+            self._sku_ids[self._skus[-1]] = sku_id
+            self._orders_by_sku.append(0)
+            self._quantity_by_sku.append(0)
+            self._revenue_by_sku.append(0.0)
+        return sku_id
+
+    def _append_rows(self, rows: List[Tuple[int, List[str]]]) -> None:
+        columns = self._file.columns
+        sku_index, quantity_index, revenue_index = columns["SKU"], columns["Quantity"], columns["Revenue"]
+        for line_number, row in rows:
+            try:
+                sku = row[sku_index].strip()
+                quantity = int(row[quantity_index])
+                revenue = float(row[revenue_index])
+            except (IndexError, ValueError) as e:
+                raise ValueError(f"Malformed order on line {line_number} of {self.path}: {e}") from e
+            sku_id = self._sku_id(sku)
+            self.sku_column.append(sku_id)
+            self.quantity_column.append(quantity)
+            self.revenue_column.append(revenue)
+            self._orders_by_sku[sku_id] += 1
+            self._quantity_by_sku[sku_id] += quantity
+            self._revenue_by_sku[sku_id] += revenue
+
+    def refresh(self) -> None:
+        """Brings the store up to date with the file."""
+        with self._lock:
+            try:
+                changes = self._file.read_changes()
+                if changes is None:
+                    return
+                reloaded, rows = changes
+                if reloaded:
+                    self._reset()
+                self._append_rows(rows)
+            except Exception:
+                # Never keep half of an update; the next refresh starts over.
+                self._file.reset()
+                self._reset()
+                raise
+
+    def skus(self) -> List[str]:
+        return list(self._skus)
+
+    def skus_since(self, row_count: int) -> Set[str]:
+        """Returns the SKUs of the orders loaded after the first `row_count`."""
+        return {self._skus[sku_id] for sku_id in set(self.sku_column[row_count:])}
+
+    def totals_by_sku(self, skus: Sequence[str]) -> Tuple[np.ndarray, np.ndarray]:
+        """Returns the units and revenue committed to orders for each of the given SKUs, as aligned columns."""
+        sku_ids = np.fromiter((self._sku_ids.get(sku, -1) for sku in skus), dtype=np.int64, count=len(skus))
+        known = sku_ids >= 0
+        quantity = np.zeros(len(skus), dtype=np.int64)
+        revenue = np.zeros(len(skus), dtype=np.float64)
+        # Copied out of the aggregates, which a buffer view would keep from growing.
+        quantity[known] = np.array(self._quantity_by_sku, dtype=np.int64)[sku_ids[known]]
+        revenue[known] = np.array(self._revenue_by_sku, dtype=np.float64)[sku_ids[known]]
+        return quantity, revenue
+
+    def totals(self, skus: Iterable[str]) -> Tuple[int, int, float]:
+        """Returns the number of orders, units and revenue for the given SKUs."""
+        orders, quantity, revenue = 0, 0, 0.0
+        for sku in set(skus):
+            sku_id = self._sku_ids.get(sku)
+            if sku_id is not None:
+                orders += self._orders_by_sku[sku_id]
+                quantity += self._quantity_by_sku[sku_id]
+                revenue += self._revenue_by_sku[sku_id]
+        return orders, quantity, revenue
+
+
+_stores: Dict[str, OrderStore] = {}
+_stores_lock = threading.Lock()
+
+
+def get_order_store(path: str) -> OrderStore:
+    """Returns the shared, up-to-date store for an orders file."""
+    path = os.path.abspath(path)
+    with _stores_lock:
+        store = _stores.setdefault(path, OrderStore(path))
+    store.refresh()
+    return store
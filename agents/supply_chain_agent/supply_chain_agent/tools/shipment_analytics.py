@@ -0,0 +1,188 @@
+import math
+import os
+import threading
+from collections import Counter
+from typing import Dict, Iterable, List, Tuple
+
+from .csv_tail import IncrementalCsvFile
+
+SHIPMENTS_FILE_PATH = os.path.join(os.path.dirname(__file__), '..', 'data', 'knowledge_base', 'Historical_Shipment_Data.csv')
+
+# A shipment is on time if it arrives within this many days of its baseline.
+ON_TIME_TOLERANCE_DAYS = 1.0
+# Columns holding the planned transit time, if the history records one.
+PLANNED_COLUMNS = ("PlannedTransitTimeDays", "PlannedTransitDays")
+
+
+def _percentile(delays: List[Tuple[float, int]], total: int, pct: float) -> float:
+    """Returns the nearest-rank percentile of sorted (delay, count) pairs."""
+    rank = max(math.ceil(pct / 100 * total), 1)
+    seen = 0
+    for delay, count in delays:
+        seen += count
+        if seen >= rank:
+            return delay
+    return delays[-1][0]
+
+
+def _summarize(cells: Iterable[Tuple[Counter, float]]) -> dict:
+    """Summarizes counts of (transit, planned) pairs, measuring delay against each cell's baseline."""
+    delays: Counter = Counter()
+    transit_total = 0.0
+    for counts, baseline in cells:
+        for (transit, planned), count in counts.items():
+            delays[transit - (planned if planned is not None else baseline)] += count
+            transit_total += transit * count
+    total = sum(delays.values())
+    ordered = sorted(delays.items())
+    on_time = sum(count for delay, count in ordered if delay <= ON_TIME_TOLERANCE_DAYS)
+    return {
+        "shipments": total,
+        "mean_transit_days": round(transit_total / total, 2),
+        "mean_delay_days": round(sum(delay * count for delay, count in ordered) / total, 2),
+        "p50_delay_days": _percentile(ordered, total, 50),
+        "p90_delay_days": _percentile(ordered, total, 90),
+        "max_delay_days": ordered[-1][0],
+        "on_time_pct": round(100 * on_time / total, 1),
+    }
+
+
+class ShipmentAnalytics:
+    """
+    Delay and on-time statistics per lane and per carrier, aggregated from
+    the shipment history as it is appended to.
+
+    Each (lane, carrier) pair keeps counts of its (transit, planned) days, so
+    memory grows with the number of distinct values rather than shipments.
+    Delay is measured against the planned transit time when the history has
+    a planned column, and otherwise against the fastest transit seen on the
+    lane. Summaries are cached until new rows arrive.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._file = IncrementalCsvFile(path, required_columns=("OriginPort", "DestinationPort", "Carrier", "TransitTimeDays"))
+        self._lock = threading.Lock()
+        self._reset()
+
+    def _reset(self) -> None:
+        self._cells: Dict[Tuple[Tuple[str, str], str], Counter] = {}
+        self._lane_baseline: Dict[Tuple[str, str], float] = {}
+        self._summaries: Dict[tuple, Dict[str, dict]] = {}
+
+    def _ingest(self, rows: List[Tuple[int, List[str]]]) -> None:
+        columns = self._file.columns
+        planned_index = next((columns[name] for name in PLANNED_COLUMNS if name in columns), None)
+        for line_number, row in rows:
+            try:
+                lane = (row[columns["OriginPort"]].strip(), row[columns["DestinationPort"]].strip())
+                carrier = row[columns["Carrier"]].strip()
+                transit = float(row[columns["TransitTimeDays"]])
+                planned = float(row[planned_index]) if planned_index is not None and row[planned_index].strip() else None
+            except (IndexError, ValueError) as e:
+                raise ValueError(f"Malformed shipment on line {line_number} of {self.path}: {e}") from e
+            self._cells.setdefault((lane, carrier), Counter())[(transit, planned)] += 1
+            self._lane_baseline[lane] = min(transit, self._lane_baseline.get(lane, transit))
+
+    def refresh(self) -> None:
+        """Ingests rows appended since the last refresh."""
+        with self._lock:
+            try:
+                changes = self._file.read_changes()
+                if changes is None:
+                    return
+                reloaded, rows = changes
+                if reloaded:
+                    self._reset()
+                self._ingest(rows)
+            except Exception:
+                self._file.reset()
+                self._reset()
+                raise
+            self._summaries.clear()
+
+    def _matching(self, origin: str, destination: str, carrier: str) -> List[Tuple[Tuple[str, str], str]]:
+        return [
+            (lane, name) for lane, name in self._cells
+            if (not origin or lane[0].lower() == origin.lower())
+            and (not destination or lane[1].lower() == destination.lower())
+            and (not carrier or name.lower() == carrier.lower())
+        ]
+
+    def _statistics(self, by: str, origin: str, destination: str, carrier: str) -> Dict[str, dict]:
+        self.refresh()
+        with self._lock:
+            key = (by, origin.lower(), destination.lower(), carrier.lower())
+            if key not in self._summaries:
+                groups: Dict[str, List[Tuple[Counter, float]]] = {}
+                for lane, name in sorted(self._matching(origin, destination, carrier)):
+                    group = f"{lane[0]} -> {lane[1]}" if by == "lane" else name
+                    groups.setdefault(group, []).append((self._cells[(lane, name)], self._lane_baseline[lane]))
+                self._summaries[key] = {group: _summarize(cells) for group, cells in sorted(groups.items())}
+            return self._summaries[key]
+
+    def lane_statistics(self, origin: str = "", destination: str = "", carrier: str = "") -> Dict[str, dict]:
+        """Returns statistics per lane for the shipments matching the (case-insensitive) filters."""
+        return self._statistics("lane", origin, destination, carrier)
+
+    def carrier_statistics(self, origin: str = "", destination: str = "", carrier: str = "") -> Dict[str, dict]:
+        """Returns statistics per carrier for the shipments matching the (case-insensitive) filters."""
+        return self._statistics("carrier", origin, destination, carrier)
+
+
+_analytics: Dict[str, ShipmentAnalytics] = {}
+_analytics_lock = threading.Lock()
+
+
+def get_shipment_analytics(path: str) -> ShipmentAnalytics:
+    """Returns the shared analytics for a shipment history file."""
+    path = os.path.abspath(path)
+    with _analytics_lock:
+        return _analytics.setdefault(path, ShipmentAnalytics(path))
+
+
+def _describe(name: str, stats: dict) -> str:
+    return (
+        f"- {name}: {stats['shipments']} shipments; mean transit {stats['mean_transit_days']} days; "
+        f"delay mean {stats['mean_delay_days']}, p50 {stats['p50_delay_days']:g}, "
+        f"p90 {stats['p90_delay_days']:g}, max {stats['max_delay_days']:g} days; {stats['on_time_pct']}% on time"
+    )
+
+
+def get_shipment_statistics(origin_port: str = "", destination_port: str = "", carrier: str = "") -> str:
+    """
+    Reports precomputed delay and on-time statistics from the historical shipment data.
+
+    Use this for questions about transit times, delays or carrier reliability
+    instead of working them out from raw shipment rows. Leave a filter empty
+    to include every value.
+
+    Args:
+        origin_port: Only include lanes leaving this port, e.g. "Shanghai".
+        destination_port: Only include lanes arriving at this port, e.g. "LongBeach".
+        carrier: Only include this carrier, e.g. "OceanCarrierA".
+
+    Returns:
+        A string with statistics per lane and per carrier.
+    """
+    try:
+        analytics = get_shipment_analytics(SHIPMENTS_FILE_PATH)
+        lanes = analytics.lane_statistics(origin_port, destination_port, carrier)
+        carriers = analytics.carrier_statistics(origin_port, destination_port, carrier)
+    except FileNotFoundError:
+        return f"Error: The file at {SHIPMENTS_FILE_PATH} was not found."
+    except Exception as e:
+        return f"An error occurred: {e}"
+
+    if not lanes and not carriers:
+        return "No shipments match the given filters."
+
+    lines = [
+        f"Shipment Statistics (delay is measured against the planned or fastest transit on each lane; "
+        f"on time means within {ON_TIME_TOLERANCE_DAYS:g} day of it):",
+        "Lanes:",
+        *(_describe(name, stats) for name, stats in lanes.items()),
+        "Carriers:",
+        *(_describe(name, stats) for name, stats in carriers.items()),
+    ]
+    return "\n".join(lines)
@@ -0,0 +1,248 @@
+import fcntl
+import json
+import math
+import os
+import threading
+import zlib
+from collections import Counter
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .knowledge_base import Chunk, chunk_document, tokenize
+
+# Bumped whenever the embedding or the file layout changes, so stale index
+# files are rebuilt instead of misread.
+INDEX_FORMAT = 1
+DIMENSIONS = 512
+# Character trigrams let related word forms (e.g. "closure" and "closed")
+# share features; they count for less than whole words.
+TRIGRAM_WEIGHT = 0.5
+
+
+def _bucket(feature: str) -> Tuple[int, float]:
+    """Hashes a feature to a dimension and a sign. crc32 is stable across processes, unlike hash()."""
+    digest = zlib.crc32(feature.encode("utf-8"))
+    return digest % DIMENSIONS, 1.0 if digest & 0x80000000 else -1.0
+
+
+def _features(text: str) -> Counter:
+    features = Counter()
+    for token in tokenize(text):
+        features[token] += 1.0
+        padded = f"#{token}#"
+        for start in range(len(padded) - 2):
+            features[f"3:{padded[start:start + 3]}"] += TRIGRAM_WEIGHT
+    return features
+
+
+def _signature(stat: os.stat_result) -> Tuple[int, int, int]:
+    """Identifies a saved metadata file. Each save is a new file, so its inode tells saves within one mtime tick apart."""
+    return stat.st_ino, stat.st_mtime_ns, stat.st_size
+
+
+def embed(text: str) -> np.ndarray:
+    """Embeds text as an L2-normalized vector of hashed, sublinearly scaled word and trigram counts."""
+    vector = np.zeros(DIMENSIONS, dtype=np.float32)
+    for feature, count in _features(text).items():
+        dimension, sign = _bucket(feature)
+        vector[dimension] += sign * (1.0 + math.log(count) if count >= 1 else count)
+    norm = np.linalg.norm(vector)
+    return vector / norm if norm else vector
+
+
+class VectorIndex:
+    """
+    A dense index of knowledge base chunks, stored as a contiguous float32
+    matrix in `<path>.f32` with its metadata in `<path>.json`.
+
+    The matrix is opened as a read-only memory map, so every agent process
+    searching the same index shares its pages. Documents are only ever
+    appended: `sync()` embeds the chunks of new or changed files and writes
+    them to the end of the matrix, while the rows of changed or deleted files
+    are marked dead and skipped. The matrix is rewritten only when more than
+    half of its rows are dead. Processes sharing the index take turns
+    updating it under an exclusive lock on `<path>.lock`.
+
+    Stored vectors carry no corpus statistics; IDF weights are kept per
+    dimension and applied to the query, so adding documents never requires
+    re-embedding the existing ones.
+    """
+
+    def __init__(self, documents_dir: str, path: str):
+        self.documents_dir = documents_dir
+        self.matrix_path = f"{path}.f32"
+        self.meta_path = f"{path}.json"
+        self.lock_path = f"{path}.lock"
+        self._lock = threading.Lock()
+        self._matrix: Optional[np.memmap] = None
+        self._load()
+
+    def _reset(self) -> None:
+        self._files: Dict[str, dict] = {}
+        self._rows: List[Optional[Chunk]] = []
+        self._document_frequency = np.zeros(DIMENSIONS, dtype=np.int64)
+        self._meta_signature = None
+
+    def __len__(self) -> int:
+        return sum(row is not None for row in self._rows)
+
+    def _load(self) -> None:
+        self._reset()
+        try:
+            with open(self.meta_path, "r", encoding="utf-8") as f:
+                meta = json.load(f)
+                # Taken from the file that was read, in case another process has replaced it since.
+                self._meta_signature = _signature(os.fstat(f.fileno()))
+        except (OSError, ValueError):
+            return
+        if meta.get("format") != INDEX_FORMAT or meta.get("dimensions") != DIMENSIONS:
+            return
+        self._files = meta["files"]
+        self._rows = [Chunk(*row) if row else None for row in meta["rows"]]
+        self._document_frequency = np.array(meta["document_frequency"], dtype=np.int64)
+        self._map_matrix()
+
+    def _map_matrix(self) -> None:
+        if self._rows and os.path.exists(self.matrix_path):
+            self._matrix = np.memmap(self.matrix_path, dtype=np.float32, mode="r", shape=(len(self._rows), DIMENSIONS))
+        else:
+            self._matrix = None
+
+    def _save_meta(self) -> None:
+        meta = {
+            "format": INDEX_FORMAT,
+            "dimensions": DIMENSIONS,
+            "files": self._files,
+            "rows": [list(row) if row else None for row in self._rows],
+            "document_frequency": self._document_frequency.tolist(),
+        }
+        with open(f"{self.meta_path}.tmp", "w", encoding="utf-8") as f:
+            json.dump(meta, f)
+        os.replace(f"{self.meta_path}.tmp", self.meta_path)
+        self._meta_signature = _signature(os.stat(self.meta_path))
+
+    def _kill_file(self, source: str) -> None:
+        for row in self._files.pop(source)["rows"]:
+            self._document_frequency -= self._matrix[row] != 0
+            self._rows[row] = None
+
+    def _compact(self) -> None:
+        """Rewrites the matrix without its dead rows."""
+        live = [row for row, chunk in enumerate(self._rows) if chunk is not None]
+        vectors = np.array(self._matrix[live]) if live else np.zeros((0, DIMENSIONS), dtype=np.float32)
+        renumbered = {old: new for new, old in enumerate(live)}
+        for entry in self._files.values():
+            entry["rows"] = [renumbered[row] for row in entry["rows"]]
+        self._rows = [self._rows[row] for row in live]
+        self._matrix = None
+        with open(f"{self.matrix_path}.tmp", "wb") as f:
+            f.write(vectors.tobytes())
+        os.replace(f"{self.matrix_path}.tmp", self.matrix_path)
+
+    @contextmanager
+    def _file_lock(self) -> Iterator[None]:
+        """Holds the lock that serializes updates to the index files across processes."""
+        os.makedirs(os.path.dirname(self.lock_path) or ".", exist_ok=True)
+        with open(self.lock_path, "a") as f:
+            fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+    def sync(self) -> bool:
+        """Appends the chunks of new or changed documents. Returns True if anything changed."""
+        current = {}
+        for name in os.listdir(self.documents_dir):
+            path = os.path.join(self.documents_dir, name)
+            if os.path.isfile(path) and not name.startswith("."):
+                stat = os.stat(path)
+                current[name] = [stat.st_mtime_ns, stat.st_size]
+
+        with self._lock, self._file_lock():
+            # Another agent process may have updated the shared index.
+            try:
+                if _signature(os.stat(self.meta_path)) != self._meta_signature:
+                    self._load()
+            except FileNotFoundError:
+                if self._rows:
+                    self._reset()
+                    self._matrix = None
+
+            changed = [source for source in self._files if current.get(source) != self._files[source]["fingerprint"]]
+            for source in changed:
+                self._kill_file(source)
+            added = sorted(source for source in current if source not in self._files)
+            if not changed and not added:
+                return False
+
+            new_rows = []
+            for source in added:
+                with open(os.path.join(self.documents_dir, source), "r", encoding="utf-8") as f:
+                    chunks = chunk_document(source, f.read())
+                self._files[source] = {
+                    "fingerprint": current[source],
+                    "rows": list(range(len(self._rows) + len(new_rows), len(self._rows) + len(new_rows) + len(chunks))),
+                }
+                new_rows += chunks
+
+            if new_rows:
+                vectors = np.stack([embed(chunk.text) for chunk in new_rows]).astype(np.float32)
+                self._document_frequency += (vectors != 0).sum(axis=0)
+                os.makedirs(os.path.dirname(self.matrix_path) or ".", exist_ok=True)
+                # Only the new rows are written; existing rows stay where they are.
+                with open(self.matrix_path, "ab") as f:
+                    f.seek(len(self._rows) * DIMENSIONS * 4)
+                    f.truncate()
+                    f.write(vectors.tobytes())
+                self._rows += new_rows
+            self._map_matrix()
+
+            if len(self._rows) > 2 * len(self):
+                self._compact()
+                self._map_matrix()
+            self._save_meta()
+            return True
+
+    def _query_matrix(self, queries: Sequence[str]) -> np.ndarray:
+        live = max(len(self), 1)
+        idf = np.log((live + 1) / (self._document_frequency + 1)).astype(np.float32) + 1.0
+        matrix = np.stack([embed(query) for query in queries]) * idf
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        return matrix / np.where(norms == 0, 1, norms)
+
+    def search_many(self, queries: Sequence[str], top_k: int = 4, min_score: float = 0.0) -> List[List[Tuple[float, Chunk]]]:
+        """Scores every query against every chunk in one matrix product and returns the top-k of each."""
+        with self._lock:
+            if self._matrix is None or not len(self):
+                return [[] for _ in queries]
+            scores = self._query_matrix(queries) @ self._matrix.T
+            dead = np.array([row is None for row in self._rows])
+            scores[:, dead] = -np.inf
+            results = []
+            for row_scores in scores:
+                k = min(top_k, len(row_scores))
+                best = np.argpartition(-row_scores, k - 1)[:k]
+                best = best[np.argsort(-row_scores[best])]
+                results.append([
+                    (float(row_scores[row]), self._rows[row])
+                    for row in best
+                    if row_scores[row] > min_score
+                ])
+            return results
+
+    def search(self, query: str, top_k: int = 4, min_score: float = 0.0) -> List[Tuple[float, Chunk]]:
+        return self.search_many([query], top_k=top_k, min_score=min_score)[0]
+
+
+def reciprocal_rank_fusion(rankings: Sequence[Sequence[Chunk]], k: int = 60) -> List[Chunk]:
+    """Merges several rankings of chunks, rewarding chunks ranked high by any of them."""
+    scores: Dict[str, float] = {}
+    chunks: Dict[str, Chunk] = {}
+    for ranking in rankings:
+        for rank, chunk in enumerate(ranking, start=1):
+            scores[chunk.chunk_id] = scores.get(chunk.chunk_id, 0.0) + 1.0 / (k + rank)
+            chunks[chunk.chunk_id] = chunk
+    return [chunks[chunk_id] for chunk_id in sorted(scores, key=lambda chunk_id: (-scores[chunk_id], chunk_id))]
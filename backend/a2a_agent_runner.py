@@ -1,5 +1,5 @@
 import os
-from typing import List
+from typing import List, Optional
 
 from backend.base_agent_runner import BaseAgentRunner
 from backend.config import AgentConfig
@@ -10,16 +10,14 @@ class A2AAgentRunner(BaseAgentRunner):
 
     def __init__(self, agent_path: str, agent_abs_path: str, port: int, config: AgentConfig):
         super().__init__(agent_path, agent_abs_path, port, config)
+        self._context_id: Optional[str] = None
 
-    def _get_dependency_install_command(self) -> List[str]:
-        """Returns the command to install dependencies based on the agent's config."""
-        venv_path = os.path.join(self.agent_abs_path, ".venv")
-        uv_executable = os.path.join(venv_path, "bin", "uv")
-
+    def _get_dependency_install_args(self) -> List[str]:
+        """Returns the install arguments based on the agent's config."""
         if self.config.dependencies == "pyproject.toml":
-            return [uv_executable, "pip", "install", "."]
+            return ["."]
         elif self.config.dependencies == "requirements.txt":
-            return [uv_executable, "pip", "install", "-r", os.path.join(self.agent_abs_path, "requirements.txt")]
+            return ["-r", os.path.join(self.agent_abs_path, "requirements.txt")]
         
         # Return an empty list if no known dependency file is specified
         return []
@@ -39,9 +37,18 @@ class A2AAgentRunner(BaseAgentRunner):
         """Returns the parent directory of the agent, for package resolution."""
         return os.path.dirname(self.agent_abs_path)
 
-    async def run_turn(self, prompt: str):
-        """A2A agents handle their own turns. This method is a placeholder."""
-        # This should not be called for A2A agents.
-        # The frontend should communicate directly with the agent's server.
-        print("WARNING: A2AAgentRunner.run_turn was called. This indicates a misconfiguration.")
-        return {"response": "Error: A2A agent turn management is not handled by the gallery host."}
\ No newline at end of file
+    async def run_turn(self, prompt: str, session_id: Optional[str] = None, discard_session: bool = False) -> dict:
+        """
+        Sends a prompt to the agent with A2A message/send through the backend's
+        pooled proxy. Without a session_id, turns continue the runner's own
+        conversation, whose context id the agent assigns on the first turn.
+        A2A has no call to end a context, so `discard_session` is ignored.
+        """
+        from backend.a2a_proxy import a2a_proxy, result_text
+
+        result = await a2a_proxy.send_message(
+            f"http://localhost:{self.port}", prompt, context_id=session_id or self._context_id,
+        )
+        if not session_id and result.get("contextId"):
+            self._context_id = result["contextId"]
+        return {"response": result_text(result)}
@@ -0,0 +1,172 @@
+import asyncio
+import hashlib
+import json
+import time
+import uuid
+from typing import Dict, List, Optional
+from urllib.parse import urljoin, urlsplit
+
+import httpx
+
+# Where A2A agents publish their card; older agents use the second path.
+AGENT_CARD_PATHS = ("/.well-known/agent-card.json", "/.well-known/agent.json")
+# Seconds a fetched card is served before it is revalidated with the agent.
+AGENT_CARD_MAX_AGE = 300.0
+# JSON-RPC methods whose responses are server-sent event streams.
+STREAMING_METHODS = {"message/stream", "tasks/resubscribe"}
+# JSON-RPC methods that run a turn of the agent.
+TURN_METHODS = {"message/send", "message/stream"}
+
+
+def result_text(result: dict) -> str:
+    """Returns the text of an A2A Message or Task result, preferring a task's artifacts over its status message."""
+    def texts(parts: Optional[List[dict]]) -> List[str]:
+        return [part["text"] for part in parts or [] if part.get("kind", "text") == "text" and part.get("text")]
+
+    if result.get("kind") == "message" or "parts" in result:
+        return "".join(texts(result.get("parts")))
+    artifact_text = ["".join(texts(artifact.get("parts"))) for artifact in result.get("artifacts") or []]
+    if any(artifact_text):
+        return "\n".join(text for text in artifact_text if text)
+    return "".join(texts(((result.get("status") or {}).get("message") or {}).get("parts")))
+
+
+class A2AProxy:
+    """
+    Forwards A2A JSON-RPC calls from the gallery to locally running A2A
+    agents over one pooled keep-alive client, and caches each agent's card.
+
+    A cached card is served as is for AGENT_CARD_MAX_AGE seconds and then
+    revalidated with a conditional request, so an unchanged card costs the
+    agent a 304 rather than a rebuild.
+    """
+
+    def __init__(
+        self,
+        max_connections: int = 100,
+        max_keepalive_connections: int = 20,
+        card_max_age: float = AGENT_CARD_MAX_AGE,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+    ):
+        self.limits = httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_keepalive_connections)
+        self.card_max_age = card_max_age
+        self.transport = transport
+        self._client: Optional[httpx.AsyncClient] = None
+        self._cards: Dict[str, dict] = {}
+        self._card_locks: Dict[str, asyncio.Lock] = {}
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        # Created on first use, inside the event loop that serves requests.
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(limits=self.limits, timeout=httpx.Timeout(300.0, connect=5.0), transport=self.transport)
+        return self._client
+
+    async def aclose(self) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    def forget(self, base_url: str) -> None:
+        """Drops the cached card of an agent, e.g. when it stops."""
+        self._cards.pop(base_url, None)
+        self._card_locks.pop(base_url, None)
+
+    async def get_agent_card(self, base_url: str) -> dict:
+        """
+        Returns the cached card entry of the agent at base_url, with the card
+        under "card" and a validator for it under "etag".
+        """
+        entry = self._cards.get(base_url)
+        if entry and time.monotonic() - entry["checked_at"] < self.card_max_age:
+            return entry
+        lock = self._card_locks.setdefault(base_url, asyncio.Lock())
+        async with lock:
+            # Another request may have refreshed the card while this one waited.
+            entry = self._cards.get(base_url)
+            if entry and time.monotonic() - entry["checked_at"] < self.card_max_age:
+                return entry
+            entry = await self._fetch_card(base_url, entry)
+            self._cards[base_url] = entry
+            return entry
+
+    async def _fetch_card(self, base_url: str, cached: Optional[dict]) -> dict:
+        if cached:
+            headers = {}
+            if cached["upstream_etag"]:
+                headers["If-None-Match"] = cached["upstream_etag"]
+            if cached["last_modified"]:
+                headers["If-Modified-Since"] = cached["last_modified"]
+            response = await self.client.get(urljoin(base_url, cached["path"]), headers=headers)
+            if response.status_code == 304:
+                return {**cached, "checked_at": time.monotonic()}
+            response.raise_for_status()
+            return self._card_entry(cached["path"], response)
+
+        response = None
+        for path in AGENT_CARD_PATHS:
+            response = await self.client.get(urljoin(base_url, path))
+            if response.status_code != 404:
+                break
+        response.raise_for_status()
+        return self._card_entry(path, response)
+
+    @staticmethod
+    def _card_entry(path: str, response: httpx.Response) -> dict:
+        card = response.json()
+        upstream_etag = response.headers.get("etag")
+        return {
+            "card": card,
+            "path": path,
+            "upstream_etag": upstream_etag,
+            "last_modified": response.headers.get("last-modified"),
+            "etag": upstream_etag or f'"{hashlib.sha256(json.dumps(card, sort_keys=True).encode()).hexdigest()[:32]}"',
+            "checked_at": time.monotonic(),
+        }
+
+    async def rpc_url(self, base_url: str) -> str:
+        """
+        Returns the JSON-RPC endpoint named in the agent's card. Only its path
+        is used; the host in the card may not resolve from the backend.
+        """
+        try:
+            card_url = (await self.get_agent_card(base_url))["card"].get("url")
+        except (httpx.HTTPError, ValueError):
+            card_url = None
+        return urljoin(base_url, urlsplit(card_url).path or "/") if card_url else urljoin(base_url, "/")
+
+    async def post_rpc(self, base_url: str, payload: dict) -> httpx.Response:
+        """Forwards a JSON-RPC request and returns the agent's complete response."""
+        return await self.client.post(await self.rpc_url(base_url), json=payload)
+
+    async def open_stream(self, base_url: str, payload: dict) -> httpx.Response:
+        """Forwards a streaming JSON-RPC request. The caller reads the response and must close it."""
+        request = self.client.build_request(
+            "POST", await self.rpc_url(base_url), json=payload, headers={"Accept": "text/event-stream"},
+        )
+        return await self.client.send(request, stream=True)
+
+    async def send_message(self, base_url: str, text: str, context_id: Optional[str] = None) -> dict:
+        """Sends a user message with message/send and returns the JSON-RPC result."""
+        message = {
+            "role": "user",
+            "kind": "message",
+            "messageId": uuid.uuid4().hex,
+            "parts": [{"kind": "text", "text": text}],
+        }
+        if context_id:
+            message["contextId"] = context_id
+        response = await self.post_rpc(base_url, {
+            "jsonrpc": "2.0",
+            "id": uuid.uuid4().hex,
+            "method": "message/send",
+            "params": {"message": message},
+        })
+        response.raise_for_status()
+        body = response.json()
+        if "error" in body:
+            raise RuntimeError(f"A2A error {body['error'].get('code')}: {body['error'].get('message')}")
+        return body.get("result") or {}
+
+
+a2a_proxy = A2AProxy()
@@ -1,23 +1,25 @@
+import time
+
+# Taken first, so the startup profile covers the host's own imports.
+HOST_STARTED_AT = time.perf_counter()
+
 import argparse
-import asyncio
-import importlib.util
+import importlib
+import json
 import os
 import sys
 import traceback
-import ast
 
 # Add the parent directory to the Python path to allow for relative imports
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
 from contextlib import asynccontextmanager
-from multiprocessing.managers import BaseManager
-from multiprocessing import Queue
 from fastapi import FastAPI, Request
-from google.adk.runners import Runner
-from google.adk.sessions import InMemorySessionService
-from google.genai.types import Content, Part
-import uvicorn
-from backend.event_streaming_plugin import EventStreamingPlugin
+
+# The ADK, genai types, uvicorn and the host's plugins are heavy to import, so
+# they are imported where they are first needed rather than here.
+
+HOST_IMPORTS_S = time.perf_counter() - HOST_STARTED_AT
 
 # --- Environment Variable Loading and Debugging ---
 
@@ -62,6 +64,16 @@ parser.add_argument("--agent-path", required=True, help="The path to the agent's
 parser.add_argument("--port", type=int, required=True, help="The port to run the server on.")
 parser.add_argument("--event-pipe-fd", type=int, help="The file descriptor for the event pipe.")
 parser.add_argument("--verbose", action="store_true", help="Enable verbose debugging output.")
+parser.add_argument("--fake-llm", action="store_true", help="Replace every agent's model with an offline fake model.")
+parser.add_argument("--fake-llm-script", default=os.environ.get("FAKE_LLM_SCRIPT"), help="A JSON file of scripted fake model responses.")
+parser.add_argument("--fake-llm-latency", type=float, default=float(os.environ.get("FAKE_LLM_LATENCY", "0")), help="Seconds the fake model waits before responding.")
+parser.add_argument("--fake-llm-tokens-per-second", type=float, default=float(os.environ.get("FAKE_LLM_TOKENS_PER_SECOND", "0")), help="Rate at which the fake model emits tokens (0 for instant).")
+parser.add_argument("--fake-llm-seed", type=int, default=os.environ.get("FAKE_LLM_SEED"), help="Seed for the fake model's randomized responses.")
+parser.add_argument("--llm-cache", action="store_true", help="Answer repeated model requests from a response cache.")
+parser.add_argument("--llm-cache-size", type=int, default=int(os.environ.get("LLM_CACHE_SIZE", "256")), help="Maximum number of responses kept in memory.")
+parser.add_argument("--llm-cache-ttl", type=float, default=float(os.environ.get("LLM_CACHE_TTL", "3600")), help="Seconds a cached response stays valid (0 to never expire).")
+parser.add_argument("--llm-cache-dir", default=os.environ.get("LLM_CACHE_DIR"), help="A directory that persists cached responses across restarts.")
+parser.add_argument("--json-logs", action="store_true", default=os.environ.get("AGENT_HOST_JSON_LOGS", "").lower() in ("1", "true", "yes"), help="Write log records to stderr as one JSON object per line.")
 # Use parse_known_args to avoid conflicts with uvicorn's args
 args, _ = parser.parse_known_args()
 
@@ -109,6 +121,14 @@ sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 async def lifespan(app: FastAPI):
     """Loads the agent and session on startup."""
     try:
+        phases = {"host_imports_s": HOST_IMPORTS_S}
+        phase_started = time.perf_counter()
+        from google.adk.runners import Runner
+        from google.adk.sessions import InMemorySessionService
+        from backend.event_streaming_plugin import EventStreamingPlugin
+        phases["adk_imports_s"] = time.perf_counter() - phase_started
+
+        phase_started = time.perf_counter()
         # Dynamically load the agent from the specified path
         app_name = os.path.basename(args.agent_path)
         module_name = app_name.replace('-', '_')
@@ -134,14 +154,43 @@ async def lifespan(app: FastAPI):
         finally:
             # Clean up sys.path
             sys.path.pop(0)
+        phases["agent_load_s"] = time.perf_counter() - phase_started
+
+        phase_started = time.perf_counter()
+        if args.fake_llm:
+            from backend.fake_llm import install_fake_llm, load_fake_llm_script
+            patched = install_fake_llm(
+                root_agent,
+                latency=args.fake_llm_latency,
+                tokens_per_second=args.fake_llm_tokens_per_second,
+                seed=args.fake_llm_seed,
+                script=load_fake_llm_script(args.fake_llm_script) if args.fake_llm_script else [],
+            )
+            print(f"INFO: Using the offline fake model for {patched} agent(s).", file=sys.stderr, flush=True)
 
         session_service = InMemorySessionService()
 
         plugins = []
+        event_plugin = None
         if args.event_pipe_fd is not None:
             # Create a file-like object from the file descriptor for writing
             pipe_writer = os.fdopen(args.event_pipe_fd, 'w')
-            plugins.append(EventStreamingPlugin(pipe_writer=pipe_writer))
+            event_plugin = EventStreamingPlugin(pipe_writer=pipe_writer)
+            plugins.append(event_plugin)
+
+        if args.llm_cache:
+            from backend.llm_response_cache import LlmResponseCache, LlmResponseCachePlugin
+            # Registered after the event plugin, so a hit is still reported as an LLM span.
+            app.state.llm_cache = LlmResponseCache(
+                max_entries=args.llm_cache_size,
+                ttl=args.llm_cache_ttl,
+                cache_dir=args.llm_cache_dir,
+            )
+            plugins.append(LlmResponseCachePlugin(
+                app.state.llm_cache,
+                on_hit=event_plugin.after_model_callback if event_plugin else None,
+            ))
+            print(f"INFO: Caching model responses (max {args.llm_cache_size}, ttl {args.llm_cache_ttl}s, dir {args.llm_cache_dir}).", file=sys.stderr, flush=True)
 
         app.state.agent_runner = Runner(
             agent=root_agent, 
@@ -154,6 +203,13 @@ async def lifespan(app: FastAPI):
             app_name=app_name,
             user_id="test_user"
         )
+        phases["runner_init_s"] = time.perf_counter() - phase_started
+        phases["total_s"] = time.perf_counter() - HOST_STARTED_AT
+
+        phases = {name: round(seconds, 4) for name, seconds in phases.items()}
+        print(f"INFO: Agent host startup phases: {json.dumps(phases)}", file=sys.stderr, flush=True)
+        if event_plugin is not None:
+            event_plugin._send_event("startup_profile", phases)
     except Exception as e:
         print(f"Error during agent loading: {e}", file=sys.stderr, flush=True)
         traceback.print_exc(file=sys.stderr)
@@ -168,6 +224,14 @@ app = FastAPI(lifespan=lifespan)
 async def health_check():
     return {"status": "ok"}
 
+@app.get("/llm_cache")
+async def llm_cache_stats(request: Request):
+    """Returns the size and per-agent hit/miss counts of the model response cache."""
+    llm_cache = getattr(request.app.state, 'llm_cache', None)
+    if llm_cache is None:
+        return {"enabled": False}
+    return {"enabled": True, **llm_cache.get_stats()}
+
 @app.post("/")
 async def run_turn(request: Request):
     """Runs a single turn of the agent."""
@@ -176,24 +240,37 @@ async def run_turn(request: Request):
     if not agent_session or not agent_runner:
         return {"error": "Agent not loaded due to a startup error. Check the agent host's logs for details."}, 500
     
+    from google.genai.types import Content, Part
+
     try:
         data = await request.json()
         prompt = data.get("prompt")
         if not prompt:
             return {"error": "Prompt not provided"}, 400
 
+        # Turns name their own session to run isolated from the shared one.
+        session_id = data.get("session_id") or agent_session.id
+        session_service = agent_runner.session_service
+        if not await session_service.get_session(app_name=agent_runner.app_name, user_id=agent_session.user_id, session_id=session_id):
+            await session_service.create_session(app_name=agent_runner.app_name, user_id=agent_session.user_id, session_id=session_id)
+
         response_generator = agent_runner.run_async(
             user_id=agent_session.user_id,
-            session_id=agent_session.id,
+            session_id=session_id,
             new_message=Content(parts=[Part(text=prompt)])
         )
         
         response_chunks = []
-        async for chunk in response_generator:
-            if hasattr(chunk, 'content') and chunk.content is not None and chunk.content.parts:
-                for part in chunk.content.parts:
-                    if hasattr(part, 'text') and part.text is not None:
-                        response_chunks.append(part.text)
+        try:
+            async for chunk in response_generator:
+                if hasattr(chunk, 'content') and chunk.content is not None and chunk.content.parts:
+                    for part in chunk.content.parts:
+                        if hasattr(part, 'text') and part.text is not None:
+                            response_chunks.append(part.text)
+        finally:
+            # Batch turns run in throwaway sessions, which would otherwise be kept for the life of the host.
+            if data.get("discard_session") and session_id != agent_session.id:
+                await session_service.delete_session(app_name=agent_runner.app_name, user_id=agent_session.user_id, session_id=session_id)
 
         response = "".join(response_chunks)
         return {"response": response}
@@ -210,8 +287,24 @@ def main():
     parser.add_argument("--port", type=int, required=True, help="The port to run the server on.")
     parser.add_argument("--event-pipe-fd", type=int, help="The file descriptor for the event pipe.")
     parser.add_argument("--verbose", action="store_true", help="Enable verbose debugging output.")
+    parser.add_argument("--fake-llm", action="store_true", help="Replace every agent's model with an offline fake model.")
+    parser.add_argument("--fake-llm-script", default=os.environ.get("FAKE_LLM_SCRIPT"), help="A JSON file of scripted fake model responses.")
+    parser.add_argument("--fake-llm-latency", type=float, default=float(os.environ.get("FAKE_LLM_LATENCY", "0")), help="Seconds the fake model waits before responding.")
+    parser.add_argument("--fake-llm-tokens-per-second", type=float, default=float(os.environ.get("FAKE_LLM_TOKENS_PER_SECOND", "0")), help="Rate at which the fake model emits tokens (0 for instant).")
+    parser.add_argument("--fake-llm-seed", type=int, default=os.environ.get("FAKE_LLM_SEED"), help="Seed for the fake model's randomized responses.")
+    parser.add_argument("--llm-cache", action="store_true", help="Answer repeated model requests from a response cache.")
+    parser.add_argument("--llm-cache-size", type=int, default=int(os.environ.get("LLM_CACHE_SIZE", "256")), help="Maximum number of responses kept in memory.")
+    parser.add_argument("--llm-cache-ttl", type=float, default=float(os.environ.get("LLM_CACHE_TTL", "3600")), help="Seconds a cached response stays valid (0 to never expire).")
+    parser.add_argument("--llm-cache-dir", default=os.environ.get("LLM_CACHE_DIR"), help="A directory that persists cached responses across restarts.")
+    parser.add_argument("--json-logs", action="store_true", default=os.environ.get("AGENT_HOST_JSON_LOGS", "").lower() in ("1", "true", "yes"), help="Write log records to stderr as one JSON object per line.")
     final_args = parser.parse_args()
-    uvicorn.run(app, host="0.0.0.0", port=final_args.port)
+
+    import uvicorn
+    if final_args.json_logs:
+        from backend.json_logs import json_log_config
+        uvicorn.run(app, host="0.0.0.0", port=final_args.port, log_config=json_log_config())
+    else:
+        uvicorn.run(app, host="0.0.0.0", port=final_args.port)
 
 if __name__ == "__main__":
     main()
@@ -1,11 +1,10 @@
 import asyncio
-import json
 import os
 from typing import Optional, List
 import httpx
 
 from backend.base_agent_runner import BaseAgentRunner
-from backend.connection_manager import manager
+from backend.log_buffer import broadcast_log
 from backend.config import AgentConfig
 
 
@@ -15,10 +14,8 @@ class AgentRunner(BaseAgentRunner):
     def __init__(self, agent_path: str, agent_abs_path: str, port: int, config: AgentConfig):
         super().__init__(agent_path, agent_abs_path, port, config)
 
-    def _get_dependency_install_command(self) -> List[str]:
-        """Returns the command to install dependencies from requirements.txt."""
-        venv_path = os.path.join(self.agent_abs_path, ".venv")
-        uv_executable = os.path.join(venv_path, "bin", "uv")
+    def _get_dependency_install_args(self) -> List[str]:
+        """Returns the install arguments for requirements.txt."""
         requirements_path = os.path.join(self.agent_abs_path, "requirements.txt")
         
         # ADK agents also need the host's dependencies
@@ -26,9 +23,9 @@ class AgentRunner(BaseAgentRunner):
 
         # We will install both in one go if the agent has its own requirements
         if os.path.exists(requirements_path):
-            return [uv_executable, "pip", "install", "-r", requirements_path, "-r", host_requirements_path]
+            return ["-r", requirements_path, "-r", host_requirements_path]
         else:
-            return [uv_executable, "pip", "install", "-r", host_requirements_path]
+            return ["-r", host_requirements_path]
 
 
     def _get_agent_execution_command(self, event_pipe_fd: int) -> List[str]:
@@ -37,23 +34,55 @@ class AgentRunner(BaseAgentRunner):
         python_executable = os.path.join(venv_path, "bin", "python")
         agent_host_script = os.path.abspath("backend/agent_host.py")
 
-        return [
-            python_executable, 
-            "-u",
+        command = [python_executable, "-u"]
+
+        # Record an import time breakdown for this launch in its startup profile.
+        if self.config.profile_startup or os.environ.get("GALLERY_PROFILE_STARTUP", "").lower() in ("1", "true", "yes"):
+            command.extend(["-X", "importtime"])
+
+        command += [
             agent_host_script, 
             "--agent-path", self.agent_abs_path, 
             "--port", str(self.port),
             "--event-pipe-fd", str(event_pipe_fd),
-            "--verbose"
+            "--verbose",
+            # Log records arrive as JSON, so their level is read rather than guessed.
+            "--json-logs",
         ]
 
-    async def run_turn(self, prompt: str) -> dict:
-        """Sends a prompt to the agent and returns the response."""
+        # Run against the offline fake model, either for this agent or for the
+        # whole gallery (e.g. during load tests).
+        if self.config.fake_llm or os.environ.get("GALLERY_FAKE_LLM", "").lower() in ("1", "true", "yes"):
+            command.append("--fake-llm")
+
+        # Answer repeated model requests from a response cache in the agent host.
+        if self.config.llm_cache or os.environ.get("GALLERY_LLM_CACHE", "").lower() in ("1", "true", "yes"):
+            command += [
+                "--llm-cache",
+                "--llm-cache-size", str(self.config.llm_cache_size),
+                "--llm-cache-ttl", str(self.config.llm_cache_ttl),
+            ]
+            if self.config.llm_cache_dir:
+                command += ["--llm-cache-dir", self.config.llm_cache_dir]
+
+        return command
+
+    async def run_turn(self, prompt: str, session_id: Optional[str] = None, discard_session: bool = False) -> dict:
+        """
+        Sends a prompt to the agent and returns the response, or an error. Without
+        a session_id, the turn runs in the agent's shared session; with
+        `discard_session`, the agent deletes the named session after the turn.
+        """
         url = f"http://localhost:{self.port}/"
+        payload = {"prompt": prompt}
+        if session_id:
+            payload["session_id"] = session_id
+            if discard_session:
+                payload["discard_session"] = True
         
         async with httpx.AsyncClient() as client:
             try:
-                response = await client.post(url, json={"prompt": prompt}, timeout=300.0)
+                response = await client.post(url, json=payload, timeout=300.0)
                 response.raise_for_status()
                 
                 agent_response = response.json().get("response", "")
@@ -61,5 +90,5 @@ class AgentRunner(BaseAgentRunner):
                 return {"response": agent_response}
 
             except httpx.RequestError as e:
-                await manager.broadcast(json.dumps({"type": "log", "agent": self.agent_name, "line": f"[ERROR] Could not connect to agent: {e}"}))
-                return {"response": "Error: Could not connect to the agent."}
\ No newline at end of file
+                await broadcast_log(self.agent_name, f"[ERROR] Could not connect to agent: {e}")
+                return {"error": "Could not connect to the agent."}
\ No newline at end of file
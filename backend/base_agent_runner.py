@@ -3,10 +3,16 @@ import json
 import os
 import re
 from abc import ABC, abstractmethod
-from typing import List, Optional
+from typing import Dict, List, Optional, Tuple
 
 from backend.connection_manager import manager
+from backend.dependency_cache import dependency_cache
+from backend.json_logs import EXCEPTION_FIELD, LEVEL_FIELD, MESSAGE_FIELD
+from backend.log_buffer import broadcast_log, classify_level, level_enabled, normalize_level
 from backend.config import AgentConfig
+from backend.event_log import event_log
+from backend.startup_profiler import StartupProfile, startup_profiles
+from backend.turn_timeline import timeline_store
 
 
 class EventStreamProtocol(asyncio.Protocol):
@@ -14,18 +20,31 @@ class EventStreamProtocol(asyncio.Protocol):
     def __init__(self, agent_id: str):
         self.agent_id = agent_id
         self.transport: Optional[asyncio.Transport] = None
+        # Large events (e.g. an on_llm_start carrying the whole prompt) span
+        # several reads, so keep any trailing partial line for the next read.
+        self._buffer = b""
 
     def connection_made(self, transport: asyncio.Transport):
         self.transport = transport
 
     def data_received(self, data: bytes):
-        lines = data.decode().splitlines()
-        for line in lines:
+        *lines, self._buffer = (self._buffer + data).split(b"\n")
+        logged_events = []
+        logged_turns = []
+        for raw_line in lines:
+            line = raw_line.decode()
             if line:
                 try:
                     # The data from the pipe is already a complete JSON message.
                     # We just need to add the agent_id and type before broadcasting.
                     event_payload = json.loads(line)
+                    if event_payload.get("event") == "startup_profile":
+                        profile = startup_profiles.latest(self.agent_id)
+                        if profile is not None:
+                            profile.host_phases = event_payload.get("data", {})
+                    timeline_store.record(self.agent_id, event_payload)
+                    logged_events.append(raw_line.strip())
+                    logged_turns.append(event_payload.get("turn_id"))
                     full_message = {
                         "type": "agent_event",
                         "agent": self.agent_id,
@@ -34,12 +53,58 @@ class EventStreamProtocol(asyncio.Protocol):
                     asyncio.create_task(manager.broadcast(json.dumps(full_message)))
                 except json.JSONDecodeError:
                     print(f"AGENT_EVENT_STREAM({self.agent_id}): Received non-JSON data: {line}", flush=True)
-
-
-async def _read_stream_and_signal_start(stream, agent_name: str, is_error_stream: bool, started_event: asyncio.Event):
+        if logged_events:
+            # One write per read from the pipe, of the event bytes as received.
+            event_log.for_agent(self.agent_id).append(logged_events, logged_turns)
+
+
+# Matchers for the per-line log path, compiled once. Lines are stripped
+# before they are matched, so the patterns are anchored at the first word.
+_STDERR_LEVEL = re.compile(r"(INFO|DEBUG|WARNING)", re.IGNORECASE)
+# uv reports progress on stderr, e.g. "Resolved 12 packages" and " + fastapi==0.115.0".
+_PIP_PROGRESS = re.compile(
+    r"(audited|resolving|resolved|downloading|downloaded|installing|installed|uninstalled|prepared|building|built|using|[+-] )",
+    re.IGNORECASE,
+)
+_SERVER_STARTED = "Uvicorn running on"
+
+
+def _classify_json_line(line_str: str) -> Optional[Tuple[str, str]]:
+    """Returns the level and display text of a JSON log line from the agent host, or None if it is not one."""
+    try:
+        record = json.loads(line_str)
+    except ValueError:
+        return None
+    if not isinstance(record, dict) or LEVEL_FIELD not in record:
+        return None
+    level = normalize_level(record[LEVEL_FIELD])
+    text = f"{record[LEVEL_FIELD]}: {record.get(MESSAGE_FIELD, '')}"
+    if record.get(EXCEPTION_FIELD):
+        text += f"\n{record[EXCEPTION_FIELD]}"
+    return level, f"[ERROR] {text}" if level == "error" else text
+
+
+def _classify_agent_line(line_str: str, is_error_stream: bool) -> Tuple[str, str]:
+    """Returns the level and display text of a line the agent wrote to stdout or stderr."""
+    if line_str.startswith("{"):
+        classified = _classify_json_line(line_str)
+        if classified is not None:
+            return classified
+    if not is_error_stream:
+        return classify_level(line_str), line_str
+    match = _STDERR_LEVEL.match(line_str)
+    if match:
+        return normalize_level(match.group(1)), line_str
+    if _SERVER_STARTED in line_str:
+        return "info", line_str
+    return "error", f"[ERROR] {line_str}"
+
+
+async def _read_stream_and_signal_start(stream, agent_name: str, is_error_stream: bool, started_event: asyncio.Event, profile: Optional[StartupProfile] = None, min_level: str = "debug"):
     """
     Reads from a stream, broadcasts lines as logs, and sets an event
-    once the agent's server has started.
+    once the agent's server has started. Lines below `min_level` are
+    dropped before they are recorded or broadcast.
     """
     while True:
         line = await stream.readline()
@@ -47,41 +112,40 @@ async def _read_stream_and_signal_start(stream, agent_name: str, is_error_stream
             break
         line_str = line.decode().strip()
 
+        # `-X importtime` output goes to the startup profile instead of the logs.
+        if is_error_stream and profile is not None and profile.add_importtime_line(line_str):
+            continue
+
         # Log subprocess output directly to the main process stdout for debugging tests
         stream_name = "stderr" if is_error_stream else "stdout"
         print(f"AGENT_HOST_SUBPROCESS({agent_name}, {stream_name}): {line_str}", flush=True)
 
-        log_line = line_str
-        if is_error_stream:
-            is_info = (
-                re.search(r"^\s*(INFO|DEBUG|WARNING)", line_str, re.IGNORECASE) or
-                "Uvicorn running on" in line_str
-            )
-            if not is_info:
-                log_line = f"[ERROR] {line_str}"
-
-        await manager.broadcast(json.dumps({"type": "log", "agent": agent_name, "line": log_line}))
-
-        if not started_event.is_set() and "Uvicorn running on" in line_str:
+        # Checked before filtering, so a threshold above "info" cannot hide the server start.
+        if not started_event.is_set() and _SERVER_STARTED in line_str:
+            if profile is not None:
+                profile.mark_ready()
             started_event.set()
 
-async def _read_pip_stream(stream, agent_name: str, is_error_stream: bool):
-    """Reads from a pip install stream and broadcasts lines as log messages."""
+        level, log_line = _classify_agent_line(line_str, is_error_stream)
+        if level_enabled(level, min_level):
+            await broadcast_log(agent_name, log_line, level)
+
+async def _read_pip_stream(stream, agent_name: str, is_error_stream: bool, min_level: str = "debug"):
+    """Reads from a pip install stream and broadcasts lines at or above `min_level` as log messages."""
     while True:
         line = await stream.readline()
         if not line:
             break
         line_str = line.decode().strip()
 
-        log_line = f"[PIP] {line_str}"
+        level, log_line = "info", f"[PIP] {line_str}"
         if is_error_stream:
             print(f"PIP_ERROR({agent_name}): {line_str}", flush=True)
-            if not re.search(r"^\s*(audited|resolving|downloading|installing)", line_str, re.IGNORECASE):
-                 log_line = f"[PIP_ERROR] {line_str}"
-            else:
-                 log_line = f"[PIP] {line_str}"
+            if not _PIP_PROGRESS.match(line_str):
+                level, log_line = "error", f"[PIP_ERROR] {line_str}"
 
-        await manager.broadcast(json.dumps({"type": "log", "agent": agent_name, "line": log_line}))
+        if level_enabled(level, min_level):
+            await broadcast_log(agent_name, log_line, level)
 
 
 class BaseAgentRunner(ABC):
@@ -97,8 +161,8 @@ class BaseAgentRunner(ABC):
         self.event_protocol: Optional[EventStreamProtocol] = None
 
     @abstractmethod
-    def _get_dependency_install_command(self) -> List[str]:
-        """Returns the command to install the agent's dependencies."""
+    def _get_dependency_install_args(self) -> List[str]:
+        """Returns the arguments to `uv pip install` for the agent's dependencies, or an empty list if it has none."""
         pass
 
     @abstractmethod
@@ -110,65 +174,75 @@ class BaseAgentRunner(ABC):
         """Returns the working directory for agent execution. Can be overridden."""
         return self.agent_abs_path
 
+    async def prefetch_dependencies(self) -> bool:
+        """Downloads the agent's dependencies into the shared wheelhouse, so its installs can run offline."""
+        install_args = self._get_dependency_install_args()
+        # Venvs are created with python3, so its wheels are the ones the installs will need.
+        venv_python = os.path.join(self.agent_abs_path, ".venv", "bin", "python")
+        python_executable = venv_python if os.path.exists(venv_python) else "python3"
+        return bool(install_args) and await dependency_cache.prefetch(install_args, self.agent_abs_path, python_executable)
+
+    async def _run_install(self, command: List[str], env: Dict[str, str]) -> int:
+        proc = await asyncio.create_subprocess_exec(
+            *command,
+            cwd=self.agent_abs_path,
+            env=env,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE
+        )
+        readers = [
+            asyncio.create_task(_read_pip_stream(proc.stdout, self.agent_name, False, self.config.log_level)),
+            asyncio.create_task(_read_pip_stream(proc.stderr, self.agent_name, True, self.config.log_level)),
+        ]
+        await proc.wait()
+        await asyncio.gather(*readers)
+        return proc.returncode
+
     async def start(self):
         """Creates a venv, installs dependencies, and starts the agent subprocess."""
         venv_path = os.path.join(self.agent_abs_path, ".venv")
         python_executable = os.path.join(venv_path, "bin", "python")
-        uv_executable = os.path.join(venv_path, "bin", "uv")
+        profile = startup_profiles.begin(self.agent_path)
 
-        # 1. Create virtual environment if it doesn't exist
+        # 1. Create virtual environment if it doesn't exist. Dependencies are
+        # installed with the shared uv, so the venv does not need pip.
         if not os.path.exists(venv_path):
             await manager.broadcast(json.dumps({"type": "status", "agent": self.agent_path, "status": "creating_venv"}))
+            profile.begin_phase("create_venv_s")
             proc = await asyncio.create_subprocess_exec(
-                "python3", "-m", "venv", venv_path,
+                "python3", "-m", "venv", "--without-pip", venv_path,
                 stdout=asyncio.subprocess.PIPE,
                 stderr=asyncio.subprocess.PIPE
             )
-            asyncio.create_task(_read_pip_stream(proc.stdout, self.agent_name, False))
-            asyncio.create_task(_read_pip_stream(proc.stderr, self.agent_name, True))
+            asyncio.create_task(_read_pip_stream(proc.stdout, self.agent_name, False, self.config.log_level))
+            asyncio.create_task(_read_pip_stream(proc.stderr, self.agent_name, True, self.config.log_level))
             await proc.wait()
             if proc.returncode != 0:
                 raise RuntimeError("Failed to create venv.")
-
-            # Install uv
-            proc = await asyncio.create_subprocess_exec(
-                python_executable, "-m", "pip", "install", "uv",
-                stdout=asyncio.subprocess.PIPE,
-                stderr=asyncio.subprocess.PIPE
-            )
-            stdout, stderr = await proc.communicate()
-
-            if not os.path.exists(uv_executable):
-                stdout_str = stdout.decode().strip()
-                stderr_str = stderr.decode().strip()
-                raise RuntimeError(
-                    f"Installation of 'uv' failed. The executable was not found at {uv_executable} after running pip. "
-                    f"pip exit code: {proc.returncode}. "
-                    f"stdout: {stdout_str}. "
-                    f"stderr: {stderr_str}."
-                )
+            profile.end_phase("create_venv_s")
 
         # 2. Install dependencies
         await manager.broadcast(json.dumps({"type": "status", "agent": self.agent_path, "status": "installing_dependencies"}))
         env = os.environ.copy()
+        env.update(self.config.environment)
         env["VIRTUAL_ENV"] = venv_path
         env["PORT"] = str(self.port)
 
-        install_command = self._get_dependency_install_command()
+        install_args = self._get_dependency_install_args()
 
-        if install_command:
-            proc = await asyncio.create_subprocess_exec(
-                *install_command,
-                cwd=self.agent_abs_path,
-                env=env,
-                stdout=asyncio.subprocess.PIPE,
-                stderr=asyncio.subprocess.PIPE
-            )
-            asyncio.create_task(_read_pip_stream(proc.stdout, self.agent_name, False))
-            asyncio.create_task(_read_pip_stream(proc.stderr, self.agent_name, True))
-            await proc.wait()
-            if proc.returncode != 0:
-                raise RuntimeError(f"Failed to install dependencies.")
+        if install_args:
+            profile.begin_phase("ensure_uv_s")
+            uv_executable = await dependency_cache.ensure_uv()
+            profile.end_phase("ensure_uv_s")
+
+            profile.begin_phase("install_dependencies_s")
+            offline_command, online_command = dependency_cache.install_commands(uv_executable, python_executable, install_args)
+            if await self._run_install(offline_command, env) != 0:
+                # Something the wheelhouse and uv cache do not hold yet; fetch it.
+                await broadcast_log(self.agent_name, "[PIP] Offline install incomplete, installing from the package index.")
+                if await self._run_install(online_command, env) != 0:
+                    raise RuntimeError(f"Failed to install dependencies.")
+            profile.end_phase("install_dependencies_s")
 
         # 3. Create the pipe for event streaming
         read_fd, write_fd = os.pipe()
@@ -176,6 +250,7 @@ class BaseAgentRunner(ABC):
         # 4. Start the agent
         execution_command = self._get_agent_execution_command(write_fd)
         execution_cwd = self._get_agent_execution_cwd()
+        profile.mark_spawned()
         self.process = await asyncio.create_subprocess_exec(
             *execution_command,
             cwd=execution_cwd,
@@ -197,8 +272,8 @@ class BaseAgentRunner(ABC):
         )
 
         started_event = asyncio.Event()
-        asyncio.create_task(_read_stream_and_signal_start(self.process.stdout, self.agent_name, False, started_event))
-        asyncio.create_task(_read_stream_and_signal_start(self.process.stderr, self.agent_name, True, started_event))
+        asyncio.create_task(_read_stream_and_signal_start(self.process.stdout, self.agent_name, False, started_event, profile, self.config.log_level))
+        asyncio.create_task(_read_stream_and_signal_start(self.process.stderr, self.agent_name, True, started_event, profile, self.config.log_level))
         
         await started_event.wait()
 
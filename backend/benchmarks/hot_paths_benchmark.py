@@ -0,0 +1,268 @@
+"""
+Microbenchmarks for the per-line event and log hot paths of the backend.
+
+Drives EventStreamProtocol.data_received, _read_stream_and_signal_start,
+_read_pip_stream, ConnectionManager.broadcast and
+EventStreamingPlugin._send_event with synthetic high-rate input and reports
+lines per second, allocations and event-loop lag for each scenario as JSON.
+
+Usage (from the project root):
+
+    python -m backend.benchmarks.hot_paths_benchmark --output hot_paths.json
+    python -m backend.benchmarks.hot_paths_benchmark --baseline hot_paths.json --tolerance 0.2
+
+With --baseline, the run exits non-zero if any scenario's throughput dropped
+by more than the tolerance.
+"""
+import argparse
+import asyncio
+import contextlib
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from typing import Awaitable, Callable, Dict, List
+
+from backend.base_agent_runner import EventStreamProtocol, _read_pip_stream, _read_stream_and_signal_start
+from backend.connection_manager import manager
+from backend.event_log import event_log
+from backend.event_streaming_plugin import EventStreamingPlugin
+from backend.benchmarks.load_benchmark import summarize
+
+PIPE_READ_SIZE = 65536
+
+
+class NullWebSocket:
+    """Stands in for a connected client; counts what would have been sent."""
+
+    def __init__(self):
+        self.messages = 0
+        self.bytes = 0
+
+    async def send_text(self, message: str):
+        self.messages += 1
+        self.bytes += len(message)
+
+
+class LoopLagProbe:
+    """Measures how late a 1 ms timer fires while the benchmark runs."""
+
+    def __init__(self, interval: float = 0.001):
+        self.interval = interval
+        self.lag_ms: List[float] = []
+        self._expected = 0.0
+        self._task = None
+
+    async def _run(self):
+        while True:
+            self._expected = time.perf_counter() + self.interval
+            await asyncio.sleep(self.interval)
+            self.lag_ms.append(max(time.perf_counter() - self._expected, 0) * 1000)
+
+    def start(self):
+        self._expected = time.perf_counter() + self.interval
+        # Named so the scenario drain below does not wait on the probe itself.
+        self._task = asyncio.create_task(self._run(), name="lag-probe")
+
+    async def stop(self):
+        # Code that never yields starves the probe entirely, so the pending
+        # tick counts too; otherwise a fully blocking run would report no lag.
+        self.lag_ms.append(max(time.perf_counter() - self._expected, 0) * 1000)
+        self._task.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await self._task
+
+
+def _event_line(event: str, data: dict) -> bytes:
+    return (json.dumps({
+        "event": event, "data": data, "ts": time.monotonic(),
+        "turn_id": "e-benchmark", "span_id": "0123456789abcdef", "parent_span_id": None,
+    }) + "\n").encode()
+
+
+def token_chunk_events(count: int) -> bytes:
+    return b"".join(_event_line("on_llm_chunk", {"chunk": {"text": f"tok{i} "}}) for i in range(count))
+
+
+def huge_prompt_events(count: int, prompt_bytes: int) -> bytes:
+    prompt = [{"role": "user", "parts": [{"text": "x" * prompt_bytes}]}]
+    return b"".join(_event_line("on_llm_start", {"agent": "Bench", "model": "fake", "prompt": prompt}) for _ in range(count))
+
+
+def agent_log_lines(count: int) -> bytes:
+    levels = ["INFO:     127.0.0.1 - \"POST / HTTP/1.1\" 200 OK", "DEBUG: Manually set env var: KEY",
+              "WARNING: something odd", "Traceback (most recent call last):"]
+    return b"".join(f"{levels[i % len(levels)]} line {i}\n".encode() for i in range(count))
+
+
+def pip_log_lines(count: int) -> bytes:
+    lines = ["Resolving dependencies...", "Downloading google_adk-1.0.0-py3-none-any.whl",
+             "Installing collected packages", "Audited 120 packages in 8ms", "warning: some deprecation"]
+    return b"".join(f"{lines[i % len(lines)]} {i}\n".encode() for i in range(count))
+
+
+async def _drain_tasks():
+    """Waits for the broadcast tasks spawned by the code under test."""
+    current = asyncio.current_task()
+    while pending := [t for t in asyncio.all_tasks() if t is not current and not t.done() and t.get_name() != "lag-probe"]:
+        await asyncio.gather(*pending)
+
+
+async def bench_event_protocol(payload: bytes) -> Callable[[], Awaitable[None]]:
+    async def run():
+        protocol = EventStreamProtocol("agents/benchmark")
+        for offset in range(0, len(payload), PIPE_READ_SIZE):
+            protocol.data_received(payload[offset:offset + PIPE_READ_SIZE])
+        await _drain_tasks()
+    return run
+
+
+def _stream_reader(payload: bytes) -> asyncio.StreamReader:
+    reader = asyncio.StreamReader(limit=2 ** 20)
+    reader.feed_data(payload)
+    reader.feed_eof()
+    return reader
+
+
+async def bench_agent_log_stream(payload: bytes, is_error_stream: bool):
+    async def run():
+        await _read_stream_and_signal_start(_stream_reader(payload), "benchmark", is_error_stream, asyncio.Event())
+    return run
+
+
+async def bench_pip_stream(payload: bytes, is_error_stream: bool):
+    async def run():
+        await _read_pip_stream(_stream_reader(payload), "benchmark", is_error_stream)
+    return run
+
+
+async def bench_broadcast(count: int):
+    message = json.dumps({"type": "log", "agent": "benchmark", "line": "INFO: a typical log line"})
+
+    async def run():
+        for _ in range(count):
+            await manager.broadcast(message)
+    return run
+
+
+async def bench_send_event(count: int, prompt_bytes: int):
+    prompt = [{"role": "user", "parts": [{"text": "x" * prompt_bytes}]}]
+
+    async def run():
+        with open(os.devnull, "w") as devnull:
+            plugin = EventStreamingPlugin(pipe_writer=devnull)
+            for _ in range(count):
+                plugin._send_event("on_llm_start", {"agent": "Bench", "model": "fake", "prompt": prompt})
+    return run
+
+
+async def measure(name: str, lines: int, factory: Awaitable, repeat: int) -> dict:
+    """Times a scenario, then re-runs it under tracemalloc to count allocations."""
+    run = await factory
+    durations = []
+    probe = LoopLagProbe()
+    probe.start()
+    for _ in range(repeat):
+        started = time.perf_counter()
+        await run()
+        durations.append(time.perf_counter() - started)
+    await probe.stop()
+
+    tracemalloc.start()
+    await run()
+    _, peak = tracemalloc.get_traced_memory()
+    blocks = sum(stat.count for stat in tracemalloc.take_snapshot().statistics("filename"))
+    tracemalloc.stop()
+
+    best = min(durations)
+    return {
+        "scenario": name,
+        "lines": lines,
+        "best_s": round(best, 6),
+        "lines_per_s": round(lines / best, 1),
+        "peak_alloc_kb": round(peak / 1024, 1),
+        "retained_blocks": blocks,
+        "loop_lag": summarize(probe.lag_ms),
+    }
+
+
+async def run_benchmarks(options: argparse.Namespace) -> List[dict]:
+    n = options.lines
+    clients = [NullWebSocket() for _ in range(options.clients)]
+    manager.active_connections[:] = clients
+
+    token_payload = token_chunk_events(n)
+    huge_payload = huge_prompt_events(max(n // 1000, 5), options.prompt_kb * 1024)
+    agent_payload = agent_log_lines(n)
+    pip_payload = pip_log_lines(n)
+
+    scenarios = [
+        ("event_protocol.token_chunks", n, bench_event_protocol(token_payload)),
+        ("event_protocol.huge_llm_start", max(n // 1000, 5), bench_event_protocol(huge_payload)),
+        ("agent_log_stream.stderr", n, bench_agent_log_stream(agent_payload, True)),
+        ("agent_log_stream.stdout", n, bench_agent_log_stream(agent_payload, False)),
+        ("pip_stream.stderr", n, bench_pip_stream(pip_payload, True)),
+        ("pip_stream.stdout", n, bench_pip_stream(pip_payload, False)),
+        ("broadcast", n, bench_broadcast(n)),
+        ("send_event.small", n, bench_send_event(n, 64)),
+        ("send_event.huge_llm_start", max(n // 1000, 5), bench_send_event(max(n // 1000, 5), options.prompt_kb * 1024)),
+    ]
+
+    results = []
+    # The log readers echo every line to stdout for debugging; keep that out of the report.
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        for name, lines, factory in scenarios:
+            results.append(await measure(name, lines, factory, options.repeat))
+    manager.active_connections.clear()
+    return results
+
+
+def compare(results: List[dict], baseline: List[dict], tolerance: float) -> List[str]:
+    """Returns a description of every scenario that regressed beyond the tolerance."""
+    previous: Dict[str, dict] = {entry["scenario"]: entry for entry in baseline}
+    regressions = []
+    for entry in results:
+        before = previous.get(entry["scenario"])
+        if before and entry["lines_per_s"] < before["lines_per_s"] * (1 - tolerance):
+            regressions.append(
+                f"{entry['scenario']}: {entry['lines_per_s']:.0f} lines/s vs {before['lines_per_s']:.0f} lines/s in the baseline"
+            )
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Microbenchmarks for the backend's event and log hot paths.")
+    parser.add_argument("--lines", type=int, default=20000, help="Lines per scenario.")
+    parser.add_argument("--clients", type=int, default=4, help="Simulated /ws clients receiving broadcasts.")
+    parser.add_argument("--prompt-kb", type=int, default=256, help="Size of the prompt in huge on_llm_start events.")
+    parser.add_argument("--repeat", type=int, default=3, help="Timed repetitions per scenario; the best is reported.")
+    parser.add_argument("--output", help="Write the JSON results to this file instead of stdout.")
+    parser.add_argument("--baseline", help="A previous JSON result to compare against.")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Allowed throughput drop relative to the baseline.")
+    options = parser.parse_args()
+
+    # The event protocol appends to the on-disk event log; keep it out of the project's data directory.
+    with tempfile.TemporaryDirectory() as event_log_dir:
+        event_log.root_dir = event_log_dir
+        results = asyncio.run(run_benchmarks(options))
+        event_log.close()
+    output = json.dumps({"results": results}, indent=2)
+    if options.output:
+        with open(options.output, "w") as f:
+            f.write(output + "\n")
+    else:
+        print(output)
+
+    if options.baseline:
+        with open(options.baseline, "r") as f:
+            regressions = compare(results, json.load(f)["results"], options.tolerance)
+        for regression in regressions:
+            print(f"REGRESSION {regression}", file=sys.stderr)
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,317 @@
+"""
+End-to-end load benchmark for the gallery backend.
+
+Starts the backend with every ADK agent on the offline fake model, starts the
+requested agents, opens several /ws clients and drives concurrent /run_turn
+traffic. Reports turn latency percentiles, throughput, broadcast fan-out
+latency and backend/agent CPU and RSS as JSON, so runs can be compared across
+commits.
+
+Usage (from the project root):
+
+    python -m backend.benchmarks.load_benchmark --agents agents/greeting_agent agents/weather_agent \\
+        --clients 4 --turns 200 --concurrency 16 --output bench.json
+"""
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
+
+import httpx
+import psutil
+import websockets
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+
+
+def percentile(values: List[float], pct: float) -> Optional[float]:
+    """Returns the nearest-rank percentile of a list of values."""
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = max(int(round(pct / 100 * len(ordered) + 0.5)) - 1, 0)
+    return ordered[min(rank, len(ordered) - 1)]
+
+
+def summarize(values: List[float]) -> dict:
+    """Summarizes a list of millisecond samples."""
+    if not values:
+        return {"count": 0}
+    return {
+        "count": len(values),
+        "mean_ms": round(sum(values) / len(values), 3),
+        "p50_ms": round(percentile(values, 50), 3),
+        "p95_ms": round(percentile(values, 95), 3),
+        "p99_ms": round(percentile(values, 99), 3),
+        "max_ms": round(max(values), 3),
+    }
+
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.check_output(["git", "rev-parse", "HEAD"], cwd=PROJECT_ROOT, text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+class WsClient:
+    """A /ws client that records how long broadcast agent events take to arrive."""
+
+    def __init__(self, url: str):
+        self.url = url
+        self.websocket = None
+        self.messages = 0
+        self.fanout_ms: List[float] = []
+        self.statuses: Dict[str, dict] = {}
+        self._status_changed = asyncio.Event()
+        self._reader: Optional[asyncio.Task] = None
+
+    async def connect(self):
+        self.websocket = await websockets.connect(self.url, max_size=None)
+        self._reader = asyncio.create_task(self._read())
+
+    async def _read(self):
+        try:
+            async for raw in self.websocket:
+                received = time.monotonic()
+                self.messages += 1
+                message = json.loads(raw)
+                if message.get("type") == "agent_event":
+                    # Agent events are stamped with the host's monotonic clock,
+                    # which is shared by every process on this machine.
+                    ts = message.get("data", {}).get("ts")
+                    if ts is not None:
+                        self.fanout_ms.append((received - ts) * 1000)
+                elif message.get("type") == "status":
+                    self.statuses[message["agent"]] = message
+                    self._status_changed.set()
+        except websockets.ConnectionClosed:
+            pass
+
+    async def wait_for_status(self, agent: str, status: str, timeout: float) -> dict:
+        async with asyncio.timeout(timeout):
+            while self.statuses.get(agent, {}).get("status") != status:
+                if self.statuses.get(agent, {}).get("status") == "failed":
+                    raise RuntimeError(f"Agent '{agent}' failed to start.")
+                self._status_changed.clear()
+                await self._status_changed.wait()
+        return self.statuses[agent]
+
+    async def send(self, command: dict):
+        await self.websocket.send(json.dumps(command))
+
+    async def close(self):
+        await self.websocket.close()
+        if self._reader:
+            await self._reader
+
+
+class ResourceSampler:
+    """Periodically samples CPU and RSS of the backend and agent processes."""
+
+    def __init__(self, interval: float):
+        self.interval = interval
+        self.processes: Dict[str, psutil.Process] = {}
+        self.samples: Dict[str, Dict[str, List[float]]] = {}
+        self._task: Optional[asyncio.Task] = None
+
+    def watch(self, name: str, pid: int):
+        try:
+            process = psutil.Process(pid)
+            process.cpu_percent(None)  # Prime the CPU counter.
+            self.processes[name] = process
+            self.samples[name] = {"cpu_percent": [], "rss_mb": []}
+        except psutil.NoSuchProcess:
+            pass
+
+    def start(self):
+        self._task = asyncio.create_task(self._run())
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.interval)
+            for name, process in list(self.processes.items()):
+                try:
+                    # Include child processes, e.g. the agent host spawned by a venv launcher.
+                    family = [process] + process.children(recursive=True)
+                    cpu = sum(p.cpu_percent(None) for p in family)
+                    rss = sum(p.memory_info().rss for p in family)
+                except psutil.NoSuchProcess:
+                    continue
+                self.samples[name]["cpu_percent"].append(cpu)
+                self.samples[name]["rss_mb"].append(rss / (1024 * 1024))
+
+    async def stop(self) -> dict:
+        if self._task:
+            self._task.cancel()
+        report = {}
+        for name, samples in self.samples.items():
+            cpu, rss = samples["cpu_percent"], samples["rss_mb"]
+            report[name] = {
+                "cpu_percent_mean": round(sum(cpu) / len(cpu), 2) if cpu else None,
+                "cpu_percent_max": round(max(cpu), 2) if cpu else None,
+                "rss_mb_mean": round(sum(rss) / len(rss), 2) if rss else None,
+                "rss_mb_max": round(max(rss), 2) if rss else None,
+            }
+        return report
+
+
+async def wait_for_backend(base_url: str, process: subprocess.Popen, timeout: float):
+    deadline = time.monotonic() + timeout
+    async with httpx.AsyncClient() as client:
+        while time.monotonic() < deadline:
+            if process.poll() is not None:
+                raise RuntimeError("The backend exited during startup.")
+            try:
+                response = await client.get(f"{base_url}/agents", timeout=1)
+                if response.status_code == 200:
+                    return
+            except httpx.TransportError:
+                pass
+            await asyncio.sleep(0.25)
+    raise RuntimeError("The backend did not start in time.")
+
+
+async def drive_turns(base_url: str, agents: List[str], turns: int, concurrency: int, prompt: str) -> tuple:
+    """Sends `turns` prompts round-robin across agents with at most `concurrency` in flight."""
+    latencies: List[float] = []
+    errors: List[str] = []
+    semaphore = asyncio.Semaphore(concurrency)
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=300) as client:
+        async def one_turn(index: int):
+            agent = agents[index % len(agents)]
+            async with semaphore:
+                started = time.perf_counter()
+                try:
+                    response = await client.post("/run_turn", json={"agent_name": agent, "prompt": prompt})
+                    response.raise_for_status()
+                    latencies.append((time.perf_counter() - started) * 1000)
+                except httpx.HTTPError as e:
+                    errors.append(f"{agent}: {e!r}")
+
+        started = time.perf_counter()
+        await asyncio.gather(*(one_turn(i) for i in range(turns)))
+        elapsed = time.perf_counter() - started
+
+    return latencies, errors, elapsed
+
+
+async def run_benchmark(options: argparse.Namespace) -> dict:
+    base_url = f"http://127.0.0.1:{options.port}"
+    env = os.environ.copy()
+    env.update({
+        "GALLERY_FAKE_LLM": "1",
+        "FAKE_LLM_LATENCY": str(options.llm_latency),
+        "FAKE_LLM_TOKENS_PER_SECOND": str(options.tokens_per_second),
+        "FAKE_LLM_SEED": str(options.seed),
+    })
+    backend = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "backend.main:app", "--host", "127.0.0.1", "--port", str(options.port), "--log-level", "warning"],
+        cwd=PROJECT_ROOT,
+        env=env,
+        stdout=subprocess.DEVNULL if not options.verbose else None,
+        stderr=subprocess.DEVNULL if not options.verbose else None,
+    )
+    sampler = ResourceSampler(options.sample_interval)
+    clients: List[WsClient] = []
+    try:
+        await wait_for_backend(base_url, backend, timeout=30)
+        sampler.watch("backend", backend.pid)
+
+        for _ in range(options.clients):
+            client = WsClient(f"ws://127.0.0.1:{options.port}/ws")
+            await client.connect()
+            clients.append(client)
+
+        startup_s = {}
+        for index, agent in enumerate(options.agents):
+            started = time.perf_counter()
+            await clients[0].send({"action": "start", "agent_name": agent, "port": options.agent_base_port + index})
+            status = await clients[0].wait_for_status(agent, "running", timeout=options.startup_timeout)
+            startup_s[agent] = round(time.perf_counter() - started, 3)
+            if status.get("pid", -1) > 0:
+                sampler.watch(agent, status["pid"])
+
+        # One warm-up turn per agent, so first-call costs do not skew the results.
+        await drive_turns(base_url, options.agents, len(options.agents), len(options.agents), options.prompt)
+        for client in clients:
+            client.fanout_ms.clear()
+
+        sampler.start()
+        latencies, errors, elapsed = await drive_turns(base_url, options.agents, options.turns, options.concurrency, options.prompt)
+        # Give in-flight broadcasts a moment to reach every client.
+        await asyncio.sleep(0.5)
+        resources = await sampler.stop()
+
+        fanout = [sample for client in clients for sample in client.fanout_ms]
+        return {
+            "meta": {
+                "commit": git_commit(),
+                "timestamp": datetime.now(timezone.utc).isoformat(),
+                "agents": options.agents,
+                "clients": options.clients,
+                "turns": options.turns,
+                "concurrency": options.concurrency,
+                "llm_latency_s": options.llm_latency,
+                "tokens_per_second": options.tokens_per_second,
+            },
+            "agent_startup_s": startup_s,
+            "turn_latency": summarize(latencies),
+            "errors": {"count": len(errors), "samples": errors[:10]},
+            "throughput_turns_per_s": round(len(latencies) / elapsed, 3) if elapsed else None,
+            "broadcast_fanout_latency": summarize(fanout),
+            "ws_messages_per_client": [client.messages for client in clients],
+            "resources": resources,
+        }
+    finally:
+        if clients:
+            try:
+                await clients[0].send({"action": "stop_all"})
+                await asyncio.sleep(1)
+            except websockets.ConnectionClosed:
+                pass
+        for client in clients:
+            await client.close()
+        backend.terminate()
+        try:
+            backend.wait(timeout=15)
+        except subprocess.TimeoutExpired:
+            backend.kill()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="End-to-end load benchmark for the gallery backend.")
+    parser.add_argument("--agents", nargs="+", default=["agents/greeting_agent"], help="Agent ids to start and drive.")
+    parser.add_argument("--clients", type=int, default=4, help="Number of /ws clients to connect.")
+    parser.add_argument("--turns", type=int, default=100, help="Total number of /run_turn requests.")
+    parser.add_argument("--concurrency", type=int, default=8, help="Maximum /run_turn requests in flight.")
+    parser.add_argument("--prompt", default="Hello", help="Prompt sent with every turn.")
+    parser.add_argument("--port", type=int, default=8010, help="Port for the backend under test.")
+    parser.add_argument("--agent-base-port", type=int, default=8101, help="First port assigned to the started agents.")
+    parser.add_argument("--llm-latency", type=float, default=0.0, help="Fake model latency in seconds.")
+    parser.add_argument("--tokens-per-second", type=float, default=0.0, help="Fake model token rate (0 for instant).")
+    parser.add_argument("--seed", type=int, default=0, help="Fake model seed.")
+    parser.add_argument("--startup-timeout", type=float, default=600, help="Seconds to wait for each agent to start.")
+    parser.add_argument("--sample-interval", type=float, default=0.5, help="Seconds between CPU/RSS samples.")
+    parser.add_argument("--output", help="Write the JSON results to this file instead of stdout.")
+    parser.add_argument("--verbose", action="store_true", help="Show the backend's output.")
+    options = parser.parse_args()
+
+    results = asyncio.run(run_benchmark(options))
+    output = json.dumps(results, indent=2)
+    if options.output:
+        with open(options.output, "w") as f:
+            f.write(output + "\n")
+    else:
+        print(output)
+
+
+if __name__ == "__main__":
+    main()
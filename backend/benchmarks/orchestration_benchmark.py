@@ -0,0 +1,110 @@
+"""
+Compares the end-to-end alert latency of RapidResolveAgent's orchestration
+modes.
+
+Builds the supply chain agent in each mode, replaces every model with the
+offline fake model at a fixed per-call latency, and runs the same disruption
+alerts through an in-process runner. Reports alert latency percentiles and
+model calls per alert for each mode as JSON.
+
+Usage (from the project root):
+
+    python -m backend.benchmarks.orchestration_benchmark --alerts 20 --llm-latency 0.5 --output orchestration.json
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+from typing import List, Optional
+
+from google.adk.agents.callback_context import CallbackContext
+from google.adk.models.llm_request import LlmRequest
+from google.adk.models.llm_response import LlmResponse
+from google.adk.plugins.base_plugin import BasePlugin
+from google.adk.runners import InMemoryRunner
+from google.genai import types
+
+from backend.benchmarks.load_benchmark import summarize
+from backend.fake_llm import install_fake_llm
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+SUPPLY_CHAIN_AGENT_PATH = os.path.join(PROJECT_ROOT, "agents", "supply_chain_agent")
+ALERTS = [
+    "ALERT: The Port of Shanghai is closed due to a typhoon.",
+    "ALERT: Supplier ABC has halted production after a fire.",
+]
+
+
+class ModelCallCounter(BasePlugin):
+    """Counts the model calls made while the benchmark runs."""
+
+    def __init__(self):
+        super().__init__(name="model_call_counter")
+        self.calls = 0
+
+    async def before_model_callback(
+        self, *, callback_context: CallbackContext, llm_request: LlmRequest
+    ) -> Optional[LlmResponse]:
+        self.calls += 1
+        return None
+
+
+async def run_mode(orchestration: str, options: argparse.Namespace) -> dict:
+    from supply_chain_agent.agent import build_root_agent
+
+    agent = build_root_agent(orchestration)
+    install_fake_llm(agent, latency=options.llm_latency, seed=options.seed)
+    counter = ModelCallCounter()
+    runner = InMemoryRunner(agent=agent, app_name="orchestration_benchmark", plugins=[counter])
+
+    async def run_alert(alert: str) -> float:
+        session = await runner.session_service.create_session(app_name=runner.app_name, user_id="benchmark")
+        message = types.Content(role="user", parts=[types.Part(text=alert)])
+        started = time.perf_counter()
+        async for _ in runner.run_async(user_id="benchmark", session_id=session.id, new_message=message):
+            pass
+        return (time.perf_counter() - started) * 1000
+
+    # The first alert also builds the knowledge base indexes; it is not timed.
+    await run_alert(ALERTS[0])
+    counter.calls = 0
+    latencies = [await run_alert(ALERTS[index % len(ALERTS)]) for index in range(options.alerts)]
+
+    return {
+        "orchestration": orchestration,
+        "alerts": options.alerts,
+        "model_calls_per_alert": round(counter.calls / max(options.alerts, 1), 2),
+        "latency": summarize(latencies),
+    }
+
+
+async def run_benchmarks(options: argparse.Namespace) -> List[dict]:
+    sys.path.insert(0, SUPPLY_CHAIN_AGENT_PATH)
+    try:
+        return [await run_mode(orchestration, options) for orchestration in options.modes]
+    finally:
+        sys.path.remove(SUPPLY_CHAIN_AGENT_PATH)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compares the alert latency of RapidResolveAgent's orchestration modes.")
+    parser.add_argument("--modes", nargs="+", default=["sequential", "parallel"], help="Orchestration modes to compare.")
+    parser.add_argument("--alerts", type=int, default=20, help="Alerts to run per mode.")
+    parser.add_argument("--llm-latency", type=float, default=0.5, help="Seconds each fake model call takes.")
+    parser.add_argument("--seed", type=int, default=0, help="Seed for the fake model's randomized responses.")
+    parser.add_argument("--output", help="Write the JSON results to this file instead of stdout.")
+    options = parser.parse_args()
+
+    results = asyncio.run(run_benchmarks(options))
+    output = json.dumps({"results": results}, indent=2)
+    if options.output:
+        with open(options.output, "w") as f:
+            f.write(output + "\n")
+    else:
+        print(output)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,10 @@
-from pydantic import BaseModel
+from typing import Dict, Optional
+
+from pydantic import BaseModel, field_validator
+
+# Log levels an agent's log_level can name, and the aliases accepted for them.
+LOG_LEVELS = ("debug", "info", "warning", "error")
+_LOG_LEVEL_ALIASES = {"warn": "warning", "critical": "error"}
 
 
 class AgentConfig(BaseModel):
@@ -6,3 +12,24 @@ class AgentConfig(BaseModel):
     type: str = "adk"
     dependencies: str = "requirements.txt"
     entrypoint: str = ""
+    fake_llm: bool = False
+    profile_startup: bool = False
+    llm_cache: bool = False
+    llm_cache_size: int = 256
+    llm_cache_ttl: float = 3600.0
+    llm_cache_dir: Optional[str] = None
+    environment: Dict[str, str] = {}
+    max_concurrent_turns: int = 8
+    max_queued_turns: int = 32
+    # Agent log lines below this level ("debug", "info", "warning" or "error") are dropped.
+    log_level: str = "debug"
+
+    @field_validator("log_level")
+    @classmethod
+    def _normalize_log_level(cls, value: str) -> str:
+        """Accepts level names in any case, e.g. "WARNING", so they compare against the lowercase levels of log lines."""
+        level = value.lower()
+        level = _LOG_LEVEL_ALIASES.get(level, level)
+        if level not in LOG_LEVELS:
+            raise ValueError(f"log_level must be one of {', '.join(LOG_LEVELS)}, not {value!r}")
+        return level
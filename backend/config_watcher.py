@@ -0,0 +1,117 @@
+import asyncio
+import os
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+
+
+def roots_by_path(config: dict) -> Dict[str, dict]:
+    """Returns a config's agent roots keyed by their path."""
+    roots = config.get("agent_roots") or []
+    return {root["path"]: root for root in roots if isinstance(root, dict) and root.get("path")}
+
+
+def _agent_configs(config: dict) -> Dict[str, dict]:
+    agent_configs = config.get("agent_configs") or {}
+    return agent_configs if isinstance(agent_configs, dict) else {}
+
+
+def diff_gallery_config(old: dict, new: dict) -> dict:
+    """
+    Compares two gallery configs. Roots are matched by path; a root whose
+    name or exclusions changed is reported as changed. Agent configs are
+    compared as written, so reformatting the file changes nothing.
+    """
+    old_roots, new_roots = roots_by_path(old), roots_by_path(new)
+    old_agents, new_agents = _agent_configs(old), _agent_configs(new)
+    return {
+        "roots_added": [path for path in new_roots if path not in old_roots],
+        "roots_removed": [path for path in old_roots if path not in new_roots],
+        "roots_changed": [path for path in new_roots if path in old_roots and new_roots[path] != old_roots[path]],
+        "agent_configs_changed": sorted(
+            agent_id for agent_id in old_agents.keys() | new_agents.keys()
+            if old_agents.get(agent_id) != new_agents.get(agent_id)
+        ),
+        "other_keys_changed": sorted(
+            key for key in (old.keys() | new.keys()) - {"agent_roots", "agent_configs"} if old.get(key) != new.get(key)
+        ),
+    }
+
+
+def diff_is_empty(diff: dict) -> bool:
+    return not any(diff.values())
+
+
+def agent_changes(old: List[dict], new: List[dict]) -> dict:
+    """Compares two agent listings by id, returning the added, removed and updated entries."""
+    old_by_id = {agent["id"]: agent for agent in old}
+    new_by_id = {agent["id"]: agent for agent in new}
+    return {
+        "agents_added": [agent for agent_id, agent in new_by_id.items() if agent_id not in old_by_id],
+        "agents_removed": [agent_id for agent_id in old_by_id if agent_id not in new_by_id],
+        "agents_updated": [
+            agent for agent_id, agent in new_by_id.items() if agent_id in old_by_id and old_by_id[agent_id] != agent
+        ],
+    }
+
+
+class ConfigWatcher:
+    """
+    Polls a config file's modification time and size, and calls `on_change`
+    with the newly parsed config when they change. `load` must raise if the
+    file cannot be read or parsed, in which case the current config is kept
+    and the file is retried once it changes again. Editors that save by
+    renaming a new file into place are handled, since a missing file is
+    treated as not yet changed.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        load: Callable[[str], dict],
+        on_change: Callable[[dict], Awaitable[None]],
+        interval: float = 2.0,
+    ):
+        self.path = path
+        self.load = load
+        self.on_change = on_change
+        self.interval = interval
+        self._signature = self._stat()
+        self._task: Optional[asyncio.Task] = None
+
+    def _stat(self) -> Optional[Tuple[int, int]]:
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    async def check(self) -> bool:
+        """Reloads the file if it changed since the last check, and returns True if `on_change` was called."""
+        signature = self._stat()
+        if signature is None or signature == self._signature:
+            return False
+        self._signature = signature
+        try:
+            config = self.load(self.path)
+        except Exception as e:
+            print(f"Not reloading {os.path.basename(self.path)}: {e}")
+            return False
+        await self.on_change(config)
+        return True
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await self.check()
+            except Exception as e:
+                print(f"Error applying {os.path.basename(self.path)}: {e}")
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
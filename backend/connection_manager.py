@@ -1,25 +1,89 @@
-from typing import List, Dict
+from collections import deque
+from typing import Awaitable, Callable, Deque, List, Dict, Optional, Tuple
 from fastapi import WebSocket
 import asyncio
+import itertools
+import uuid
 
 # In-memory store for running agent processes
 running_processes: Dict[str, Dict] = {}
 starting_agents: set = set()
 startup_lock = asyncio.Lock()
 
+# Broadcasts kept for clients that reconnect and resume from the last one they saw.
+REPLAY_BUFFER_SIZE = 5000
+
 class ConnectionManager:
-    def __init__(self):
+    """
+    Tracks the /ws clients and broadcasts to them. Every broadcast is stamped
+    with a `stream_seq`, increasing across the life of the backend, and kept
+    in a bounded replay buffer so a client that reconnects can be sent what it
+    missed instead of a full snapshot. A backend restart starts a new stream,
+    which clients detect through a change of `instance_id`.
+    """
+
+    def __init__(self, replay_size: int = REPLAY_BUFFER_SIZE):
         self.active_connections: List[WebSocket] = []
+        self.instance_id = uuid.uuid4().hex
+        self._seq = itertools.count(1)
+        self.last_seq = 0
+        self._replay: Deque[Tuple[int, str]] = deque(maxlen=replay_size)
 
-    async def connect(self, websocket: WebSocket):
-        await websocket.accept()
+    async def connect(
+        self,
+        websocket: WebSocket,
+        last_seq: Optional[int] = None,
+        snapshot: Optional[Callable[[WebSocket], Awaitable[None]]] = None,
+    ) -> bool:
+        """
+        Starts sending broadcasts to an accepted client. A client resuming
+        from `last_seq` is first sent the broadcasts it missed; returns False
+        if they are no longer all buffered and the client needs a snapshot.
+        If `snapshot` is given, it is sent in that case before the client
+        joins the live stream, followed by the broadcasts made while it was
+        being sent, so no live message reaches the client ahead of it.
+        """
+        resumed = last_seq is not None and self.can_resume(self.instance_id, last_seq)
+        if not resumed and snapshot is not None:
+            last_seq = self.last_seq
+            await snapshot(websocket)
+            await self._replay_after(websocket, last_seq)
+        elif resumed:
+            resumed = await self._replay_after(websocket, last_seq)
         self.active_connections.append(websocket)
+        return resumed
+
+    async def _replay_after(self, websocket: WebSocket, last_seq: int) -> bool:
+        """Sends a client every buffered broadcast after `last_seq`; returns False if some had already been dropped."""
+        # Broadcasts made while the replay is being sent are caught up on the
+        # next pass; the client joins the live stream only once there is
+        # nothing left to replay, so messages arrive in order.
+        caught_up = self.can_resume(self.instance_id, last_seq)
+        while caught_up and last_seq < self.last_seq:
+            for seq, message in [entry for entry in self._replay if entry[0] > last_seq]:
+                await websocket.send_text(message)
+                last_seq = seq
+            # A replay slow enough to fall out of the buffer ends in a snapshot.
+            caught_up = self.can_resume(self.instance_id, last_seq)
+        return caught_up
+
+    def can_resume(self, instance: Optional[str], last_seq: Optional[int]) -> bool:
+        """Returns True if a client of stream `instance` can be sent every broadcast after `last_seq`."""
+        if instance != self.instance_id or last_seq is None or last_seq > self.last_seq:
+            return False
+        oldest = self._replay[0][0] if self._replay else self.last_seq + 1
+        return last_seq >= oldest - 1
 
     def disconnect(self, websocket: WebSocket):
         self.active_connections.remove(websocket)
 
     async def broadcast(self, message: str):
-        for connection in self.active_connections:
+        """Broadcasts a JSON object, stamped with the next `stream_seq`, to every client."""
+        seq = self.last_seq = next(self._seq)
+        # Messages are serialized objects, so the seq is spliced in rather than re-serializing them.
+        message = f'{{"stream_seq":{seq},{message[1:]}' if message != "{}" else f'{{"stream_seq":{seq}}}'
+        self._replay.append((seq, message))
+        for connection in list(self.active_connections):
             await connection.send_text(message)
 
-manager = ConnectionManager()
\ No newline at end of file
+manager = ConnectionManager()
@@ -0,0 +1,137 @@
+import asyncio
+import hashlib
+import os
+import shutil
+import sys
+from typing import Dict, List, Optional, Tuple
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+DEFAULT_CACHE_DIR = os.path.join(PROJECT_ROOT, ".gallery_data", "dependency_cache")
+
+# Prints what an interpreter's wheel tags are derived from.
+_INTERPRETER_SCRIPT = "import sys; print(sys.implementation.name, '%d.%d' % sys.version_info[:2], sys.abiflags)"
+
+
+def _download_tags(implementation: str, version: str, abiflags: str) -> List[str]:
+    """Returns the `pip download` options selecting wheels for an interpreter."""
+    options = ["--python-version", version]
+    if implementation == "cpython":
+        options += ["--implementation", "cp", "--abi", f"cp{version.replace('.', '')}{abiflags}", "--abi", "abi3", "--abi", "none"]
+    return options
+
+
+class DependencyCache:
+    """
+    Dependency installation shared by every agent: one `uv` executable, one
+    uv cache, and a wheelhouse of downloaded distributions. Installs run
+    offline against the wheelhouse and cache first, and go to the network
+    only if that fails, e.g. for a requirement that was never prefetched.
+
+    Layout under `root_dir`: `uv/bin/uv`, `uv-cache/`, and `wheelhouse/`,
+    with a marker per prefetched set of requirements in `wheelhouse/.prefetched/`.
+    """
+
+    def __init__(self, root_dir: str):
+        self.root_dir = root_dir
+        self.wheelhouse = os.path.join(root_dir, "wheelhouse")
+        self.uv_cache = os.path.join(root_dir, "uv-cache")
+        self._uv: Optional[str] = None
+        self._uv_lock = asyncio.Lock()
+        self._prefetch_lock = asyncio.Lock()
+        self._download_options: Dict[str, List[str]] = {}
+
+    async def ensure_uv(self) -> str:
+        """Returns the shared uv executable, installing it into the cache directory on first use if uv is not on PATH."""
+        async with self._uv_lock:
+            if self._uv is None:
+                target = os.path.join(self.root_dir, "uv")
+                installed = os.path.join(target, "bin", "uv")
+                self._uv = shutil.which("uv") or (installed if os.path.isfile(installed) else None)
+                if self._uv is None:
+                    returncode, output = await _run(sys.executable, "-m", "pip", "install", "--target", target, "uv")
+                    if returncode != 0 or not os.path.isfile(installed):
+                        raise RuntimeError(
+                            f"Installation of 'uv' failed. The executable was not found at {installed} after running pip. "
+                            f"pip exit code: {returncode}. output: {output}."
+                        )
+                    self._uv = installed
+            return self._uv
+
+    def install_commands(self, uv_executable: str, python_executable: str, install_args: List[str]) -> Tuple[List[str], List[str]]:
+        """Returns the offline install command for a venv, and the online one to fall back to."""
+        base = [uv_executable, "pip", "install", "--python", python_executable, "--cache-dir", self.uv_cache]
+        offline = base + ["--offline", "--find-links", self.wheelhouse] + install_args
+        online = base + ["--find-links", self.wheelhouse] + install_args
+        return offline, online
+
+    def _prefetch_marker(self, install_args: List[str], cwd: str, target_options: List[str]) -> str:
+        """
+        Names the marker for a set of requirements after the content of their
+        files and the interpreter they are for, so edits are prefetched again.
+        """
+        digest = hashlib.sha256(" ".join(target_options).encode())
+        for arg in install_args:
+            path = os.path.join(cwd, arg)
+            digest.update(arg.encode())
+            for name in (path, os.path.join(path, "pyproject.toml")):
+                if os.path.isfile(name):
+                    with open(name, "rb") as f:
+                        digest.update(f.read())
+        return os.path.join(self.wheelhouse, ".prefetched", digest.hexdigest()[:24])
+
+    async def _target_options(self, python_executable: str) -> List[str]:
+        """
+        Returns the options that make `pip download`, which runs under the
+        backend's interpreter, fetch wheels for `python_executable` instead.
+        None are needed when both interpreters match; otherwise only wheels
+        can be selected, since pip cannot build an sdist for another one.
+        """
+        if python_executable not in self._download_options:
+            returncode, output = await _run(python_executable, "-c", _INTERPRETER_SCRIPT)
+            fields = output.split() if returncode == 0 else []
+            if len(fields) == 2:
+                fields.append("")
+            if len(fields) != 3:
+                print(f"Could not read the wheel tags of {python_executable}; prefetching for {sys.executable}: {output[-500:]}")
+                options = []
+            elif fields == [sys.implementation.name, "%d.%d" % sys.version_info[:2], sys.abiflags]:
+                options = []
+            else:
+                options = ["--only-binary=:all:"] + _download_tags(*fields)
+            self._download_options[python_executable] = options
+        return self._download_options[python_executable]
+
+    async def prefetch(self, install_args: List[str], cwd: str, python_executable: str = "python3") -> bool:
+        """
+        Downloads the distributions `uv pip install <install_args>` would
+        need into the wheelhouse, unless the same requirements were already
+        prefetched. `python_executable` is the interpreter of the venv the
+        installs target, whose wheel tags are downloaded. Returns True if
+        anything was downloaded.
+        """
+        async with self._prefetch_lock:
+            target_options = await self._target_options(python_executable)
+            marker = self._prefetch_marker(install_args, cwd, target_options)
+            if os.path.exists(marker):
+                return False
+            returncode, output = await _run(
+                sys.executable, "-m", "pip", "download", "--quiet", *target_options,
+                "--dest", self.wheelhouse, *install_args, cwd=cwd,
+            )
+            if returncode != 0:
+                print(f"Prefetching {' '.join(install_args)} in {cwd} failed: {output[-500:]}")
+                return False
+            os.makedirs(os.path.dirname(marker), exist_ok=True)
+            open(marker, "w").close()
+            return True
+
+
+async def _run(*command: str, cwd: Optional[str] = None) -> Tuple[int, str]:
+    proc = await asyncio.create_subprocess_exec(
+        *command, cwd=cwd, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.STDOUT
+    )
+    output, _ = await proc.communicate()
+    return proc.returncode, output.decode(errors="replace").strip()
+
+
+dependency_cache = DependencyCache(os.environ.get("GALLERY_DEPENDENCY_CACHE_DIR", DEFAULT_CACHE_DIR))
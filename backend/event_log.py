@@ -0,0 +1,285 @@
+import bisect
+import json
+import mmap
+import os
+import re
+from typing import BinaryIO, Dict, List, Optional, Tuple
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+DEFAULT_EVENT_LOG_DIR = os.path.join(PROJECT_ROOT, ".gallery_data", "event_log")
+
+_SEGMENT_NAME = re.compile(r"^(\d{20})\.ndjson$")
+
+
+class Segment:
+    """
+    One file of an agent's event log, named after the sequence number of its
+    first event, with a sparse index of (seq, offset) pairs and the offset of
+    the first event of each turn.
+    """
+
+    def __init__(self, path: str, first_seq: int):
+        self.path = path
+        self.first_seq = first_seq
+        self.last_seq = first_seq - 1
+        self.size = 0
+        self.index_seqs: List[int] = []
+        self.index_offsets: List[int] = []
+        self.turns: Dict[str, int] = {}
+
+    @property
+    def index_path(self) -> str:
+        return self.path[:-len(".ndjson")] + ".idx"
+
+    def add_index_entry(self, seq: int, offset: int) -> None:
+        self.index_seqs.append(seq)
+        self.index_offsets.append(offset)
+
+    def offset_for(self, seq: int) -> int:
+        """Returns the offset of the last indexed event at or before `seq`, from which a scan finds it."""
+        position = bisect.bisect_right(self.index_seqs, seq) - 1
+        return self.index_offsets[position] if position >= 0 else 0
+
+
+class AgentEventLog:
+    """
+    The append-only event log of one agent: a directory of NDJSON segments,
+    each line holding `{"seq": n, "data": <event>}`.
+
+    The active segment is rotated once it reaches `max_segment_bytes`, and the
+    oldest segments are deleted beyond `max_segments`. Every
+    `index_interval`-th event and the first event of every turn are written to
+    the segment's `.idx` file, so a read seeks close to where it starts
+    instead of scanning the segment from the top.
+    """
+
+    def __init__(self, directory: str, max_segment_bytes: int, max_segments: int, index_interval: int):
+        self.directory = directory
+        self.max_segment_bytes = max_segment_bytes
+        self.max_segments = max_segments
+        self.index_interval = index_interval
+        self.segments: List[Segment] = []
+        self._file: Optional[BinaryIO] = None
+        self._index_file: Optional[BinaryIO] = None
+        os.makedirs(directory, exist_ok=True)
+        self._load()
+
+    @property
+    def next_seq(self) -> int:
+        return self.segments[-1].last_seq + 1 if self.segments else 1
+
+    def _load(self) -> None:
+        names = sorted(name for name in os.listdir(self.directory) if _SEGMENT_NAME.match(name))
+        for name in names:
+            segment = Segment(os.path.join(self.directory, name), int(_SEGMENT_NAME.match(name).group(1)))
+            segment.size = os.path.getsize(segment.path)
+            self._load_index(segment)
+            self.segments.append(segment)
+        if self.segments:
+            # The index may trail the active segment after a crash; its last events are rescanned.
+            self._rescan_tail(self.segments[-1])
+            for segment, following in zip(self.segments, self.segments[1:]):
+                segment.last_seq = following.first_seq - 1
+
+    @staticmethod
+    def _load_index(segment: Segment) -> None:
+        try:
+            with open(segment.index_path, "rb") as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        break
+                    if "turn" in entry:
+                        segment.turns.setdefault(entry["turn"], entry["offset"])
+                    else:
+                        segment.add_index_entry(entry["seq"], entry["offset"])
+        except FileNotFoundError:
+            pass
+
+    def _rescan_tail(self, segment: Segment) -> None:
+        offset = segment.index_offsets[-1] if segment.index_offsets else 0
+        segment.last_seq = segment.first_seq - 1
+        with open(segment.path, "rb") as f:
+            f.seek(offset)
+            for line in f:
+                if not line.endswith(b"\n"):
+                    # A torn final write is cut off so the next append starts on a fresh line.
+                    os.truncate(segment.path, offset)
+                    segment.size = offset
+                    break
+                segment.last_seq = json.loads(line)["seq"]
+                offset += len(line)
+
+    def _open_active(self) -> None:
+        if self._file is None:
+            segment = self.segments[-1]
+            self._file = open(segment.path, "ab")
+            self._index_file = open(segment.index_path, "ab")
+
+    def _rotate(self) -> None:
+        self.close()
+        first_seq = self.next_seq
+        segment = Segment(os.path.join(self.directory, f"{first_seq:020d}.ndjson"), first_seq)
+        self.segments.append(segment)
+        while len(self.segments) > self.max_segments:
+            oldest = self.segments.pop(0)
+            for path in (oldest.path, oldest.index_path):
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass
+
+    def append(self, raw_events: List[bytes], turn_ids: List[Optional[str]]) -> int:
+        """
+        Appends already-serialized events, each a JSON object without a
+        newline, and returns the sequence number of the first.
+        """
+        first = self.next_seq
+        if not self.segments or self.segments[-1].size >= self.max_segment_bytes:
+            self._rotate()
+        self._open_active()
+        segment = self.segments[-1]
+        index_lines = []
+        chunks = []
+        for raw_event, turn_id in zip(raw_events, turn_ids):
+            seq = segment.last_seq + 1
+            line = b'{"seq":%d,"data":%s}\n' % (seq, raw_event)
+            if (seq - segment.first_seq) % self.index_interval == 0:
+                segment.add_index_entry(seq, segment.size)
+                index_lines.append(b'{"seq":%d,"offset":%d}\n' % (seq, segment.size))
+            if turn_id is not None and turn_id not in segment.turns:
+                segment.turns[turn_id] = segment.size
+                index_lines.append(json.dumps({"turn": turn_id, "offset": segment.size}).encode() + b"\n")
+            chunks.append(line)
+            segment.size += len(line)
+            segment.last_seq = seq
+        self._file.write(b"".join(chunks))
+        self._file.flush()
+        if index_lines:
+            self._index_file.write(b"".join(index_lines))
+            self._index_file.flush()
+        return first
+
+    def _segment_for(self, seq: int) -> Optional[int]:
+        position = bisect.bisect_right([segment.first_seq for segment in self.segments], seq) - 1
+        return max(position, 0) if self.segments else None
+
+    def read(self, after_seq: int = 0, limit: int = 100) -> Tuple[bytes, int]:
+        """
+        Returns up to `limit` events after `after_seq` as NDJSON, copied
+        straight from the mapped segments as whole line ranges, and the seq
+        to pass as `after_seq` for the next page.
+        """
+        target = max(after_seq + 1, self.segments[0].first_seq) if self.segments else after_seq + 1
+        position = self._segment_for(target)
+        if position is None or target > self.segments[-1].last_seq:
+            return b"", after_seq
+        chunks = []
+        remaining = limit
+        for segment in self.segments[position:]:
+            if remaining == 0:
+                break
+            chunk, count = self._read_segment(segment, target, remaining)
+            chunks.append(chunk)
+            remaining -= count
+            target = segment.last_seq + 1
+        first = max(after_seq + 1, self.segments[0].first_seq)
+        return b"".join(chunks), first + (limit - remaining) - 1
+
+    @staticmethod
+    def _read_segment(segment: Segment, target: int, limit: int) -> Tuple[bytes, int]:
+        with open(segment.path, "rb") as f, mmap.mmap(f.fileno(), segment.size, access=mmap.ACCESS_READ) as mapped:
+            start = end = segment.offset_for(target)
+            count = 0
+            while end < segment.size and count < limit:
+                line_end = mapped.find(b"\n", end) + 1
+                # Lines start with '{"seq":', so the seq is read without parsing the event.
+                if int(mapped[end + 7:mapped.find(b",", end)]) < target:
+                    start = line_end
+                else:
+                    count += 1
+                end = line_end
+            return mapped[start:end], count
+
+    def read_turn(self, turn_id: str, limit: int = 1000) -> bytes:
+        """
+        Returns the events of one turn as NDJSON, scanning forward from the
+        segment and offset where the turn started until a segment holds none
+        of its events.
+        """
+        lines = []
+        needle = json.dumps(turn_id).encode()
+        for segment in self.segments:
+            offset = segment.turns.get(turn_id)
+            if offset is None and not lines:
+                continue
+            found = len(lines)
+            with open(segment.path, "rb") as f, mmap.mmap(f.fileno(), segment.size, access=mmap.ACCESS_READ) as mapped:
+                position = offset or 0
+                while position < segment.size and len(lines) < limit:
+                    line_end = mapped.find(b"\n", position) + 1
+                    line = mapped[position:line_end]
+                    # A cheap byte search first; only candidate lines are parsed.
+                    if needle in line and json.loads(line)["data"].get("turn_id") == turn_id:
+                        lines.append(line)
+                    position = line_end
+            if len(lines) == found or len(lines) >= limit:
+                break
+        return b"".join(lines)
+
+    def close(self) -> None:
+        for f in (self._file, self._index_file):
+            if f is not None:
+                f.close()
+        self._file = self._index_file = None
+
+
+class EventLog:
+    """The event logs of every agent, under one root directory."""
+
+    def __init__(
+        self,
+        root_dir: str,
+        max_segment_bytes: int = 8 * 1024 * 1024,
+        max_segments: int = 16,
+        index_interval: int = 64,
+    ):
+        self.root_dir = root_dir
+        self.max_segment_bytes = max_segment_bytes
+        self.max_segments = max_segments
+        self.index_interval = index_interval
+        self._agents: Dict[str, AgentEventLog] = {}
+
+    def for_agent(self, agent_id: str) -> AgentEventLog:
+        log = self._agents.get(agent_id)
+        if log is None:
+            log = self._agents[agent_id] = AgentEventLog(
+                self._directory(agent_id), self.max_segment_bytes, self.max_segments, self.index_interval
+            )
+        return log
+
+    def _directory(self, agent_id: str) -> str:
+        return os.path.join(self.root_dir, re.sub(r"[^A-Za-z0-9_.-]", "__", agent_id))
+
+    def has_agent(self, agent_id: str) -> bool:
+        return agent_id in self._agents or os.path.isdir(self._directory(agent_id))
+
+    def close(self) -> None:
+        for log in self._agents.values():
+            log.close()
+        self._agents.clear()
+
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        return int(os.environ.get(name, default))
+    except ValueError:
+        return default
+
+
+event_log = EventLog(
+    os.environ.get("GALLERY_EVENT_LOG_DIR", DEFAULT_EVENT_LOG_DIR),
+    max_segment_bytes=_env_int("GALLERY_EVENT_LOG_SEGMENT_BYTES", 8 * 1024 * 1024),
+    max_segments=_env_int("GALLERY_EVENT_LOG_SEGMENTS", 16),
+)
@@ -1,20 +1,116 @@
+import contextvars
 import json
+import time
+import uuid
+from typing import Optional
+
 from google.adk.plugins import BasePlugin
 from google.adk.tools import AgentTool
 from google.genai.types import Content, Part
 
+# The turn and span that are currently executing. Each request handled by the
+# agent host runs in its own asyncio task, so these are isolated per turn.
+_current_turn_id: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar("current_turn_id", default=None)
+_current_span_id: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar("current_span_id", default=None)
+
+
+def _new_span_id() -> str:
+    return uuid.uuid4().hex[:16]
+
 
 class EventStreamingPlugin(BasePlugin):
     def __init__(self, pipe_writer):
         self.name = "event_streaming_plugin"
         self._pipe_writer = pipe_writer
+        # Maps the key of an open span (e.g. a tool call id) to its
+        # (span_id, parent_span_id) so the closing callback can find it.
+        self._open_spans = {}
 
-    def _send_event(self, event_name: str, event_data: dict) -> None:
-        """Serializes and sends an event to the pipe."""
-        event = json.dumps({"event": event_name, "data": event_data})
+    def _send_event(
+        self,
+        event_name: str,
+        event_data: dict,
+        span_id: Optional[str] = None,
+        parent_span_id: Optional[str] = None,
+    ) -> None:
+        """Serializes and sends an event to the pipe, stamped with timing and correlation ids."""
+        event = json.dumps({
+            "event": event_name,
+            "data": event_data,
+            "ts": time.monotonic(),
+            "turn_id": _current_turn_id.get(),
+            "span_id": span_id,
+            "parent_span_id": parent_span_id,
+        })
         self._pipe_writer.write(event + "\n")
         self._pipe_writer.flush()
 
+    def _open_span(self, key) -> tuple:
+        """Starts a child span of the current span and makes it current."""
+        parent_span_id = _current_span_id.get()
+        span_id = _new_span_id()
+        self._open_spans[key] = (span_id, parent_span_id)
+        _current_span_id.set(span_id)
+        return span_id, parent_span_id
+
+    def _close_span(self, key) -> tuple:
+        """Ends the span opened under `key` and restores its parent as current."""
+        span_id, parent_span_id = self._open_spans.pop(key, (None, _current_span_id.get()))
+        _current_span_id.set(parent_span_id)
+        return span_id, parent_span_id
+
+    async def before_run_callback(self, *, invocation_context) -> None:
+        # The outermost run starts a new turn. Runs started while a turn is
+        # already active are sub-agent hops made through an AgentTool.
+        if _current_turn_id.get() is None:
+            _current_turn_id.set(invocation_context.invocation_id)
+        span_id, parent_span_id = self._open_span(("run", invocation_context.invocation_id))
+        self._send_event(
+            "on_run_start",
+            {"agent": invocation_context.agent.name},
+            span_id=span_id,
+            parent_span_id=parent_span_id,
+        )
+
+    async def after_run_callback(self, *, invocation_context) -> None:
+        span_id, parent_span_id = self._close_span(("run", invocation_context.invocation_id))
+        self._send_event(
+            "on_run_end",
+            {"agent": invocation_context.agent.name},
+            span_id=span_id,
+            parent_span_id=parent_span_id,
+        )
+        if parent_span_id is None:
+            _current_turn_id.set(None)
+
+    async def before_model_callback(self, *, callback_context, llm_request) -> None:
+        span_id, parent_span_id = self._open_span(("llm", callback_context.invocation_id, callback_context.agent_name))
+        self._send_event(
+            "on_llm_start",
+            {
+                "agent": callback_context.agent_name,
+                "model": llm_request.model,
+                "prompt": [content.model_dump(mode="json", exclude_none=True) for content in llm_request.contents],
+            },
+            span_id=span_id,
+            parent_span_id=parent_span_id,
+        )
+
+    async def after_model_callback(self, *, callback_context, llm_response) -> None:
+        if llm_response.partial:
+            return
+        span_id, parent_span_id = self._close_span(("llm", callback_context.invocation_id, callback_context.agent_name))
+        response = llm_response.content.model_dump(mode="json", exclude_none=True) if llm_response.content else None
+        event_data = {"agent": callback_context.agent_name, "response": response}
+        if (llm_response.custom_metadata or {}).get("llm_cache") == "hit":
+            event_data["cached"] = True
+        self._send_event(
+            "on_llm_end",
+            event_data,
+            span_id=span_id,
+            parent_span_id=parent_span_id,
+        )
+
     async def on_prompt_start(self, prompt: Content) -> None:
         self._send_event("on_prompt_start", {"prompt": prompt.to_dict()})
 
@@ -45,25 +141,44 @@ class EventStreamingPlugin(BasePlugin):
         self._send_event("on_tool_call_end", {"tool_result": tool_result.to_dict()})
 
     async def before_tool_callback(self, tool, tool_args, tool_context) -> None:
+        span_id, parent_span_id = self._open_span(("tool", getattr(tool_context, "function_call_id", None), tool.name))
         self._send_event(
             "before_tool_call",
-            {"tool_call": {"name": tool.name, "args": tool_args}},
+            {
+                "tool_call": {"name": tool.name, "args": tool_args},
+                "is_agent_tool": isinstance(tool, AgentTool),
+            },
+            span_id=span_id,
+            parent_span_id=parent_span_id,
         )
 
     async def after_tool_callback(
         self, tool, tool_args, tool_context, result
     ) -> None:
+        span_id, parent_span_id = self._close_span(("tool", getattr(tool_context, "function_call_id", None), tool.name))
         if isinstance(tool, AgentTool):
-            return  # Suppress event for agent-to-agent transfers
+            # Suppress event for agent-to-agent transfers. The timeline closes
+            # the hop when the sub-agent's own run ends.
+            return
 
         tool_result_payload = result
         if hasattr(result, "to_dict"):
             tool_result_payload = result.to_dict()
 
+        event_data = {
+            "tool_call": {"name": tool.name, "args": tool_args},
+            "tool_result": tool_result_payload,
+        }
+        # Memoized tools (see cached_tool) report whether this call was served from their cache.
+        cache_status = getattr(getattr(tool, "func", None), "cache_status", None)
+        if callable(cache_status):
+            status = cache_status(tool_args)
+            if status is not None:
+                event_data["cache"] = status
+
         self._send_event(
             "after_tool_call",
-            {
-                "tool_call": {"name": tool.name, "args": tool_args},
-                "tool_result": tool_result_payload,
-            },
-        )
\ No newline at end of file
+            event_data,
+            span_id=span_id,
+            parent_span_id=parent_span_id,
+        )
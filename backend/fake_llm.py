@@ -0,0 +1,197 @@
+import asyncio
+import json
+import random
+from typing import AsyncGenerator, Iterator, List, Optional
+
+from google.adk.models.base_llm import BaseLlm
+from google.adk.models.llm_request import LlmRequest
+from google.adk.models.llm_response import LlmResponse
+from google.adk.tools.agent_tool import AgentTool
+from google.genai import types
+from pydantic import PrivateAttr
+
+# Words used to build randomized responses.
+_VOCABULARY = (
+    "agent gallery supply chain shipment port carrier revenue impact risk order "
+    "inventory delay route mitigation forecast weather greeting response summary "
+    "analysis plan review status update alert contract supplier playbook"
+).split()
+
+
+class FakeLlm(BaseLlm):
+    """
+    An offline stand-in for a Gemini model, used to benchmark the gallery
+    without network access or quota.
+
+    By default the model calls every tool declared in the request once, in
+    declaration order, filling string arguments with the user's message, and
+    then answers with randomized text. Scripted rules can override the
+    response for specific agents or prompts.
+    """
+
+    model: str = "fake-llm"
+    agent_name: str = ""
+    latency: float = 0.0
+    tokens_per_second: float = 0.0
+    response_tokens: int = 32
+    seed: Optional[int] = None
+    script: List[dict] = []
+
+    _rng: random.Random = PrivateAttr()
+
+    def model_post_init(self, __context) -> None:
+        self._rng = random.Random(self.seed)
+
+    async def generate_content_async(
+        self, llm_request: LlmRequest, stream: bool = False
+    ) -> AsyncGenerator[LlmResponse, None]:
+        user_text, called_tools = self._read_turn(llm_request.contents)
+        function_call = None
+        text = None
+
+        rule = self._match_rule(user_text, called_tools)
+        if rule is not None:
+            if "function_call" in rule:
+                function_call = types.FunctionCall(
+                    name=rule["function_call"]["name"],
+                    args=rule["function_call"].get("args", {}),
+                )
+            else:
+                text = rule.get("text", "")
+        else:
+            function_call = self._next_tool_call(llm_request, user_text, called_tools)
+            if function_call is None:
+                text = " ".join(self._rng.choice(_VOCABULARY) for _ in range(self.response_tokens))
+
+        if self.latency:
+            await asyncio.sleep(self.latency)
+
+        usage = types.GenerateContentResponseUsageMetadata(
+            prompt_token_count=sum(len(json.dumps(c.model_dump(mode="json", exclude_none=True))) for c in llm_request.contents) // 4,
+            candidates_token_count=len(text.split()) if text else 1,
+        )
+
+        if function_call is not None:
+            yield LlmResponse(
+                content=types.Content(role="model", parts=[types.Part(function_call=function_call)]),
+                usage_metadata=usage,
+            )
+            return
+
+        words = text.split(" ")
+        delay = 1.0 / self.tokens_per_second if self.tokens_per_second else 0.0
+        if stream:
+            for index, word in enumerate(words):
+                if delay:
+                    await asyncio.sleep(delay)
+                chunk = word if index == 0 else f" {word}"
+                yield LlmResponse(
+                    content=types.Content(role="model", parts=[types.Part(text=chunk)]),
+                    partial=True,
+                )
+        elif delay:
+            await asyncio.sleep(delay * len(words))
+
+        yield LlmResponse(
+            content=types.Content(role="model", parts=[types.Part(text=text)]),
+            usage_metadata=usage,
+            turn_complete=True,
+        )
+
+    @staticmethod
+    def _read_turn(contents: List[types.Content]) -> tuple:
+        """Returns the latest user message and the tools already called in response to it."""
+        user_text = ""
+        called_tools = set()
+        for content in reversed(contents):
+            parts = content.parts or []
+            texts = [part.text for part in parts if part.text]
+            if content.role == "user" and texts and not any(part.function_response for part in parts):
+                user_text = "\n".join(texts)
+                break
+            for part in parts:
+                if part.function_call:
+                    called_tools.add(part.function_call.name)
+        return user_text, called_tools
+
+    def _match_rule(self, user_text: str, called_tools: set) -> Optional[dict]:
+        """Returns the first scripted rule that applies to this request, if any."""
+        for rule in self.script:
+            if rule.get("agent") and rule["agent"] != self.agent_name:
+                continue
+            if rule.get("match") and rule["match"].lower() not in user_text.lower():
+                continue
+            # A scripted call is made once per turn; the model answers after it.
+            if "function_call" in rule and rule["function_call"]["name"] in called_tools:
+                continue
+            return rule
+        return None
+
+    def _next_tool_call(self, llm_request: LlmRequest, user_text: str, called_tools: set) -> Optional[types.FunctionCall]:
+        """Builds a call to the first declared tool not yet called during this turn."""
+        for tool in (llm_request.config.tools if llm_request.config else None) or []:
+            for declaration in getattr(tool, "function_declarations", None) or []:
+                if declaration.name in called_tools:
+                    continue
+                return types.FunctionCall(
+                    name=declaration.name,
+                    args=self._fake_args(declaration, user_text),
+                )
+        return None
+
+    @staticmethod
+    def _fake_args(declaration: types.FunctionDeclaration, user_text: str) -> dict:
+        """Fills each declared parameter with a value of the declared type."""
+        if declaration.parameters_json_schema:
+            properties = {
+                name: str(schema.get("type", "string")).lower()
+                for name, schema in declaration.parameters_json_schema.get("properties", {}).items()
+            }
+        elif declaration.parameters and declaration.parameters.properties:
+            properties = {
+                name: str(schema.type.value if schema.type else "string").lower()
+                for name, schema in declaration.parameters.properties.items()
+            }
+        else:
+            properties = {}
+
+        placeholders = {"integer": 1, "number": 1.0, "boolean": False, "array": [user_text], "object": {}}
+        return {name: placeholders.get(type_name, user_text) for name, type_name in properties.items()}
+
+
+def iter_agents(agent) -> Iterator:
+    """Yields an agent, its sub-agents and every agent reachable through an AgentTool, each once."""
+    pending = [agent]
+    seen = set()
+    while pending:
+        current = pending.pop()
+        if id(current) in seen:
+            continue
+        seen.add(id(current))
+        yield current
+        pending.extend(getattr(current, "sub_agents", None) or [])
+        for tool in getattr(current, "tools", None) or []:
+            if isinstance(tool, AgentTool):
+                pending.append(tool.agent)
+
+
+def install_fake_llm(agent, **options) -> int:
+    """
+    Replaces the model of an agent, its sub-agents and every agent reachable
+    through an AgentTool with a FakeLlm. Returns the number of agents patched.
+    """
+    patched = 0
+    for current in iter_agents(agent):
+        if hasattr(current, "model"):
+            current.model = FakeLlm(model=f"fake-llm/{current.name}", agent_name=current.name, **options)
+            patched += 1
+    return patched
+
+
+def load_fake_llm_script(path: str) -> List[dict]:
+    """Loads a list of scripted response rules from a JSON file."""
+    with open(path, "r") as f:
+        script = json.load(f)
+    if not isinstance(script, list):
+        raise ValueError(f"Fake LLM script at {path} must be a JSON list of rules.")
+    return script
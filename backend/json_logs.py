@@ -0,0 +1,48 @@
+import json
+import logging
+
+# Record fields written by JsonLogFormatter and read back by the backend.
+LEVEL_FIELD = "level"
+MESSAGE_FIELD = "message"
+EXCEPTION_FIELD = "exc"
+
+
+class JsonLogFormatter(logging.Formatter):
+    """
+    Formats each log record as one line of JSON, so the backend reads a line's
+    level from a field instead of guessing it from the text, and a traceback
+    stays a single line.
+    """
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            LEVEL_FIELD: record.levelname,
+            "logger": record.name,
+            MESSAGE_FIELD: record.getMessage(),
+            "ts": record.created,
+        }
+        if record.exc_info:
+            entry[EXCEPTION_FIELD] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+
+def json_log_config(level: str = "INFO", root_level: str = "WARNING") -> dict:
+    """
+    Returns a logging dictConfig, usable as uvicorn's log_config, that writes
+    uvicorn's loggers at `level` and every other logger at `root_level` to
+    stderr as JSON.
+    """
+    return {
+        "version": 1,
+        "disable_existing_loggers": False,
+        "formatters": {"json": {"()": JsonLogFormatter}},
+        "handlers": {
+            "stderr": {"class": "logging.StreamHandler", "formatter": "json", "stream": "ext://sys.stderr"},
+        },
+        "loggers": {
+            "uvicorn": {"handlers": ["stderr"], "level": level, "propagate": False},
+            "uvicorn.error": {"level": level},
+            "uvicorn.access": {"handlers": ["stderr"], "level": level, "propagate": False},
+        },
+        "root": {"handlers": ["stderr"], "level": root_level},
+    }
@@ -0,0 +1,249 @@
+import hashlib
+import json
+import os
+import time
+from collections import OrderedDict
+from typing import Awaitable, Callable, Dict, List, Optional
+
+from google.adk.models.llm_request import LlmRequest
+from google.adk.models.llm_response import LlmResponse
+from google.adk.plugins import BasePlugin
+from pydantic import ValidationError
+
+# The parts of a response that are replayed on a hit. Streaming, live-session
+# and interaction bookkeeping belongs to the original call.
+_CACHED_FIELDS = {
+    "model_version", "content", "grounding_metadata", "citation_metadata",
+    "finish_reason", "usage_metadata", "turn_complete",
+}
+
+# Entries kept in the cache directory by default; the oldest are removed past it.
+MAX_DISK_ENTRIES = 4096
+
+# Request config fields that do not change what the model answers.
+_IGNORED_CONFIG_FIELDS = {"labels", "http_options"}
+
+
+def _strip_function_call_ids(content: dict) -> dict:
+    """
+    Removes the client-side ids ADK assigns to function calls and responses.
+    They are fresh for every call, so keeping them would make every request
+    that follows a tool call unique.
+    """
+    for part in content.get("parts") or []:
+        for field in ("function_call", "function_response"):
+            if part.get(field):
+                part[field].pop("id", None)
+    return content
+
+
+def request_cache_key(llm_request: LlmRequest) -> str:
+    """Hashes the model, system instruction, tool schema and contents of a request."""
+    config = llm_request.config.model_dump(exclude_none=True, exclude=_IGNORED_CONFIG_FIELDS) if llm_request.config else {}
+    payload = {
+        "model": llm_request.model,
+        "config": config,
+        "contents": [
+            _strip_function_call_ids(content.model_dump(mode="json", exclude_none=True))
+            for content in llm_request.contents
+        ],
+    }
+    # Unserializable config values (e.g. a response schema class) fall back to repr.
+    encoded = json.dumps(payload, sort_keys=True, default=repr).encode()
+    return hashlib.sha256(encoded).hexdigest()
+
+
+class LlmResponseCache:
+    """
+    An exact-match cache of model responses: a bounded in-memory LRU, backed
+    by an optional directory of JSON files that survives agent restarts.
+    Entries expire `ttl` seconds after they were stored (0 disables expiry).
+
+    Each file's modification time is set to when its entry was stored. When
+    a write takes the directory past `max_disk_entries`, expired files are
+    removed, then the oldest ones until a tenth of the room is free again.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 256,
+        ttl: float = 3600.0,
+        cache_dir: Optional[str] = None,
+        max_disk_entries: int = MAX_DISK_ENTRIES,
+    ):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.cache_dir = cache_dir
+        self.max_disk_entries = max_disk_entries
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self.stats: Dict[str, Dict[str, int]] = {}
+        self._disk_entries = 0
+        if cache_dir:
+            os.makedirs(cache_dir, exist_ok=True)
+            self._disk_entries = len(self._disk_files())
+
+    def _expired(self, stored_at: float) -> bool:
+        return bool(self.ttl) and time.time() - stored_at > self.ttl
+
+    def _disk_path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, f"{key}.json")
+
+    def _disk_files(self) -> List[str]:
+        return [os.path.join(self.cache_dir, name) for name in os.listdir(self.cache_dir) if name.endswith(".json")]
+
+    def _remove_disk_entry(self, path: str) -> None:
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+    def _sweep_disk(self) -> None:
+        """Removes expired entry files, then the oldest ones past 90% of `max_disk_entries`."""
+        files = []
+        for path in self._disk_files():
+            try:
+                stored_at = os.stat(path).st_mtime
+            except OSError:
+                continue
+            if self._expired(stored_at):
+                self._remove_disk_entry(path)
+            else:
+                files.append((stored_at, path))
+        files.sort()
+        excess = len(files) - self.max_disk_entries * 9 // 10
+        for _, path in files[:max(excess, 0)]:
+            self._remove_disk_entry(path)
+        self._disk_entries = len(files) - max(excess, 0)
+
+    def _count(self, agent_name: str, outcome: str) -> None:
+        counts = self.stats.setdefault(agent_name, {"hits": 0, "disk_hits": 0, "misses": 0})
+        counts[outcome] += 1
+
+    def _read_disk(self, key: str) -> Optional[tuple]:
+        path = self._disk_path(key)
+        try:
+            with open(path, "r") as f:
+                entry = json.load(f)
+        except OSError:
+            return None
+        except ValueError:
+            # Truncated or not JSON; removed so it is not read again.
+            self._remove_disk_entry(path)
+            return None
+        try:
+            stored_at, response = float(entry["stored_at"]), entry["response"]
+            if not isinstance(response, dict):
+                raise TypeError(f"response is a {type(response).__name__}")
+        except (KeyError, TypeError, ValueError):
+            # Written by something else, or by an older layout; a miss rather than a failed model call.
+            self._remove_disk_entry(path)
+            return None
+        if self._expired(stored_at):
+            self._remove_disk_entry(path)
+            return None
+        return stored_at, response
+
+    def _remember(self, key: str, entry: tuple) -> None:
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def get(self, key: str, agent_name: str) -> Optional[dict]:
+        """Returns the stored response for a key, or None on a miss."""
+        entry = self._entries.get(key)
+        if entry is not None and self._expired(entry[0]):
+            del self._entries[key]
+            entry = None
+        if entry is not None:
+            self._entries.move_to_end(key)
+            self._count(agent_name, "hits")
+            return entry[1]
+
+        if self.cache_dir:
+            entry = self._read_disk(key)
+            if entry is not None:
+                self._remember(key, entry)
+                self._count(agent_name, "disk_hits")
+                return entry[1]
+
+        self._count(agent_name, "misses")
+        return None
+
+    def put(self, key: str, response: dict) -> None:
+        entry = (time.time(), response)
+        self._remember(key, entry)
+        if self.cache_dir:
+            # Written to a temporary file first so a concurrent reader never sees half an entry.
+            path = self._disk_path(key)
+            with open(f"{path}.tmp", "w") as f:
+                json.dump({"stored_at": entry[0], "response": response}, f)
+            os.utime(f"{path}.tmp", (entry[0], entry[0]))
+            os.replace(f"{path}.tmp", path)
+            self._disk_entries += 1
+            if self._disk_entries > self.max_disk_entries:
+                self._sweep_disk()
+
+    def get_stats(self) -> dict:
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "ttl_s": self.ttl,
+            "cache_dir": self.cache_dir,
+            "agents": self.stats,
+        }
+
+
+class LlmResponseCachePlugin(BasePlugin):
+    """
+    Answers repeated model requests from an LlmResponseCache instead of
+    calling the model.
+
+    ADK skips the remaining before-model and all after-model callbacks when a
+    plugin supplies the response, so `on_hit` is called with the cached
+    response to let plugins registered earlier (e.g. event streaming) see it.
+    """
+
+    def __init__(
+        self,
+        cache: LlmResponseCache,
+        on_hit: Optional[Callable[..., Awaitable[None]]] = None,
+    ):
+        self.name = "llm_response_cache_plugin"
+        self.cache = cache
+        self._on_hit = on_hit
+        # Keys of requests that missed, waiting for the model's response.
+        self._pending_keys: Dict[tuple, str] = {}
+
+    @staticmethod
+    def _request_id(callback_context) -> tuple:
+        return (callback_context.invocation_id, callback_context.agent_name)
+
+    async def before_model_callback(self, *, callback_context, llm_request) -> Optional[LlmResponse]:
+        key = request_cache_key(llm_request)
+        cached = self.cache.get(key, callback_context.agent_name)
+        if cached is None:
+            self._pending_keys[self._request_id(callback_context)] = key
+            return None
+
+        try:
+            llm_response = LlmResponse.model_validate(cached)
+        except ValidationError:
+            # A stored response this ADK version cannot read is treated as a miss and replaced.
+            self._pending_keys[self._request_id(callback_context)] = key
+            return None
+        llm_response.custom_metadata = {"llm_cache": "hit"}
+        if self._on_hit is not None:
+            await self._on_hit(callback_context=callback_context, llm_response=llm_response)
+        return llm_response
+
+    async def after_model_callback(self, *, callback_context, llm_response) -> None:
+        if llm_response.partial:
+            return
+        key = self._pending_keys.pop(self._request_id(callback_context), None)
+        if key is None or llm_response.error_code or not llm_response.content:
+            return
+        response = llm_response.model_dump(mode="json", exclude_none=True, include=_CACHED_FIELDS)
+        if response.get("content"):
+            _strip_function_call_ids(response["content"])
+        self.cache.put(key, response)
@@ -0,0 +1,117 @@
+import itertools
+import json
+import re
+import time
+import uuid
+from collections import deque
+from typing import Deque, Dict, List, Optional
+
+from backend.connection_manager import manager
+
+# Lines sent to a /ws client for each agent when it connects.
+LOG_BACKFILL_LINES = 100
+
+_ERROR_PREFIX = re.compile(r"^\[(ERROR|PIP_ERROR|FATAL)\]")
+_LEVEL_WORD = re.compile(r"\b(CRITICAL|ERROR|WARNING|WARN|DEBUG)\b")
+_LEVELS = {"CRITICAL": "error", "ERROR": "error", "WARNING": "warning", "WARN": "warning", "DEBUG": "debug"}
+# Levels in increasing severity, for per-agent thresholds.
+LEVEL_ORDER = {"debug": 0, "info": 1, "warning": 2, "error": 3}
+
+
+def normalize_level(name: Optional[str]) -> str:
+    """Maps a level name such as "WARNING" or "critical" to one of LEVEL_ORDER, defaulting to "info"."""
+    name = (name or "").upper()
+    return _LEVELS.get(name, "info")
+
+
+def level_enabled(level: str, threshold: str) -> bool:
+    """Returns True if a line at `level` passes an agent's `threshold`."""
+    return LEVEL_ORDER[level] >= LEVEL_ORDER.get(threshold, 0)
+
+
+def classify_level(line: str) -> str:
+    """Returns the level of a log line: "error", "warning", "debug" or "info"."""
+    if _ERROR_PREFIX.match(line):
+        return "error"
+    match = _LEVEL_WORD.search(line, 0, 80)
+    return _LEVELS[match.group(1)] if match else "info"
+
+
+class LogRingBuffer:
+    """The most recent log lines of one agent, bounded by both line count and total bytes."""
+
+    def __init__(self, max_lines: int, max_bytes: int):
+        self.max_lines = max_lines
+        self.max_bytes = max_bytes
+        self._entries: Deque[dict] = deque()
+        self._bytes = 0
+
+    def append(self, entry: dict) -> None:
+        self._entries.append(entry)
+        self._bytes += len(entry["line"])
+        while self._entries and (len(self._entries) > self.max_lines or self._bytes > self.max_bytes):
+            self._bytes -= len(self._entries.popleft()["line"])
+
+    def tail(self, limit: int, before: Optional[int] = None) -> List[dict]:
+        """Returns up to `limit` of the newest lines, only counting lines older than `before` if given."""
+        lines = []
+        for entry in reversed(self._entries):
+            if len(lines) >= limit:
+                break
+            if before is None or entry["seq"] < before:
+                lines.append(entry)
+        lines.reverse()
+        return lines
+
+    @property
+    def oldest_seq(self) -> Optional[int]:
+        return self._entries[0]["seq"] if self._entries else None
+
+
+class LogStore:
+    """
+    Keeps a ring buffer of log lines per agent, so clients that connect late
+    can still see what an agent logged during startup. Every line gets a
+    sequence number, unique across agents, that clients use to skip lines
+    they have already shown. Numbering restarts with the backend, which
+    clients detect through a change of `instance_id`.
+    """
+
+    def __init__(self, max_lines: int = 2000, max_bytes: int = 1024 * 1024):
+        self.max_lines = max_lines
+        self.max_bytes = max_bytes
+        self.instance_id = uuid.uuid4().hex
+        self._buffers: Dict[str, LogRingBuffer] = {}
+        self._seq = itertools.count(1)
+
+    def append(self, agent: str, line: str, level: Optional[str] = None) -> dict:
+        entry = {"seq": next(self._seq), "ts": time.time(), "level": level or classify_level(line), "line": line}
+        buffer = self._buffers.get(agent)
+        if buffer is None:
+            buffer = self._buffers[agent] = LogRingBuffer(self.max_lines, self.max_bytes)
+        buffer.append(entry)
+        return entry
+
+    def agents(self) -> List[str]:
+        return list(self._buffers)
+
+    def tail(self, agent: str, limit: int, before: Optional[int] = None) -> List[dict]:
+        buffer = self._buffers.get(agent)
+        return buffer.tail(limit, before) if buffer else []
+
+    def has_older(self, agent: str, seq: int) -> bool:
+        """Returns True if the agent's buffer still holds lines older than `seq`."""
+        buffer = self._buffers.get(agent)
+        return buffer is not None and buffer.oldest_seq is not None and buffer.oldest_seq < seq
+
+    def clear(self, agent: str) -> None:
+        self._buffers.pop(agent, None)
+
+
+log_store = LogStore()
+
+
+async def broadcast_log(agent: str, line: str, level: Optional[str] = None) -> None:
+    """Records a log line for an agent and broadcasts it to every client. The level is classified from the line if not given."""
+    entry = log_store.append(agent, line, level)
+    await manager.broadcast(json.dumps({"type": "log", "agent": agent, **entry}))
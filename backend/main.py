@@ -2,49 +2,80 @@ import asyncio
 import json
 import os
 import re
-import yaml
-from fastapi import FastAPI, WebSocket, WebSocketDisconnect, HTTPException
-from fastapi.responses import FileResponse
+import time
+import uuid
+import httpx
+from fastapi import FastAPI, WebSocket, WebSocketDisconnect, HTTPException, Request, Response
+from fastapi.responses import FileResponse, JSONResponse, StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
-from typing import Dict
+from typing import AsyncIterator, Dict, List, Optional
 from backend.config import AgentConfig
+from backend.config_watcher import ConfigWatcher, agent_changes, diff_gallery_config, diff_is_empty, roots_by_path
 from pydantic import BaseModel
-import multiprocessing as mp
-from backend.a2a_agent_runner import A2AAgentRunner
+from backend.a2a_proxy import STREAMING_METHODS, TURN_METHODS, a2a_proxy
+from backend.base_agent_runner import BaseAgentRunner
 from backend.connection_manager import manager, running_processes, starting_agents, startup_lock
-from backend.agent_runner import AgentRunner
+from backend.dependency_cache import dependency_cache
+from backend.event_log import event_log
+from backend.log_buffer import LOG_BACKFILL_LINES, broadcast_log, log_store
+from backend.startup_profiler import startup_profiles
+from backend.turn_metrics import AdmissionRejected, AgentTurnMetrics, turn_metrics
+from backend.turn_timeline import timeline_store
 
 PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
 
 app = FastAPI()
 
+CONFIG_PATH = os.path.join(PROJECT_ROOT, "gallery.config.yaml")
+
+def read_gallery_config(path: str = CONFIG_PATH) -> dict:
+    """Reads and parses a gallery config, raising if it is missing or invalid."""
+    # Imported lazily; the parser is only needed when the config is (re)loaded.
+    import yaml
+
+    with open(path, "r") as f:
+        config = yaml.safe_load(f)
+    # An empty document is usually a file caught mid-save, so it is rejected rather than read as no agent roots.
+    if config is None:
+        raise ValueError("the config is empty")
+    if not isinstance(config, dict):
+        raise ValueError("the top level of the config must be a mapping")
+    return config
+
+def load_gallery_config() -> dict:
+    """Reads gallery.config.yaml, returning an empty config if it is missing or invalid."""
+    try:
+        return read_gallery_config()
+    except FileNotFoundError:
+        print("gallery.config.yaml not found. Using default settings.")
+    except Exception as e:
+        print(f"Error parsing gallery.config.yaml: {e}")
+    return {}
+
+def parse_agent_configs(config: dict) -> Dict[str, AgentConfig]:
+    """Parses agent-specific configurations, raising if any is invalid."""
+    agent_configs = {}
+    raw_agent_configs = config.get("agent_configs", {})
+    if isinstance(raw_agent_configs, dict):
+        for agent_id, agent_config in raw_agent_configs.items():
+            agent_configs[agent_id] = AgentConfig(**agent_config)
+    return agent_configs
+
 # Load gallery configuration
-CONFIG = {}
-try:
-    with open(os.path.join(PROJECT_ROOT, "gallery.config.yaml"), "r") as f:
-        CONFIG = yaml.safe_load(f)
-except FileNotFoundError:
-    print("gallery.config.yaml not found. Using default settings.")
-except yaml.YAMLError as e:
-    print(f"Error parsing gallery.config.yaml: {e}")
-
-class AgentConfig(BaseModel):
-    """Represents the runtime configuration for a single agent."""
-    type: str = "adk"
-    dependencies: str = "requirements.txt"
-    entrypoint: str = ""
+CONFIG = load_gallery_config()
 
 # Parse agent-specific configurations with defaults
-AGENT_CONFIGS: Dict[str, AgentConfig] = {}
-_raw_agent_configs = CONFIG.get("agent_configs", {})
-if isinstance(_raw_agent_configs, dict):
-    for agent_id, config in _raw_agent_configs.items():
-        AGENT_CONFIGS[agent_id] = AgentConfig(**config)
+AGENT_CONFIGS: Dict[str, AgentConfig] = parse_agent_configs(CONFIG)
 
 def get_agent_config(agent_id: str) -> AgentConfig:
     """Returns the specific or default configuration for a given agent."""
     return AGENT_CONFIGS.get(agent_id, AgentConfig())
 
+def get_turn_metrics(agent_id: str) -> AgentTurnMetrics:
+    """Returns the admission control and latency metrics shared by all turns sent to an agent."""
+    config = get_agent_config(agent_id)
+    return turn_metrics.get(agent_id, config.max_concurrent_turns, config.max_queued_turns)
+
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],  # Allows all origins
@@ -57,6 +88,16 @@ class TurnRequest(BaseModel):
     agent_name: str
     prompt: str
 
+class TurnBatchRequest(BaseModel):
+    agent_name: str
+    prompts: List[str]
+    isolated_sessions: bool = False
+    keep_sessions: bool = False
+    concurrency: int = 4
+
+# Upper bound on the turns of a batch that run against an agent at once.
+MAX_BATCH_CONCURRENCY = 32
+
 @app.on_event("shutdown")
 async def shutdown_event():
     """Gracefully terminate all running agent subprocesses on server shutdown."""
@@ -64,12 +105,87 @@ async def shutdown_event():
     for agent_name, agent_info in list(running_processes.items()):
         if isinstance(agent_info, dict) and "runner" in agent_info:
             runner = agent_info["runner"]
-            if isinstance(runner, (AgentRunner, A2AAgentRunner)):
+            if isinstance(runner, BaseAgentRunner):
                 print(f"Stopping agent: {agent_name}")
                 await runner.stop()
     running_processes.clear()
+    await a2a_proxy.aclose()
+    event_log.close()
+    config_watcher.stop()
     print("All agent processes terminated.")
 
+# Agent listings per root path, reused while the root's files and entry are unchanged.
+_root_scan_cache: Dict[str, tuple] = {}
+
+def _agent_root_signature(agents_dir: str) -> tuple:
+    """
+    Returns the modification times that an agent root's listing depends on:
+    the root directory's, for agents added or removed, and each agent
+    directory's and agent.py's, for descriptions edited in place.
+    """
+    root_mtime = os.stat(agents_dir).st_mtime_ns
+    agents = []
+    for entry in os.scandir(agents_dir):
+        if not entry.is_dir():
+            continue
+        try:
+            agent_py_mtime = os.stat(_get_agent_py_path(entry.path)).st_mtime_ns
+        except (HTTPException, OSError):
+            agent_py_mtime = None
+        agents.append((entry.name, entry.stat().st_mtime_ns, agent_py_mtime))
+    return root_mtime, tuple(sorted(agents))
+
+def _scan_agent_root(root: dict, agent_configs: Dict[str, AgentConfig]) -> List[dict]:
+    """Lists the agents in one agent root, reusing the last listing if neither its files nor the root changed."""
+    agents_dir = os.path.join(PROJECT_ROOT, root.get("path"))
+    exclusions = root.get("exclude", [])
+
+    try:
+        signature = (_agent_root_signature(agents_dir), tuple(exclusions))
+    except FileNotFoundError:
+        print(f"Warning: Agent directory not found: {agents_dir}")
+        return []
+    cached = _root_scan_cache.get(root.get("path"))
+    if cached is not None and cached[0] == signature:
+        return cached[1]
+
+    agents = []
+    for agent_name in sorted(os.listdir(agents_dir)):
+        if agent_name in exclusions or agent_name.startswith('.'):
+            continue
+
+        agent_path = os.path.join(agents_dir, agent_name)
+        if os.path.isdir(agent_path):
+            description = f"The {agent_name} agent."  # Default description
+            
+            # Construct the full agent ID to look up its type
+            agent_id = os.path.join(root.get("path"), agent_name)
+            agent_type = agent_configs.get(agent_id, AgentConfig()).type
+
+            # For ADK agents, attempt to read a more specific description from the agent's code
+            if agent_type == "adk":
+                try:
+                    agent_py_path = _get_agent_py_path(agent_path)
+                    with open(agent_py_path, "r") as f:
+                        content = f.read()
+                        match = re.search(r'description=\(?\s*["\']([^"\']+)["\']', content, re.DOTALL)
+                        if match:
+                            description = match.group(1).strip()
+                except HTTPException:
+                    # This is expected for A2A agents, so we just log a warning.
+                    print(f"Warning: Could not find agent.py for ADK agent '{agent_name}'. Using default description.")
+                except Exception as e:
+                    print(f"Could not read description for {agent_name}: {e}")
+
+            agents.append({
+                "id": agent_id,
+                "name": agent_name,
+                "description": description,
+                "type": agent_type,
+            })
+    _root_scan_cache[root.get("path")] = (signature, agents)
+    return agents
+
 @app.get("/agents")
 async def get_agents():
     """Scans agent directories defined in the config and returns a list of available agents."""
@@ -80,47 +196,58 @@ async def get_agents():
         return []
 
     for root in agent_roots:
-        agents_dir = os.path.join(PROJECT_ROOT, root.get("path"))
-        exclusions = root.get("exclude", [])
-        
-        if not os.path.exists(agents_dir):
-            print(f"Warning: Agent directory not found: {agents_dir}")
-            continue
+        agents.extend(_scan_agent_root(root, AGENT_CONFIGS))
+    return agents
 
-        for agent_name in os.listdir(agents_dir):
-            if agent_name in exclusions or agent_name.startswith('.'):
-                continue
 
-            agent_path = os.path.join(agents_dir, agent_name)
-            if os.path.isdir(agent_path):
-                description = f"The {agent_name} agent."  # Default description
-                
-                # Construct the full agent ID to look up its type
-                agent_id = os.path.join(root.get("path"), agent_name)
-                agent_type = get_agent_config(agent_id).type
+async def apply_gallery_config(new_config: dict) -> dict:
+    """
+    Swaps in a reloaded gallery config and broadcasts what changed as a
+    `config_delta` message. Only the roots that were added or changed, or
+    that hold an agent whose config changed, are rescanned. Running agents
+    are left as they are; those whose config changed are reported as
+    needing a restart to pick it up.
+    """
+    global CONFIG, AGENT_CONFIGS, IDLE_STOP_SECONDS
+    diff = diff_gallery_config(CONFIG, new_config)
+    if diff_is_empty(diff):
+        return diff
+    # Everything that can fail is done before anything is swapped, so a bad config leaves the old one in place.
+    new_agent_configs = parse_agent_configs(new_config)
+    idle_stop_seconds = float(new_config.get("idle_stop_seconds", 30))
+
+    old_roots, new_roots = roots_by_path(CONFIG), roots_by_path(new_config)
+    affected = set(diff["roots_added"]) | set(diff["roots_removed"]) | set(diff["roots_changed"])
+    for agent_id in diff["agent_configs_changed"]:
+        affected.update(path for path in old_roots.keys() | new_roots.keys() if agent_id.startswith(path.rstrip("/") + "/"))
+    old_agents = [agent for path in sorted(affected) if path in old_roots for agent in _scan_agent_root(old_roots[path], AGENT_CONFIGS)]
+
+    CONFIG, AGENT_CONFIGS, IDLE_STOP_SECONDS = new_config, new_agent_configs, idle_stop_seconds
+    for path in affected:
+        _root_scan_cache.pop(path, None)
+    new_agents = [agent for path in sorted(affected) if path in new_roots for agent in _scan_agent_root(new_roots[path], AGENT_CONFIGS)]
+
+    delta = {
+        **diff,
+        **agent_changes(old_agents, new_agents),
+        "restart_required": [agent_id for agent_id in diff["agent_configs_changed"] if agent_id in running_processes],
+    }
+    print(f"Reloaded gallery.config.yaml: {', '.join(key for key, value in diff.items() if value)} changed.")
+    await manager.broadcast(json.dumps({"type": "config_delta", "data": CONFIG.get("agent_roots", []), **delta}))
+    return delta
 
-                # For ADK agents, attempt to read a more specific description from the agent's code
-                if agent_type == "adk":
-                    try:
-                        agent_py_path = _get_agent_py_path(agent_path)
-                        with open(agent_py_path, "r") as f:
-                            content = f.read()
-                            match = re.search(r'description=\(?\s*["\']([^"\']+)["\']', content, re.DOTALL)
-                            if match:
-                                description = match.group(1).strip()
-                    except HTTPException:
-                        # This is expected for A2A agents, so we just log a warning.
-                        print(f"Warning: Could not find agent.py for ADK agent '{agent_name}'. Using default description.")
-                    except Exception as e:
-                        print(f"Could not read description for {agent_name}: {e}")
-
-                agents.append({
-                    "id": agent_id,
-                    "name": agent_name,
-                    "description": description,
-                    "type": agent_type,
-                })
-    return agents
+config_watcher = ConfigWatcher(
+    CONFIG_PATH, read_gallery_config, apply_gallery_config,
+    interval=float(os.environ.get("GALLERY_CONFIG_POLL_SECONDS", "2")),
+)
+
+@app.on_event("startup")
+async def startup_event():
+    """Starts watching gallery.config.yaml for changes and prefetching agent dependencies, unless disabled."""
+    if config_watcher.interval > 0:
+        config_watcher.start()
+    if os.environ.get("GALLERY_PREFETCH_DEPENDENCIES", "1").lower() in ("1", "true", "yes"):
+        asyncio.create_task(prefetch_agent_dependencies())
 
 
 def _get_agent_py_path(agent_path: str) -> str:
@@ -274,6 +401,18 @@ async def get_agent_static_file(agent_name: str, file_path: str):
     return FileResponse(static_file_path)
 
 
+@app.get("/agents/{agent_name:path}/timeline")
+async def get_agent_timeline(agent_name: str, limit: int = 20):
+    """Returns the span timelines of the most recent turns run by a specified agent."""
+    return {"agent": agent_name, "turns": timeline_store.get_turns(agent_name, limit)}
+
+
+@app.get("/agents/{agent_name:path}/startup_profile")
+async def get_agent_startup_profile(agent_name: str, top: int = 25):
+    """Returns the startup timings recorded for the most recent launches of a specified agent."""
+    return {"agent": agent_name, "launches": startup_profiles.get_profiles(agent_name, top)}
+
+
 @app.post("/run_turn")
 async def run_turn(request: TurnRequest):
     """Runs a single turn of the agent."""
@@ -287,13 +426,224 @@ async def run_turn(request: TurnRequest):
     runner = agent_info["runner"]
     
     # The runner now returns a dictionary with "response" and "events"
-    turn_result = await runner.run_turn(prompt)
+    try:
+        turn_result = await _run_tracked_turn(runner, get_turn_metrics(agent_path), prompt)
+    except AdmissionRejected as e:
+        raise HTTPException(status_code=429, detail=f"Agent '{agent_path}' is busy: {e}.")
+    if "error" in turn_result:
+        raise HTTPException(status_code=502, detail=f"Agent '{agent_path}' failed: {turn_result['error']}")
     return turn_result
 
+async def _run_tracked_turn(runner: BaseAgentRunner, metrics: AgentTurnMetrics, prompt: str, **options) -> dict:
+    """Runs a turn in one of the agent's slots, counting it as an error if it raises or its result is an error."""
+    started = await metrics.acquire()
+    turn_result = None
+    try:
+        turn_result = await runner.run_turn(prompt, **options)
+        return turn_result
+    finally:
+        metrics.release(started, error=turn_result is None or "error" in turn_result)
+
+async def _run_turn_batch(runner: BaseAgentRunner, request: TurnBatchRequest) -> AsyncIterator[str]:
+    """Runs a batch of turns and yields an NDJSON line for each as it finishes, then a summary line."""
+    # Turns sharing the agent's session run one at a time so each sees the previous one's history.
+    concurrency = max(1, min(request.concurrency, MAX_BATCH_CONCURRENCY)) if request.isolated_sessions else 1
+    semaphore = asyncio.Semaphore(concurrency)
+    batch_id = uuid.uuid4().hex[:8]
+    metrics = get_turn_metrics(request.agent_name)
+    batch_started = time.perf_counter()
+
+    async def run_item(index: int, prompt: str) -> dict:
+        session_id = f"batch-{batch_id}-{index}" if request.isolated_sessions else None
+        async with semaphore:
+            started = time.perf_counter()
+            try:
+                item = await _run_tracked_turn(
+                    runner, metrics, prompt, session_id=session_id, discard_session=not request.keep_sessions
+                )
+            except Exception as e:
+                item = {"error": f"{type(e).__name__}: {e}"}
+        item = {"index": index, **item, "latency_ms": round((time.perf_counter() - started) * 1000, 3)}
+        if session_id and request.keep_sessions:
+            item["session_id"] = session_id
+        return item
+
+    tasks = [asyncio.create_task(run_item(index, prompt)) for index, prompt in enumerate(request.prompts)]
+    errors = 0
+    try:
+        for finished in asyncio.as_completed(tasks):
+            item = await finished
+            errors += "error" in item
+            yield json.dumps(item) + "\n"
+    finally:
+        # A client that disconnects mid-batch cancels the turns not yet run.
+        for task in tasks:
+            task.cancel()
+    yield json.dumps({"summary": {
+        "turns": len(tasks),
+        "errors": errors,
+        "concurrency": concurrency,
+        "elapsed_ms": round((time.perf_counter() - batch_started) * 1000, 3),
+    }}) + "\n"
+
+@app.post("/run_turns")
+async def run_turns(request: TurnBatchRequest):
+    """
+    Runs many prompts against one agent, concurrently when each turn has an
+    isolated session, and streams NDJSON results in the order they finish.
+    """
+    if request.agent_name not in running_processes:
+        raise HTTPException(status_code=404, detail=f"Agent '{request.agent_name}' not found or not running.")
+    runner = running_processes[request.agent_name]["runner"]
+    return StreamingResponse(_run_turn_batch(runner, request), media_type="application/x-ndjson")
+
+@app.get("/agents/{agent_name:path}/logs")
+async def get_agent_logs(agent_name: str, before: Optional[int] = None, limit: int = 100):
+    """
+    Returns a page of an agent's buffered log lines, oldest first. Pass the
+    `seq` of the oldest line already shown as `before` to page further back.
+    """
+    agent = os.path.basename(agent_name)
+    lines = log_store.tail(agent, max(1, min(limit, 1000)), before)
+    return {
+        "agent": agent,
+        "lines": lines,
+        "has_more": bool(lines) and log_store.has_older(agent, lines[0]["seq"]),
+    }
+
+@app.get("/agents/{agent_name:path}/events")
+async def get_agent_events(agent_name: str, after_seq: int = 0, limit: int = 100, turn_id: Optional[str] = None):
+    """
+    Replays a page of an agent's persisted events as NDJSON, oldest first.
+    Pass the `X-Next-Seq` header of a page as `after_seq` to fetch the next
+    one; a page shorter than `limit` means the log is caught up. With
+    `turn_id`, returns the events of that turn instead.
+    """
+    if not event_log.has_agent(agent_name):
+        raise HTTPException(status_code=404, detail=f"No events recorded for agent '{agent_name}'.")
+    log = event_log.for_agent(agent_name)
+    limit = max(1, min(limit, 1000))
+    if turn_id is not None:
+        return Response(content=log.read_turn(turn_id, limit), media_type="application/x-ndjson")
+    body, next_seq = log.read(after_seq, limit)
+    return Response(content=body, media_type="application/x-ndjson", headers={"X-Next-Seq": str(next_seq)})
+
+@app.get("/agents/{agent_name:path}/turn_metrics")
+async def get_agent_turn_metrics(agent_name: str):
+    """Returns the admission counters and turn latency of a specified agent."""
+    return {"agent": agent_name, "metrics": turn_metrics.snapshot(agent_name)}
+
+def _a2a_agent_url(agent_name: str) -> str:
+    agent_info = running_processes.get(agent_name)
+    if not agent_info or get_agent_config(agent_name).type != "a2a":
+        raise HTTPException(status_code=404, detail=f"A2A agent '{agent_name}' not found or not running.")
+    return agent_info["url"]
+
+@app.get("/a2a/{agent_name:path}/card")
+async def get_a2a_agent_card(agent_name: str, request: Request):
+    """Returns the cached agent card of a running A2A agent, honoring If-None-Match."""
+    try:
+        entry = await a2a_proxy.get_agent_card(_a2a_agent_url(agent_name))
+    except (httpx.HTTPError, ValueError) as e:
+        raise HTTPException(status_code=502, detail=f"Could not fetch the agent card: {e}")
+    headers = {"ETag": entry["etag"], "Cache-Control": "no-cache"}
+    if request.headers.get("if-none-match") == entry["etag"]:
+        return Response(status_code=304, headers=headers)
+    return JSONResponse(entry["card"], headers=headers)
+
+@app.post("/a2a/{agent_name:path}/rpc")
+async def proxy_a2a_rpc(agent_name: str, request: Request):
+    """
+    Forwards an A2A JSON-RPC request to a running A2A agent. Streaming methods
+    are relayed as server-sent events as they arrive; turns are subject to the
+    agent's admission control and recorded in its turn metrics.
+    """
+    base_url = _a2a_agent_url(agent_name)
+    try:
+        payload = await request.json()
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Request body must be a JSON-RPC object.")
+    method = payload.get("method") if isinstance(payload, dict) else None
+
+    metrics = get_turn_metrics(agent_name) if method in TURN_METHODS else None
+    started = None
+    if metrics is not None:
+        try:
+            started = await metrics.acquire()
+        except AdmissionRejected as e:
+            raise HTTPException(status_code=429, detail=f"Agent '{agent_name}' is busy: {e}.")
+
+    try:
+        if method in STREAMING_METHODS:
+            upstream = await a2a_proxy.open_stream(base_url, payload)
+        else:
+            upstream = await a2a_proxy.post_rpc(base_url, payload)
+    except httpx.HTTPError as e:
+        if metrics is not None:
+            metrics.release(started, error=True)
+        raise HTTPException(status_code=502, detail=f"Could not reach the agent: {e}")
+
+    if method not in STREAMING_METHODS:
+        if metrics is not None:
+            try:
+                failed = upstream.is_error or "error" in upstream.json()
+            except ValueError:
+                failed = True
+            metrics.release(started, error=failed)
+        return Response(content=upstream.content, status_code=upstream.status_code, media_type=upstream.headers.get("content-type"))
+
+    async def relay() -> AsyncIterator[bytes]:
+        error = True
+        try:
+            async for chunk in upstream.aiter_raw():
+                yield chunk
+            error = upstream.is_error
+        finally:
+            await upstream.aclose()
+            if metrics is not None:
+                metrics.release(started, error=error)
+
+    return StreamingResponse(relay(), status_code=upstream.status_code, media_type=upstream.headers.get("content-type", "text/event-stream"))
+
+def create_runner(agent_path: str, port: int) -> BaseAgentRunner:
+    """Runner Factory: returns the runner for an agent's configured type."""
+    agent_abs_path = os.path.join(PROJECT_ROOT, agent_path)
+    config = get_agent_config(agent_path)
+
+    # Runners are imported on first use to keep backend startup light.
+    if config.type == "a2a":
+        from backend.a2a_agent_runner import A2AAgentRunner
+        return A2AAgentRunner(
+            agent_path=agent_path,
+            agent_abs_path=agent_abs_path,
+            port=port,
+            config=config
+        )
+    else: # Default to "adk"
+        from backend.agent_runner import AgentRunner
+        return AgentRunner(
+            agent_path=agent_path,
+            agent_abs_path=agent_abs_path,
+            port=port,
+            config=config
+        )
+
+async def prefetch_agent_dependencies():
+    """Installs the shared uv and downloads the dependencies of every discovered agent into the wheelhouse, one agent at a time."""
+    try:
+        await dependency_cache.ensure_uv()
+    except RuntimeError as e:
+        print(e)
+    for agent in await get_agents():
+        try:
+            await create_runner(agent["id"], port=0).prefetch_dependencies()
+        except Exception as e:
+            print(f"Could not prefetch dependencies for {agent['id']}: {e}")
+
 async def start_agent_process(agent_path: str, port: int):
     """Starts and monitors an agent, ensuring cleanup on termination."""
     agent_name_for_display = os.path.basename(agent_path)
-    await manager.broadcast(json.dumps({"type": "log", "agent": agent_name_for_display, "line": "Agent startup process started."}))
+    await broadcast_log(agent_name_for_display, "Agent startup process started.")
     
     async with startup_lock:
         if agent_path in running_processes or agent_path in starting_agents:
@@ -308,24 +658,7 @@ async def start_agent_process(agent_path: str, port: int):
         if not os.path.isdir(agent_abs_path):
             raise FileNotFoundError(f"Agent directory '{agent_path}' not found.")
 
-        # Runner Factory
-        config = get_agent_config(agent_path)
-
-        if config.type == "a2a":
-            runner = A2AAgentRunner(
-                agent_path=agent_path,
-                agent_abs_path=agent_abs_path,
-                port=port,
-                config=config
-            )
-        else: # Default to "adk"
-            runner = AgentRunner(
-                agent_path=agent_path,
-                agent_abs_path=agent_abs_path,
-                port=port,
-                config=config
-            )
-        
+        runner = create_runner(agent_path, port)
         await runner.start()
 
         agent_url = f"http://localhost:{port}"
@@ -349,10 +682,11 @@ async def start_agent_process(agent_path: str, port: int):
     except Exception as e:
         error_msg = f"An unexpected error occurred while starting {agent_path}: {e}"
         print(error_msg)
-        await manager.broadcast(json.dumps({"type": "log", "agent": agent_name_for_display, "line": f"[FATAL] {error_msg}"}))
+        await broadcast_log(agent_name_for_display, f"[FATAL] {error_msg}")
         await manager.broadcast(json.dumps({"type": "status", "agent": agent_path, "status": "failed"}))
     finally:
         print(f"--- DEBUG: Cleaning up state for '{agent_path}'.")
+        a2a_proxy.forget(f"http://localhost:{port}")
         if agent_path in running_processes:
             del running_processes[agent_path]
         if agent_path in starting_agents:
@@ -381,28 +715,64 @@ async def stop_all_agents():
     for agent_name in list(running_processes.keys()):
         await stop_agent_process(agent_name)
 
+# Seconds the backend waits, after its last /ws client disconnects, before stopping idle agents.
+IDLE_STOP_SECONDS = float(CONFIG.get("idle_stop_seconds", 30))
+_idle_stop_task: Optional[asyncio.Task] = None
+
+def _agent_busy(agent_name: str) -> bool:
+    """Returns True if an agent has turns running or queued, e.g. from /run_turn or the A2A proxy."""
+    snapshot = turn_metrics.snapshot(agent_name)
+    return bool(snapshot and (snapshot["running"] or snapshot["queued"]))
+
+async def stop_agents_when_idle(grace_seconds: float):
+    """
+    Stops the running agents once no /ws client has been connected for
+    `grace_seconds`. An agent still serving turns is left running and
+    checked again after another grace period.
+    """
+    while True:
+        await asyncio.sleep(grace_seconds)
+        if manager.active_connections:
+            return
+        busy = [agent_name for agent_name in list(running_processes) if _agent_busy(agent_name)]
+        for agent_name in list(running_processes):
+            if agent_name not in busy:
+                await stop_agent_process(agent_name)
+        if not busy:
+            return
+
 @app.websocket("/ws")
-async def websocket_endpoint(websocket: WebSocket):
-    await manager.connect(websocket)
-    
+async def websocket_endpoint(
+    websocket: WebSocket,
+    backfill: int = LOG_BACKFILL_LINES,
+    instance: Optional[str] = None,
+    last_seq: Optional[int] = None,
+):
+    """
+    The management stream. A reconnecting client passes the `instance` and
+    the last `stream_seq` it received, and is sent the broadcasts it missed
+    instead of a full snapshot of agent statuses and logs.
+    """
+    global _idle_stop_task
+    await websocket.accept()
+    if _idle_stop_task is not None:
+        _idle_stop_task.cancel()
+        _idle_stop_task = None
+
     try:
+        resumed = manager.can_resume(instance, last_seq)
         # Send config on connect
-        await websocket.send_json({"type": "config", "data": CONFIG.get("agent_roots", [])})
-        
-        await websocket.send_text(json.dumps({"type": "log", "agent": "server", "line": "Connection established."}))
-
-        for agent_name, agent_info in running_processes.items():
-            runner = agent_info.get("runner")
-            # Only send status if the runner and its process exist and are still running.
-            if runner and runner.process and runner.process.returncode is None:
-                status_message = {
-                    "type": "status",
-                    "agent": agent_name,
-                    "status": "running",
-                    "pid": runner.process.pid,
-                    "url": agent_info.get("url")
-                }
-                await websocket.send_text(json.dumps(status_message))
+        await websocket.send_json({
+            "type": "config",
+            "data": CONFIG.get("agent_roots", []),
+            "log_instance": log_store.instance_id,
+            "stream_instance": manager.instance_id,
+            "stream_seq": manager.last_seq,
+            "resumed": resumed,
+        })
+        await manager.connect(
+            websocket, last_seq if resumed else None, snapshot=lambda client: _send_snapshot(client, backfill)
+        )
 
         while True:
             data = await websocket.receive_text()
@@ -423,13 +793,40 @@ async def websocket_endpoint(websocket: WebSocket):
                 await manager.broadcast(json.dumps(command))
 
     except WebSocketDisconnect:
-        # In the context of the E2E tests, a disconnect signifies the end of a
-        # test run. To prevent state from leaking between tests, we will stop
-        # all running agents.
-        # NOTE: In a multi-client production environment, this would be unsafe
-        # as it would terminate agents for all connected clients. A more robust
-        # solution would involve associating agent processes with specific
-        # WebSocket connections.
-        print("Client disconnected. Stopping all agents to clean up test state.")
-        asyncio.create_task(stop_all_agents())
-        manager.disconnect(websocket)
+        if websocket in manager.active_connections:
+            manager.disconnect(websocket)
+        # Agents outlive a dropped connection, so the client can reconnect
+        # and resume; they are stopped only once every client has gone.
+        if not manager.active_connections and IDLE_STOP_SECONDS >= 0 and (_idle_stop_task is None or _idle_stop_task.done()):
+            print(f"Last client disconnected. Stopping idle agents in {IDLE_STOP_SECONDS:g}s.")
+            _idle_stop_task = asyncio.create_task(stop_agents_when_idle(IDLE_STOP_SECONDS))
+
+async def _send_snapshot(websocket: WebSocket, backfill: int):
+    """Sends a client that cannot resume the status of every running agent and their recent logs."""
+    await websocket.send_text(json.dumps({"type": "log", "agent": "server", "line": "Connection established."}))
+
+    for agent_name, agent_info in running_processes.items():
+        runner = agent_info.get("runner")
+        # Only send status if the runner and its process exist and are still running.
+        if runner and runner.process and runner.process.returncode is None:
+            status_message = {
+                "type": "status",
+                "agent": agent_name,
+                "status": "running",
+                "pid": runner.process.pid,
+                "url": agent_info.get("url")
+            }
+            await websocket.send_text(json.dumps(status_message))
+
+    # Replay recent logs, so a client that connects mid-startup sees what it missed.
+    if backfill > 0:
+        for agent_name in log_store.agents():
+            lines = log_store.tail(agent_name, backfill)
+            if lines:
+                await websocket.send_text(json.dumps({"type": "log_backfill", "agent": agent_name, "lines": lines}))
+
+# Serve the built UI from this process when asked to; registered last so every API route takes precedence.
+if os.environ.get("GALLERY_SERVE_FRONTEND", "").lower() in ("1", "true", "yes"):
+    from backend.static_frontend import DEFAULT_DIST_DIR, mount_frontend
+
+    mount_frontend(app, os.environ.get("GALLERY_FRONTEND_DIST", DEFAULT_DIST_DIR))
@@ -0,0 +1,101 @@
+import time
+from collections import deque
+from typing import Deque, Dict, List, Optional
+
+IMPORTTIME_PREFIX = "import time:"
+
+
+class StartupProfile:
+    """Timings recorded for a single launch of an agent, from venv setup to 'ready'."""
+
+    def __init__(self, agent_id: str):
+        self.agent_id = agent_id
+        self.started_at = time.time()
+        self.phases: Dict[str, float] = {}
+        self.host_phases: Dict[str, float] = {}
+        self.imports: List[dict] = []
+        self.spawn_to_ready_s: Optional[float] = None
+        self._phase_started: Dict[str, float] = {}
+        self._spawned_at: Optional[float] = None
+
+    def begin_phase(self, name: str) -> None:
+        self._phase_started[name] = time.perf_counter()
+
+    def end_phase(self, name: str) -> None:
+        started = self._phase_started.pop(name, None)
+        if started is not None:
+            self.phases[name] = round(time.perf_counter() - started, 4)
+
+    def mark_spawned(self) -> None:
+        self._spawned_at = time.perf_counter()
+
+    def mark_ready(self) -> None:
+        if self._spawned_at is not None and self.spawn_to_ready_s is None:
+            self.spawn_to_ready_s = round(time.perf_counter() - self._spawned_at, 4)
+
+    def add_importtime_line(self, line: str) -> bool:
+        """
+        Records one line of `python -X importtime` output, e.g.
+        'import time:       512 |       2093 |   google.adk.runners'.
+        Returns False if the line is not an import timing.
+        """
+        if not line.startswith(IMPORTTIME_PREFIX):
+            return False
+        fields = line[len(IMPORTTIME_PREFIX):].split("|")
+        if len(fields) != 3:
+            return False
+        try:
+            self_us, cumulative_us = int(fields[0]), int(fields[1])
+        except ValueError:
+            return True  # The header line.
+        name = fields[2].rstrip()
+        # Each level of nesting indents the module name by two spaces.
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        self.imports.append({
+            "module": name.strip(),
+            "depth": depth,
+            "self_us": self_us,
+            "cumulative_us": cumulative_us,
+        })
+        return True
+
+    def to_dict(self, top: int = 25) -> dict:
+        top_level = [entry for entry in self.imports if entry["depth"] == 0]
+        slowest = sorted(top_level, key=lambda entry: entry["cumulative_us"], reverse=True)[:top]
+        return {
+            "agent": self.agent_id,
+            "started_at": self.started_at,
+            "phases": self.phases,
+            "spawn_to_ready_s": self.spawn_to_ready_s,
+            "host_phases": self.host_phases,
+            "import_count": len(self.imports),
+            "import_total_s": round(sum(entry["cumulative_us"] for entry in top_level) / 1e6, 4) if top_level else None,
+            "slowest_imports": [
+                {"module": entry["module"], "cumulative_ms": entry["cumulative_us"] / 1000, "self_ms": entry["self_us"] / 1000}
+                for entry in slowest
+            ],
+        }
+
+
+class StartupProfileStore:
+    """Keeps the startup profiles of the last few launches of each agent."""
+
+    def __init__(self, max_launches: int = 10):
+        self.max_launches = max_launches
+        self._profiles: Dict[str, Deque[StartupProfile]] = {}
+
+    def begin(self, agent_id: str) -> StartupProfile:
+        profile = StartupProfile(agent_id)
+        self._profiles.setdefault(agent_id, deque(maxlen=self.max_launches)).append(profile)
+        return profile
+
+    def latest(self, agent_id: str) -> Optional[StartupProfile]:
+        profiles = self._profiles.get(agent_id)
+        return profiles[-1] if profiles else None
+
+    def get_profiles(self, agent_id: str, top: int = 25) -> List[dict]:
+        """Returns the recorded launches for an agent, oldest first."""
+        return [profile.to_dict(top) for profile in self._profiles.get(agent_id, ())]
+
+
+startup_profiles = StartupProfileStore()
@@ -0,0 +1,134 @@
+import gzip
+import hashlib
+import mimetypes
+import os
+import re
+from typing import Dict, Optional
+
+from fastapi import FastAPI, Request, Response
+from fastapi.responses import FileResponse
+
+try:
+    # Optional; without it, assets are served gzip-compressed only.
+    import brotli
+except ImportError:
+    brotli = None
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+DEFAULT_DIST_DIR = os.path.join(PROJECT_ROOT, "frontend", "dist")
+
+# Vite names bundled assets after a hash of their content, e.g. assets/index-BX3k9a2Q.js.
+_HASHED_NAME = re.compile(r"(^|/)assets/.+-[A-Za-z0-9_-]{8,}\.[A-Za-z0-9]+$")
+_COMPRESSIBLE_TYPES = re.compile(r"^(text/|application/(javascript|json|xml|wasm|manifest\+json)|image/svg\+xml)")
+# Smaller files gain less from compression than the header costs.
+MIN_COMPRESS_BYTES = 1024
+
+IMMUTABLE_CACHE = "public, max-age=31536000, immutable"
+REVALIDATE_CACHE = "no-cache"
+
+
+class Asset:
+    """One file of the built frontend, with its compressed variants and ETag computed once."""
+
+    def __init__(self, path: str, relative_path: str):
+        self.path = path
+        with open(path, "rb") as f:
+            content = f.read()
+        self.content_type = mimetypes.guess_type(path)[0] or "application/octet-stream"
+        self.etag = hashlib.sha1(content).hexdigest()[:20]
+        self.cache_control = IMMUTABLE_CACHE if _HASHED_NAME.search(relative_path) else REVALIDATE_CACHE
+        # Encoding -> compressed bytes, preferring files precompressed by the build.
+        self.encoded: Dict[str, bytes] = {}
+        if len(content) >= MIN_COMPRESS_BYTES and _COMPRESSIBLE_TYPES.match(self.content_type):
+            self.encoded["br"] = _read_sidecar(path + ".br") or (brotli.compress(content, quality=11) if brotli else None)
+            self.encoded["gzip"] = _read_sidecar(path + ".gz") or gzip.compress(content, compresslevel=9, mtime=0)
+            self.encoded = {
+                encoding: data for encoding, data in self.encoded.items() if data is not None and len(data) < len(content)
+            }
+
+    def response(self, request: Request) -> Response:
+        encoding = _negotiate(request.headers.get("accept-encoding", ""), self.encoded)
+        etag = f'"{self.etag}-{encoding}"' if encoding else f'"{self.etag}"'
+        headers = {"ETag": etag, "Cache-Control": self.cache_control}
+        if self.encoded:
+            headers["Vary"] = "Accept-Encoding"
+        if etag in _etags(request.headers.get("if-none-match", "")):
+            return Response(status_code=304, headers=headers)
+        if encoding is None:
+            return FileResponse(self.path, media_type=self.content_type, headers=headers)
+        headers["Content-Encoding"] = encoding
+        return Response(content=self.encoded[encoding], media_type=self.content_type, headers=headers)
+
+
+def _read_sidecar(path: str) -> Optional[bytes]:
+    try:
+        with open(path, "rb") as f:
+            return f.read()
+    except FileNotFoundError:
+        return None
+
+
+def _etags(header: str) -> set:
+    return {tag.strip().removeprefix("W/") for tag in header.split(",") if tag.strip()}
+
+
+def _negotiate(accept_encoding: str, available: Dict[str, bytes]) -> Optional[str]:
+    """Returns the best encoding the client accepts, brotli before gzip, or None for the plain file."""
+    accepted = set()
+    for item in accept_encoding.split(","):
+        name, _, params = item.strip().partition(";")
+        if params.replace(" ", "") not in ("q=0", "q=0.0", "q=0.00", "q=0.000"):
+            accepted.add(name.strip().lower())
+    for encoding in ("br", "gzip"):
+        if encoding in available and (encoding in accepted or "*" in accepted):
+            return encoding
+    return None
+
+
+class StaticFrontend:
+    """
+    Serves the built frontend from `dist_dir`. Every file is read, hashed and
+    compressed once when the backend starts, so a request costs a dict
+    lookup. Hashed bundle files are cached by browsers for good, everything
+    else is revalidated against its ETag, and paths that are not files fall
+    back to index.html for the single-page app's client-side routes.
+    """
+
+    def __init__(self, dist_dir: str):
+        self.dist_dir = dist_dir
+        self.assets: Dict[str, Asset] = {}
+        for directory, _, filenames in os.walk(dist_dir):
+            for filename in filenames:
+                path = os.path.join(directory, filename)
+                relative_path = os.path.relpath(path, dist_dir).replace(os.sep, "/")
+                if filename.endswith((".br", ".gz")) and os.path.isfile(path[:-3]):
+                    continue
+                self.assets[relative_path] = Asset(path, relative_path)
+        self.index = self.assets.get("index.html")
+
+    def response(self, request: Request, path: str) -> Response:
+        asset = self.assets.get(path or "index.html")
+        if asset is None:
+            # Missing files under assets/ are real 404s, not client-side routes.
+            if self.index is None or path.startswith("assets/") or os.path.splitext(path)[1]:
+                return Response(status_code=404)
+            asset = self.index
+        return asset.response(request)
+
+
+def mount_frontend(app: FastAPI, dist_dir: str = DEFAULT_DIST_DIR) -> Optional[StaticFrontend]:
+    """
+    Serves the built frontend from `app` at every path no other route
+    matches. Call it after all other routes are registered. Returns None if
+    the frontend has not been built.
+    """
+    if not os.path.isfile(os.path.join(dist_dir, "index.html")):
+        print(f"Frontend build not found in {dist_dir}; run `npm run build` to serve the UI from the backend.")
+        return None
+    frontend = StaticFrontend(dist_dir)
+
+    @app.get("/{path:path}", include_in_schema=False)
+    async def serve_frontend(request: Request, path: str):
+        return frontend.response(request, path)
+
+    return frontend
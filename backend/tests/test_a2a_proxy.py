@@ -0,0 +1,106 @@
+import json
+import pytest
+import httpx
+from fastapi import FastAPI, Request, Response
+from fastapi.responses import JSONResponse, StreamingResponse
+from fastapi.testclient import TestClient
+
+from backend import main
+from backend.a2a_proxy import A2AProxy, result_text
+from backend.config import AgentConfig
+from backend.connection_manager import running_processes
+from backend.turn_metrics import turn_metrics
+
+AGENT = "agents/a2a_echo"
+AGENT_URL = "http://localhost:10999"
+CARD = {"name": "Echo", "url": "http://0.0.0.0:10999/rpc", "capabilities": {"streaming": True}}
+
+
+def make_upstream(card_requests: list) -> FastAPI:
+    """An A2A agent that echoes messages back as a task artifact, or as a stream of status events."""
+    upstream = FastAPI()
+
+    @upstream.get("/.well-known/agent-card.json")
+    async def card(request: Request):
+        card_requests.append(request.headers.get("if-none-match"))
+        if request.headers.get("if-none-match") == '"v1"':
+            return Response(status_code=304)
+        return JSONResponse(CARD, headers={"ETag": '"v1"'})
+
+    @upstream.post("/rpc")
+    async def rpc(request: Request):
+        body = await request.json()
+        text = body["params"]["message"]["parts"][0]["text"]
+        if body["method"] == "message/stream":
+            async def events():
+                for state in ("working", "completed"):
+                    yield f"data: {json.dumps({'jsonrpc': '2.0', 'id': body['id'], 'result': {'kind': 'status-update', 'status': {'state': state}}})}\n\n"
+            return StreamingResponse(events(), media_type="text/event-stream")
+        return {"jsonrpc": "2.0", "id": body["id"], "result": {
+            "kind": "task",
+            "contextId": body["params"]["message"].get("contextId") or "ctx-1",
+            "status": {"state": "completed"},
+            "artifacts": [{"parts": [{"kind": "text", "text": f"echo: {text}"}]}],
+        }}
+
+    return upstream
+
+
+@pytest.fixture
+def card_requests():
+    return []
+
+
+@pytest.fixture
+def proxy(card_requests):
+    return A2AProxy(transport=httpx.ASGITransport(app=make_upstream(card_requests)))
+
+
+@pytest.mark.asyncio
+async def test_agent_card_is_cached_and_revalidated(proxy, card_requests):
+    """Verify that a fresh card is served from cache and a stale one is revalidated with its ETag."""
+    first = await proxy.get_agent_card(AGENT_URL)
+    await proxy.get_agent_card(AGENT_URL)
+    assert first["card"] == CARD and card_requests == [None]
+
+    proxy.card_max_age = 0
+    assert (await proxy.get_agent_card(AGENT_URL))["card"] == CARD
+    assert card_requests == [None, '"v1"']
+    assert await proxy.rpc_url(AGENT_URL) == f"{AGENT_URL}/rpc"
+
+    result = await proxy.send_message(AGENT_URL, "hello")
+    assert result_text(result) == "echo: hello" and result["contextId"] == "ctx-1"
+    await proxy.aclose()
+
+
+@pytest.fixture
+def a2a_agent(proxy, monkeypatch):
+    monkeypatch.setattr(main, "a2a_proxy", proxy)
+    monkeypatch.setitem(main.AGENT_CONFIGS, AGENT, AgentConfig(type="a2a", max_concurrent_turns=2))
+    running_processes[AGENT] = {"runner": None, "url": AGENT_URL}
+    yield
+    running_processes.pop(AGENT, None)
+    turn_metrics.clear(AGENT)
+
+
+def test_rpc_and_stream_are_proxied_with_turn_metrics(a2a_agent):
+    """Verify that JSON-RPC and SSE calls pass through the backend and count as turns of the agent."""
+    client = TestClient(main.app)
+    message = {"role": "user", "kind": "message", "messageId": "m1", "parts": [{"kind": "text", "text": "hi"}]}
+
+    response = client.post(f"/a2a/{AGENT}/rpc", json={"jsonrpc": "2.0", "id": 1, "method": "message/send", "params": {"message": message}})
+    assert response.status_code == 200
+    assert result_text(response.json()["result"]) == "echo: hi"
+
+    response = client.post(f"/a2a/{AGENT}/rpc", json={"jsonrpc": "2.0", "id": 2, "method": "message/stream", "params": {"message": message}})
+    assert response.headers["content-type"].startswith("text/event-stream")
+    states = [json.loads(line[len("data: "):])["result"]["status"]["state"] for line in response.text.splitlines() if line]
+    assert states == ["working", "completed"]
+
+    card = client.get(f"/a2a/{AGENT}/card")
+    assert card.json() == CARD
+    assert client.get(f"/a2a/{AGENT}/card", headers={"If-None-Match": card.headers["etag"]}).status_code == 304
+
+    metrics = client.get(f"/agents/{AGENT}/turn_metrics").json()["metrics"]
+    assert (metrics["completed"], metrics["errors"], metrics["max_concurrent"]) == (2, 0, 2)
+    assert client.post("/a2a/agents/unknown/rpc", json={}).status_code == 404
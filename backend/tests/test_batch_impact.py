@@ -0,0 +1,40 @@
+import os
+import sys
+import pytest
+
+SUPPLY_CHAIN_AGENT_PATH = os.path.abspath("agents/supply_chain_agent")
+
+
+@pytest.fixture
+def impact_calculator():
+    """Imports the impact calculator module from the supply chain agent's tools package."""
+    sys.path.insert(0, SUPPLY_CHAIN_AGENT_PATH)
+    try:
+        from supply_chain_agent.tools import impact_calculator
+        yield impact_calculator
+    finally:
+        sys.path.remove(SUPPLY_CHAIN_AGENT_PATH)
+
+
+def test_batch_impact_deduplicates_shared_orders(impact_calculator):
+    """Verify that events affecting the same SKU are reported separately but counted once in total."""
+    result = impact_calculator.calculate_batch_impact([
+        "The Port of Shanghai is closed.",
+        "Supplier ABC reports a 2 week delay.",
+        "Heavy rain in Lisbon.",
+    ])
+    lines = result.splitlines()
+    assert lines[1].endswith("1 affected orders; $10,000.00 revenue at risk")
+    assert lines[2].endswith("1 affected orders; $10,000.00 revenue at risk")
+    assert "No direct impact identified" in lines[3]
+    combined = lines[lines.index("Combined (deduplicated):"):]
+    assert combined[2:4] == ["- Number of Affected Orders: 1", "- Total Revenue at Risk: $10,000.00"]
+    assert "stockout in 8.0 days" in combined[-1]
+
+
+def test_batch_impact_reports_missing_rules_file(impact_calculator, tmp_path, monkeypatch):
+    """Verify that a missing rules file is reported like calculate_impact does, not raised."""
+    missing = str(tmp_path / "missing_rules.csv")
+    monkeypatch.setattr(impact_calculator, "RULES_FILE_PATH", missing)
+    result = impact_calculator.calculate_batch_impact(["Missing rules for this event."])
+    assert result == f"Error: The file at {missing} was not found."
@@ -0,0 +1,115 @@
+import json
+import os
+import pytest
+
+from backend import main
+from backend.config_watcher import ConfigWatcher, diff_gallery_config, diff_is_empty
+
+BASE = {
+    "agent_roots": [{"name": "Core", "path": "agents"}, {"name": "Samples", "path": "samples", "exclude": ["old"]}],
+    "agent_configs": {"agents/echo": {"type": "a2a", "entrypoint": "echo"}},
+}
+
+
+def test_diff_reports_roots_and_agent_configs_by_key():
+    """Verify that roots are matched by path and agent configs by id, and reordering changes nothing."""
+    new = {
+        "agent_roots": [{"name": "Samples", "path": "samples"}, {"name": "Extra", "path": "extra"}],
+        "agent_configs": {"agents/echo": {"type": "a2a", "entrypoint": "echo2"}, "samples/x": {"type": "adk"}},
+        "idle_stop_seconds": 5,
+    }
+    assert diff_gallery_config(BASE, new) == {
+        "roots_added": ["extra"],
+        "roots_removed": ["agents"],
+        "roots_changed": ["samples"],
+        "agent_configs_changed": ["agents/echo", "samples/x"],
+        "other_keys_changed": ["idle_stop_seconds"],
+    }
+    reordered = {"agent_configs": BASE["agent_configs"], "agent_roots": list(BASE["agent_roots"])}
+    assert diff_is_empty(diff_gallery_config(BASE, reordered))
+
+
+@pytest.mark.asyncio
+async def test_watcher_keeps_config_when_file_is_invalid(tmp_path):
+    """Verify that a change is applied once, and an unparsable file is skipped until it changes again."""
+    path = tmp_path / "gallery.config.yaml"
+    path.write_text("agent_roots: []\n")
+    applied = []
+
+    async def on_change(config):
+        applied.append(config)
+
+    watcher = ConfigWatcher(str(path), main.read_gallery_config, on_change)
+    assert not await watcher.check()
+
+    path.write_text("agent_roots: [\n")
+    os.utime(path, ns=(1, 1))
+    assert not await watcher.check()
+    path.write_text("")
+    os.utime(path, ns=(2, 2))
+    assert not await watcher.check()
+    path.write_text("idle_stop_seconds: 5\n")
+    os.utime(path, ns=(3, 3))
+    assert await watcher.check()
+    assert not await watcher.check()
+    assert applied == [{"idle_stop_seconds": 5}]
+
+
+@pytest.mark.asyncio
+async def test_reload_rescans_changed_roots_and_leaves_running_agents(tmp_path, monkeypatch):
+    """Verify the broadcast delta, that unchanged roots are not rescanned, and that running agents are kept."""
+    for agent in ("agents/echo", "agents/chat", "samples/demo", "samples/old"):
+        (tmp_path / agent).mkdir(parents=True)
+    monkeypatch.setattr(main, "PROJECT_ROOT", str(tmp_path))
+    monkeypatch.setattr(main, "CONFIG", BASE)
+    monkeypatch.setattr(main, "AGENT_CONFIGS", main.parse_agent_configs(BASE))
+    monkeypatch.setattr(main, "_root_scan_cache", {})
+    monkeypatch.setitem(main.running_processes, "agents/echo", {"runner": None})
+    broadcasts = []
+
+    async def broadcast(message):
+        broadcasts.append(json.loads(message))
+
+    monkeypatch.setattr(main.manager, "broadcast", broadcast)
+    assert [agent["id"] for agent in await main.get_agents()] == ["agents/chat", "agents/echo", "samples/demo"]
+    scanned = []
+    scan = main._scan_agent_root
+    monkeypatch.setattr(main, "_scan_agent_root", lambda root, configs: scanned.append(root["path"]) or scan(root, configs))
+
+    new = {
+        "agent_roots": [BASE["agent_roots"][0], {"name": "Samples", "path": "samples"}],
+        "agent_configs": {"agents/echo": {"type": "adk"}},
+    }
+    await main.apply_gallery_config(new)
+
+    assert main.CONFIG is new
+    assert main.get_agent_config("agents/echo").type == "adk"
+    assert set(scanned) == {"agents", "samples"}
+    delta = broadcasts[-1]
+    assert delta["type"] == "config_delta"
+    assert [agent["id"] for agent in delta["agents_added"]] == ["samples/old"]
+    assert [agent["id"] for agent in delta["agents_updated"]] == ["agents/echo"]
+    assert delta["agents_removed"] == []
+    assert delta["restart_required"] == ["agents/echo"]
+    assert "agents/echo" in main.running_processes
+
+    scanned.clear()
+    await main.apply_gallery_config({**new, "agent_configs": {**new["agent_configs"], "samples/demo": {"type": "a2a"}}})
+    assert scanned == ["samples", "samples"]
+
+
+def test_scan_picks_up_descriptions_edited_in_place(tmp_path, monkeypatch):
+    """Verify that editing an agent's agent.py, which leaves the root directory's mtime alone, refreshes the listing."""
+    agent_py = tmp_path / "agents" / "echo" / "agent.py"
+    agent_py.parent.mkdir(parents=True)
+    agent_py.write_text('root_agent = Agent(description="Echoes.")\n')
+    monkeypatch.setattr(main, "PROJECT_ROOT", str(tmp_path))
+    monkeypatch.setattr(main, "_root_scan_cache", {})
+    root = {"name": "Core", "path": "agents"}
+    assert main._scan_agent_root(root, {})[0]["description"] == "Echoes."
+
+    root_mtime = os.stat(tmp_path / "agents").st_mtime_ns
+    agent_py.write_text('root_agent = Agent(description="Echoes twice.")\n')
+    os.utime(agent_py, ns=(root_mtime + 1, root_mtime + 1))
+    assert os.stat(tmp_path / "agents").st_mtime_ns == root_mtime
+    assert main._scan_agent_root(root, {})[0]["description"] == "Echoes twice."
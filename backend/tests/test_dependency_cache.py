@@ -0,0 +1,86 @@
+import sys
+import pytest
+
+from backend import dependency_cache as dependency_cache_module
+from backend.dependency_cache import DependencyCache
+
+
+def test_installs_run_offline_against_the_wheelhouse(tmp_path):
+    """Verify that the first install command never reaches the index and the fallback still prefers local wheels."""
+    cache = DependencyCache(str(tmp_path))
+    offline, online = cache.install_commands("/opt/uv", "/agent/.venv/bin/python", ["-r", "requirements.txt"])
+    assert offline == [
+        "/opt/uv", "pip", "install", "--python", "/agent/.venv/bin/python", "--cache-dir", cache.uv_cache,
+        "--offline", "--find-links", cache.wheelhouse, "-r", "requirements.txt",
+    ]
+    assert "--offline" not in online
+    assert online[-4:] == ["--find-links", cache.wheelhouse, "-r", "requirements.txt"]
+
+
+@pytest.mark.asyncio
+async def test_prefetch_downloads_each_set_of_requirements_once(tmp_path, monkeypatch):
+    """Verify that unchanged requirements are not downloaded again, and edited ones are."""
+    commands = []
+
+    async def fake_run(*command, cwd=None):
+        if "-c" in command:
+            return 0, f"{sys.implementation.name} {sys.version_info[0]}.{sys.version_info[1]} {sys.abiflags}"
+        commands.append(list(command))
+        return 0, ""
+
+    monkeypatch.setattr(dependency_cache_module, "_run", fake_run)
+    agent_dir = tmp_path / "agent"
+    agent_dir.mkdir()
+    (agent_dir / "requirements.txt").write_text("httpx\n")
+    cache = DependencyCache(str(tmp_path / "cache"))
+
+    assert await cache.prefetch(["-r", "requirements.txt"], str(agent_dir))
+    assert not await cache.prefetch(["-r", "requirements.txt"], str(agent_dir))
+    assert commands[0][-4:] == ["--dest", cache.wheelhouse, "-r", "requirements.txt"]
+    assert "download" in commands[0] and "--python-version" not in commands[0]
+
+    (agent_dir / "requirements.txt").write_text("httpx\nuvicorn\n")
+    assert await cache.prefetch(["-r", "requirements.txt"], str(agent_dir))
+    assert len(commands) == 2
+
+
+@pytest.mark.asyncio
+async def test_prefetch_targets_the_venv_interpreter(tmp_path, monkeypatch):
+    """Verify that wheels are downloaded for the venv's interpreter when it differs from the backend's, once per set of tags."""
+    commands = []
+
+    async def fake_run(*command, cwd=None):
+        commands.append(list(command))
+        return (0, "cpython 3.99 t") if "-c" in command else (0, "")
+
+    monkeypatch.setattr(dependency_cache_module, "_run", fake_run)
+    cache = DependencyCache(str(tmp_path))
+    assert await cache.prefetch(["httpx"], str(tmp_path), "/agent/.venv/bin/python")
+    assert not await cache.prefetch(["httpx"], str(tmp_path), "/other/.venv/bin/python")
+    query, download = commands[0], commands[1]
+    assert query[0] == "/agent/.venv/bin/python"
+    assert download[download.index("--python-version") + 1] == "3.99"
+    assert ["--abi", "cp399t"] == download[download.index("--abi"):download.index("--abi") + 2]
+    assert "--only-binary=:all:" in download
+    assert len(commands) == 3
+
+
+@pytest.mark.asyncio
+async def test_failed_prefetch_is_retried(tmp_path, monkeypatch):
+    """Verify that a failed download leaves no marker, so the next prefetch tries again."""
+    results = [(1, "No matching distribution"), (0, "")]
+
+    async def fake_run(*command, cwd=None):
+        return (0, "cpython 3.12") if "-c" in command else results.pop(0)
+
+    monkeypatch.setattr(dependency_cache_module, "_run", fake_run)
+    cache = DependencyCache(str(tmp_path))
+    assert not await cache.prefetch(["httpx"], str(tmp_path))
+    assert await cache.prefetch(["httpx"], str(tmp_path))
+
+
+@pytest.mark.asyncio
+async def test_uv_on_path_is_shared(tmp_path, monkeypatch):
+    """Verify that a uv already on PATH is used instead of installing one."""
+    monkeypatch.setattr(dependency_cache_module.shutil, "which", lambda name: "/usr/local/bin/uv")
+    assert await DependencyCache(str(tmp_path)).ensure_uv() == "/usr/local/bin/uv"
@@ -0,0 +1,34 @@
+import os
+import sys
+import pytest
+
+SUPPLY_CHAIN_AGENT_PATH = os.path.abspath("agents/supply_chain_agent")
+
+
+@pytest.fixture
+def disruption_matcher():
+    """Imports the disruption matcher module from the supply chain agent's tools package."""
+    sys.path.insert(0, SUPPLY_CHAIN_AGENT_PATH)
+    try:
+        from supply_chain_agent.tools import disruption_matcher
+        yield disruption_matcher
+    finally:
+        sys.path.remove(SUPPLY_CHAIN_AGENT_PATH)
+
+
+def test_disruption_matcher_finds_every_rule_in_one_pass(disruption_matcher, tmp_path):
+    """Verify that overlapping patterns all match and the rules reload when the file changes."""
+    assert disruption_matcher.AhoCorasick(["he", "she", "his", "hers"]).find("ushers") == [1, 0, 3]
+
+    rules = tmp_path / "disruption_rules.csv"
+    rules.write_text("Pattern,EntityType,AffectedSKUs\nShanghai,port,8675\nport of shanghai,port,309;8675\n")
+    matcher = disruption_matcher.DisruptionMatcher(str(rules))
+    assert {rule.pattern: rule.affected_skus for rule in matcher.match("The PORT OF SHANGHAI is closed")} == {
+        "shanghai": ("8675",),
+        "port of shanghai": ("309", "8675"),
+    }
+    assert matcher.match("Ningbo is congested") == []
+
+    rules.write_text("Pattern,EntityType,AffectedSKUs\nningbo,port,5309\n")
+    os.utime(rules, ns=(0, 1))
+    assert [rule.pattern for rule in matcher.match("Ningbo is congested")] == ["ningbo"]
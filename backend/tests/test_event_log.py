@@ -0,0 +1,103 @@
+import json
+import pytest
+from fastapi.testclient import TestClient
+
+from backend import main
+from backend.base_agent_runner import EventStreamProtocol
+from backend.event_log import EventLog
+
+
+def _event(i: int, turn_id: str = "turn-a") -> bytes:
+    return json.dumps({"event": "on_token", "turn_id": turn_id, "data": {"i": i}}).encode()
+
+
+def _seqs(body: bytes):
+    return [json.loads(line)["seq"] for line in body.splitlines()]
+
+
+def test_pages_follow_sequence_across_segments(tmp_path):
+    """Verify that paging from any seq returns consecutive events, whichever segment they live in."""
+    log = EventLog(str(tmp_path), max_segment_bytes=600, index_interval=4).for_agent("agents/x")
+    for i in range(40):
+        log.append([_event(i)], ["turn-a"])
+    assert len(log.segments) > 2
+
+    seen = []
+    after = 0
+    while True:
+        body, after = log.read(after, limit=7)
+        if not body:
+            break
+        seen.extend(_seqs(body))
+    assert seen == list(range(1, 41))
+
+    body, _ = log.read(after_seq=22, limit=3)
+    assert _seqs(body) == [23, 24, 25]
+    assert json.loads(body.splitlines()[0])["data"]["data"] == {"i": 22}
+
+
+def test_retention_drops_oldest_segments(tmp_path):
+    """Verify that only `max_segments` segments are kept and reads start at the oldest kept event."""
+    log = EventLog(str(tmp_path), max_segment_bytes=300, max_segments=2).for_agent("agents/x")
+    for i in range(50):
+        log.append([_event(i)], [None])
+    assert len(log.segments) == 2
+    assert len(list((tmp_path / "agents__x").glob("*.ndjson"))) == 2
+
+    body, _ = log.read(after_seq=0, limit=1)
+    assert _seqs(body) == [log.segments[0].first_seq]
+
+
+def test_turn_lookup_skips_other_turns(tmp_path):
+    """Verify that a turn's events are found through the turn index, leaving out interleaved turns."""
+    log = EventLog(str(tmp_path), max_segment_bytes=400).for_agent("agents/x")
+    for i in range(20):
+        turn_id = "early" if i < 10 else ("late" if i % 2 else "other")
+        log.append([_event(i, turn_id)], [turn_id])
+
+    body = log.read_turn("late")
+    assert [json.loads(line)["data"]["data"]["i"] for line in body.splitlines()] == [11, 13, 15, 17, 19]
+    assert log.read_turn("missing") == b""
+
+
+def test_reopened_log_continues_sequence(tmp_path):
+    """Verify that a restarted backend recovers the seq and index from disk and drops a torn last line."""
+    store = EventLog(str(tmp_path), max_segment_bytes=500, index_interval=4)
+    log = store.for_agent("agents/x")
+    log.append([_event(i) for i in range(15)], ["turn-a"] * 15)
+    store.close()
+    with open(log.segments[-1].path, "ab") as f:
+        f.write(b'{"seq":16,"data":{"ev')
+
+    reopened = EventLog(str(tmp_path), max_segment_bytes=500, index_interval=4).for_agent("agents/x")
+    assert reopened.next_seq == 16
+    assert reopened.append([_event(15, "turn-b")], ["turn-b"]) == 16
+    body, next_seq = reopened.read(after_seq=10, limit=100)
+    assert _seqs(body) == list(range(11, 17))
+    assert next_seq == 16
+    assert reopened.read_turn("turn-a").count(b"\n") == 15
+
+
+@pytest.mark.asyncio
+async def test_streamed_events_are_persisted_and_replayed(tmp_path, monkeypatch):
+    """Verify that events read from an agent's pipe are logged as received and served by the replay endpoint."""
+    store = EventLog(str(tmp_path))
+    monkeypatch.setattr("backend.base_agent_runner.event_log", store)
+    monkeypatch.setattr(main, "event_log", store)
+
+    protocol = EventStreamProtocol("agents/replayed")
+    protocol.data_received(_event(0) + b"\n" + _event(1, "turn-b") + b"\nnot json\n" + _event(2)[:10])
+    protocol.data_received(_event(2)[10:] + b"\n")
+
+    client = TestClient(main.app)
+    response = client.get("/agents/agents/replayed/events", params={"after_seq": 1})
+    assert response.headers["content-type"] == "application/x-ndjson"
+    assert response.headers["x-next-seq"] == "3"
+    assert [json.loads(line)["data"] for line in response.text.splitlines()] == [
+        json.loads(_event(1, "turn-b")), json.loads(_event(2))
+    ]
+
+    turn = client.get("/agents/agents/replayed/events", params={"turn_id": "turn-b"})
+    assert [json.loads(line)["seq"] for line in turn.text.splitlines()] == [2]
+    assert client.get("/agents/agents/unknown/events").status_code == 404
+    store.close()
@@ -77,3 +77,20 @@ async def test_after_tool_callback_suppresses_agent_tool(plugin, mock_pipe):
     
     # The pipe should be empty because the event is suppressed
     assert mock_pipe.getvalue() == ""
+
+@pytest.mark.asyncio
+async def test_tool_events_share_span_id(plugin, mock_pipe):
+    """Verify that the before/after events of one tool call are stamped with the same span."""
+    mock_tool = MockTool()
+    tool_args = {"arg": "value"}
+
+    await plugin.before_tool_callback(tool=mock_tool, tool_args=tool_args, tool_context=None)
+    await plugin.after_tool_callback(tool=mock_tool, tool_args=tool_args, tool_context=None, result=MockToolResult())
+
+    start, end = [json.loads(line) for line in mock_pipe.getvalue().splitlines()]
+
+    assert isinstance(start["ts"], float)
+    assert end["ts"] >= start["ts"]
+    assert start["span_id"] is not None
+    assert start["span_id"] == end["span_id"]
+    assert start["parent_span_id"] == end["parent_span_id"]
@@ -0,0 +1,105 @@
+import io
+import json
+import os
+import sys
+import pytest
+from google.adk.agents import LlmAgent
+from google.adk.runners import Runner
+from google.adk.sessions import InMemorySessionService
+from google.genai.types import Content, Part
+from backend.event_streaming_plugin import EventStreamingPlugin
+from backend.fake_llm import FakeLlm, install_fake_llm, iter_agents
+
+SUPPLY_CHAIN_AGENT_PATH = os.path.abspath("agents/supply_chain_agent")
+ALERT = "The Port of Shanghai is closed for 5 days."
+
+
+async def _run_turn(agent, prompt: str, plugins=None) -> list:
+    """Runs a single turn in-process and returns every event it produced."""
+    session_service = InMemorySessionService()
+    runner = Runner(agent=agent, app_name="test_app", session_service=session_service, plugins=plugins or [])
+    session = await session_service.create_session(app_name="test_app", user_id="test_user")
+    return [
+        event
+        async for event in runner.run_async(
+            user_id="test_user",
+            session_id=session.id,
+            new_message=Content(role="user", parts=[Part(text=prompt)]),
+        )
+    ]
+
+
+def _function_calls(events: list) -> list:
+    return [call.name for event in events for call in event.get_function_calls()]
+
+
+@pytest.fixture
+def supply_chain_agent():
+    """Imports the supply chain agent package from its agent directory."""
+    sys.path.insert(0, SUPPLY_CHAIN_AGENT_PATH)
+    models = []
+    try:
+        from supply_chain_agent.agent import root_agent
+        # The agents are module-level and shared with other tests, so their real models are put back afterwards.
+        models += [(agent, agent.model) for agent in iter_agents(root_agent) if hasattr(agent, "model")]
+        yield root_agent
+    finally:
+        for agent, model in models:
+            agent.model = model
+        sys.path.remove(SUPPLY_CHAIN_AGENT_PATH)
+
+
+@pytest.mark.asyncio
+async def test_default_flow_calls_each_tool_then_answers():
+    """Verify that the fake model calls every declared tool once before answering."""
+    def lookup(query: str) -> str:
+        """Looks up an answer."""
+        return f"result for {query}"
+
+    agent = LlmAgent(name="ToolAgent", model=FakeLlm(seed=1, response_tokens=5), tools=[lookup])
+    events = await _run_turn(agent, "hello")
+
+    assert _function_calls(events) == ["lookup"]
+    function_responses = [r for event in events for r in event.get_function_responses()]
+    assert function_responses[0].response == {"result": "result for hello"}
+    assert len(events[-1].content.parts[0].text.split()) == 5
+
+
+@pytest.mark.asyncio
+async def test_scripted_rules_override_default_flow():
+    """Verify that a matching scripted rule replaces the default response."""
+    script = [
+        {"agent": "OtherAgent", "text": "wrong agent"},
+        {"match": "weather", "text": "It is sunny."},
+    ]
+    agent = LlmAgent(name="WeatherAgent", model=FakeLlm(agent_name="WeatherAgent", script=script))
+
+    events = await _run_turn(agent, "What is the weather?")
+
+    assert events[-1].content.parts[0].text == "It is sunny."
+
+
+@pytest.mark.asyncio
+async def test_supply_chain_agent_runs_offline(supply_chain_agent):
+    """Verify that the full RapidResolveAgent flow, including its sub-agents, runs on the fake model."""
+    patched = install_fake_llm(supply_chain_agent, seed=7)
+    pipe = io.StringIO()
+
+    events = await _run_turn(supply_chain_agent, ALERT, plugins=[EventStreamingPlugin(pipe_writer=pipe)])
+    streamed = [json.loads(line) for line in pipe.getvalue().splitlines()]
+    tool_results = {
+        event["data"]["tool_call"]["name"]: event["data"]["tool_result"]
+        for event in streamed
+        if event["event"] == "after_tool_call"
+    }
+
+    assert patched == 3
+    assert _function_calls(events) == ["ImpactAgent", "ResearchAgent"]
+    assert tool_results["calculate_impact"].startswith("Impact Assessment Complete")
+    assert tool_results["calculate_impact"].count(ALERT) == 1
+    assert "research_solutions" in tool_results
+
+
+def test_fake_model_does_not_outlive_the_test(supply_chain_agent):
+    """Verify that the agents shared through the module keep their real models after a test installs the fake one."""
+    assert not any(isinstance(agent.model, FakeLlm) for agent in iter_agents(supply_chain_agent))
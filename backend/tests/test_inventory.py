@@ -0,0 +1,46 @@
+import os
+import sys
+import pytest
+
+SUPPLY_CHAIN_AGENT_PATH = os.path.abspath("agents/supply_chain_agent")
+ORDERS_HEADER = "OrderNumber,SKU,Quantity,Customer,Revenue\n"
+INVENTORY_HEADER = "SKU,ProductName,QuantityOnHand,DaysOfSupply\n"
+
+
+@pytest.fixture
+def inventory():
+    """Imports the inventory module from the supply chain agent's tools package."""
+    sys.path.insert(0, SUPPLY_CHAIN_AGENT_PATH)
+    try:
+        from supply_chain_agent.tools import inventory
+        yield inventory
+    finally:
+        sys.path.remove(SUPPLY_CHAIN_AGENT_PATH)
+
+
+def test_inventory_join_projects_stockout(inventory, tmp_path):
+    """Verify that stock committed to open orders is set aside, and the join follows appends and rewrites."""
+    orders = tmp_path / "orders.csv"
+    orders.write_text(ORDERS_HEADER + "ORD001,8675,20,CustomerA,10000\n")
+    stock = tmp_path / "inventory.csv"
+    stock.write_text(INVENTORY_HEADER + "8675,ProductX,100,10\n309,ProductY,50,5\n1,ProductZ,5,0\n")
+    table = inventory.InventoryTable(str(stock), str(orders))
+
+    positions = table.positions(["8675", "309", "1", "404"])
+    assert positions["8675"].days_to_stockout == 8.0
+    assert positions["8675"].revenue_at_risk_per_day == 5000.0
+    assert positions["309"].committed_quantity == 0
+    assert positions["1"].days_to_stockout is None
+    assert positions["404"] is None
+
+    with open(orders, "a") as f:
+        f.write("ORD002,8675,80,CustomerB,40000\n")
+    appended = table.positions(["8675", "309"])
+    assert appended["8675"].days_to_stockout == 0.0
+    # Only the SKU named by the appended order was recomputed.
+    assert appended["309"] is positions["309"]
+
+    orders.write_text(ORDERS_HEADER + "ORD003,309,25,CustomerC,500\n")
+    reloaded = table.positions(["8675", "309"])
+    assert reloaded["8675"].committed_quantity == 0
+    assert reloaded["309"].days_to_stockout == 2.5
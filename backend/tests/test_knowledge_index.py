@@ -0,0 +1,163 @@
+import os
+import sys
+import pytest
+
+SUPPLY_CHAIN_AGENT_PATH = os.path.abspath("agents/supply_chain_agent")
+
+
+@pytest.fixture
+def bm25_index():
+    """Imports the BM25 index module from the supply chain agent's tools package."""
+    sys.path.insert(0, SUPPLY_CHAIN_AGENT_PATH)
+    try:
+        from supply_chain_agent.tools import bm25_index
+        yield bm25_index
+    finally:
+        sys.path.remove(SUPPLY_CHAIN_AGENT_PATH)
+
+
+@pytest.fixture
+def vector_index():
+    """Imports the vector index module from the supply chain agent's tools package."""
+    sys.path.insert(0, SUPPLY_CHAIN_AGENT_PATH)
+    try:
+        from supply_chain_agent.tools import vector_index
+        yield vector_index
+    finally:
+        sys.path.remove(SUPPLY_CHAIN_AGENT_PATH)
+
+
+@pytest.fixture
+def documents(tmp_path):
+    documents_dir = tmp_path / "knowledge_base"
+    documents_dir.mkdir()
+    (documents_dir / "playbook.txt").write_text(
+        "Re-route shipments through the Port of Ningbo if Shanghai closes.\n\nAir freight is pre-approved above $500k."
+    )
+    (documents_dir / "contracts.txt").write_text("Supplier XYZ is the secondary supplier for SKU 8675.")
+    return documents_dir
+
+
+def test_search_ranks_relevant_chunks_with_citations(bm25_index, documents, tmp_path):
+    """Verify that only chunks sharing terms with the query are returned, best first."""
+    index = bm25_index.BM25Index(str(documents), index_path=str(tmp_path / ".index" / "bm25.json"))
+    assert index.sync() is True
+
+    results = index.search("Shanghai port closed", top_k=4)
+    assert [chunk.citation for _, chunk in results] == ["playbook.txt, part 1"]
+    assert index.search("secondary supplier")[0][1].source == "contracts.txt"
+    assert index.search("weather in Lisbon") == []
+
+
+def test_index_is_persisted_and_updated_incrementally(bm25_index, documents, tmp_path, monkeypatch):
+    """Verify that a restart reuses the saved index and a sync re-chunks only changed files."""
+    index_path = str(tmp_path / ".index" / "bm25.json")
+    bm25_index.BM25Index(str(documents), index_path=index_path).sync()
+
+    chunked = []
+    original = bm25_index.chunk_document
+    monkeypatch.setattr(bm25_index, "chunk_document", lambda source, text: chunked.append(source) or original(source, text))
+
+    restarted = bm25_index.BM25Index(str(documents), index_path=index_path)
+    assert len(restarted) == 3
+    assert restarted.sync() is False
+    assert chunked == []
+
+    (documents / "contracts.txt").write_text("Supplier QRS now also ships SKU 8675 by rail.")
+    (documents / "playbook.txt").unlink()
+    assert restarted.sync() is True
+    assert chunked == ["contracts.txt"]
+    assert restarted.search("Ningbo") == []
+    assert restarted.search("rail")[0][1].chunk_id == "contracts.txt#1"
+
+
+def test_vector_index_matches_word_variants_bm25_misses(bm25_index, vector_index, documents, tmp_path):
+    """Verify that the dense index finds a chunk through a spelling variant of its words."""
+    keyword_index = bm25_index.BM25Index(str(documents))
+    keyword_index.sync()
+    dense_index = vector_index.VectorIndex(str(documents), str(tmp_path / ".index" / "vectors"))
+    dense_index.sync()
+
+    assert keyword_index.search("reroute shipment") == []
+    [(_, chunk)] = dense_index.search("reroute shipment", min_score=0.1)
+    assert chunk.chunk_id == "playbook.txt#1"
+
+    by_query = dense_index.search_many(["secondary supplier", "air freight approval"], top_k=1)
+    assert [results[0][1].chunk_id for results in by_query] == ["contracts.txt#1", "playbook.txt#2"]
+
+
+def test_vector_index_appends_without_rewriting_rows(vector_index, documents, tmp_path):
+    """Verify that new documents are appended, changed ones retired and the index shared on disk."""
+    path = str(tmp_path / ".index" / "vectors")
+    dense_index = vector_index.VectorIndex(str(documents), path)
+    dense_index.sync()
+    with open(f"{path}.f32", "rb") as f:
+        original_rows = f.read()
+
+    (documents / "weather.txt").write_text("Typhoon warnings close southern ports for two days.")
+    assert dense_index.sync() is True
+    with open(f"{path}.f32", "rb") as f:
+        assert f.read().startswith(original_rows)
+    assert len(dense_index) == 4
+
+    (documents / "contracts.txt").write_text("Supplier XYZ now ships by rail.")
+    dense_index.sync()
+    assert len(dense_index) == 4
+    assert dense_index.search("secondary supplier", min_score=0.3) == []
+
+    # A second process maps the same files instead of embedding the documents again.
+    other = vector_index.VectorIndex(str(documents), path)
+    assert other.sync() is False
+    assert other.search("typhoon", top_k=1)[0][1].source == "weather.txt"
+
+
+def test_concurrent_syncs_of_a_shared_index_are_serialized(vector_index, documents, tmp_path):
+    """Verify that indexes updating the same files at once, as separate agent processes do, leave them consistent."""
+    import threading
+
+    path = str(tmp_path / ".index" / "vectors")
+    indexes = [vector_index.VectorIndex(str(documents), path) for _ in range(4)]
+    for number in range(8):
+        (documents / f"note{number}.txt").write_text(f"Carrier {number} reports a delay at port {number}.")
+    threads = [threading.Thread(target=index.sync) for index in indexes]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    shared = vector_index.VectorIndex(str(documents), path)
+    assert shared.sync() is False
+    assert len(shared) == len(shared._rows) == 11
+    assert os.path.getsize(f"{path}.f32") == len(shared._rows) * vector_index.DIMENSIONS * 4
+
+
+def test_context_packer_dedupes_summarizes_and_respects_budget(monkeypatch):
+    """Verify that the packer skips duplicates, summarizes large tables and drops what does not fit."""
+    sys.path.insert(0, SUPPLY_CHAIN_AGENT_PATH)
+    try:
+        from supply_chain_agent.tools.context_packer import estimate_tokens, pack_context, token_budget
+        from supply_chain_agent.tools.knowledge_base import Chunk
+    finally:
+        sys.path.remove(SUPPLY_CHAIN_AGENT_PATH)
+
+    playbook = "Re-route shipments through the Port of Ningbo if the Port of Shanghai closes for more than a day."
+    table = "OriginPort,Carrier,TransitTimeDays\n" + "\n".join(f"Shanghai,Carrier{i % 3},{10 + i}" for i in range(200))
+    candidates = [
+        Chunk("playbook.txt#1", "playbook.txt", 1, playbook),
+        Chunk("copy.txt#1", "copy.txt", 1, playbook + " Confirm with logistics."),
+        Chunk("shipments.csv#1", "shipments.csv", 1, table),
+        Chunk("long.txt#1", "long.txt", 1, "word " * 400),
+        Chunk("short.txt#1", "short.txt", 1, "Air freight is pre-approved."),
+    ]
+
+    context = pack_context(candidates, budget=150)
+    assert [packed.chunk.chunk_id for packed in context.chunks] == ["playbook.txt#1", "shipments.csv#1", "short.txt#1"]
+    summary = context.chunks[1]
+    assert summary.summarized
+    assert "Table with 200 rows" in summary.text and "TransitTimeDays: min 10, mean 109.5, max 209" in summary.text
+    assert context.used_tokens == sum(estimate_tokens(packed.text) for packed in context.chunks) <= 150
+    assert context.dropped == [("copy.txt, part 1", "duplicate of playbook.txt, part 1"), ("long.txt, part 1", "over budget")]
+    assert "dropped: copy.txt, part 1" in context.report()
+
+    monkeypatch.setenv("RESEARCH_TOKEN_BUDGET", "500")
+    assert token_budget() == 500
@@ -0,0 +1,115 @@
+import io
+import json
+import os
+import pytest
+from google.adk.agents import LlmAgent
+from google.adk.runners import Runner
+from google.adk.sessions import InMemorySessionService
+from google.genai.types import Content, Part
+from backend.event_streaming_plugin import EventStreamingPlugin
+from backend.fake_llm import FakeLlm
+from backend.llm_response_cache import LlmResponseCache, LlmResponseCachePlugin
+
+
+async def _run_turn(runner: Runner, session_service: InMemorySessionService, prompt: str) -> list:
+    """Runs a single turn in a fresh session and returns every event it produced."""
+    session = await session_service.create_session(app_name="test_app", user_id="test_user")
+    return [
+        event
+        async for event in runner.run_async(
+            user_id="test_user",
+            session_id=session.id,
+            new_message=Content(role="user", parts=[Part(text=prompt)]),
+        )
+    ]
+
+
+@pytest.mark.asyncio
+async def test_repeated_turn_is_answered_from_cache():
+    """Verify that a repeated turn replays the model's responses and still runs its tools."""
+    tool_calls = []
+
+    def lookup(query: str) -> str:
+        """Looks up an answer."""
+        tool_calls.append(query)
+        return f"result for {query}"
+
+    # Unseeded, so a second model call would answer with different text.
+    agent = LlmAgent(name="CachedAgent", model=FakeLlm(response_tokens=8), tools=[lookup])
+    pipe = io.StringIO()
+    event_plugin = EventStreamingPlugin(pipe_writer=pipe)
+    cache = LlmResponseCache(max_entries=8)
+    session_service = InMemorySessionService()
+    runner = Runner(
+        agent=agent,
+        app_name="test_app",
+        session_service=session_service,
+        plugins=[event_plugin, LlmResponseCachePlugin(cache, on_hit=event_plugin.after_model_callback)],
+    )
+
+    first = await _run_turn(runner, session_service, "markdown")
+    second = await _run_turn(runner, session_service, "markdown")
+
+    assert second[-1].content.parts[0].text == first[-1].content.parts[0].text
+    assert tool_calls == ["markdown", "markdown"]
+    # The tool call and the final answer each missed once, then hit once.
+    assert cache.stats["CachedAgent"] == {"hits": 2, "disk_hits": 0, "misses": 2}
+
+    llm_ends = [json.loads(line) for line in pipe.getvalue().splitlines()]
+    llm_ends = [event for event in llm_ends if event["event"] == "on_llm_end"]
+    assert [event["data"].get("cached", False) for event in llm_ends] == [False, False, True, True]
+    assert all(event["span_id"] for event in llm_ends)
+
+
+def test_lru_eviction_ttl_and_disk_tier(tmp_path, monkeypatch):
+    """Verify that entries are evicted by size, expire by age and are reloaded from disk."""
+    now = [1000.0]
+    monkeypatch.setattr("backend.llm_response_cache.time.time", lambda: now[0])
+    cache = LlmResponseCache(max_entries=2, ttl=60, cache_dir=str(tmp_path))
+
+    for key in ("a", "b", "c"):
+        cache.put(key, {"content": {"parts": [{"text": key}]}})
+    assert list(cache._entries) == ["b", "c"]
+
+    # Evicted from memory, but still on disk.
+    assert cache.get("a", "agent") == {"content": {"parts": [{"text": "a"}]}}
+    assert list(cache._entries) == ["c", "a"]
+
+    # A new cache over the same directory starts warm.
+    restarted = LlmResponseCache(max_entries=2, ttl=60, cache_dir=str(tmp_path))
+    assert restarted.get("b", "agent") is not None
+
+    now[0] += 61
+    assert cache.get("c", "agent") is None
+    assert not (tmp_path / "c.json").exists()
+    assert cache.stats["agent"] == {"hits": 0, "disk_hits": 1, "misses": 1}
+
+
+def test_unreadable_disk_entries_are_misses(tmp_path):
+    """Verify that truncated or foreign files in the cache directory are removed and count as misses."""
+    cache = LlmResponseCache(cache_dir=str(tmp_path))
+    (tmp_path / "truncated.json").write_text('{"stored_at": 1')
+    (tmp_path / "foreign.json").write_text('{"response": {}}')
+    (tmp_path / "listed.json").write_text('[1, 2]')
+    for key in ("truncated", "foreign", "listed"):
+        assert cache.get(key, "agent") is None
+        assert not (tmp_path / f"{key}.json").exists()
+    assert cache.stats["agent"]["misses"] == 3
+
+
+def test_disk_tier_is_capped(tmp_path, monkeypatch):
+    """Verify that writes past the cap remove expired entries first, then the oldest."""
+    now = [1000.0]
+    monkeypatch.setattr("backend.llm_response_cache.time.time", lambda: now[0])
+    cache = LlmResponseCache(max_entries=1, ttl=60, cache_dir=str(tmp_path), max_disk_entries=10)
+    for number in range(10):
+        cache.put(f"old{number}", {"content": {"parts": [{"text": "old"}]}})
+    now[0] += 61
+    cache.put("fresh", {"content": {"parts": [{"text": "fresh"}]}})
+    assert sorted(os.listdir(tmp_path)) == ["fresh.json"]
+
+    for number in range(10):
+        now[0] += 1
+        cache.put(f"new{number}", {"content": {"parts": [{"text": "new"}]}})
+    remaining = sorted(name[:-5] for name in os.listdir(tmp_path))
+    assert remaining == sorted(f"new{number}" for number in range(1, 10))
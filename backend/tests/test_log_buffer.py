@@ -0,0 +1,98 @@
+import asyncio
+import json
+import pytest
+from fastapi.testclient import TestClient
+
+from backend import main
+from backend.base_agent_runner import _read_pip_stream, _read_stream_and_signal_start
+from backend.log_buffer import LogStore, broadcast_log, classify_level, log_store
+
+
+def test_ring_buffer_is_bounded_by_lines_and_bytes():
+    """Verify that the oldest lines are evicted once either bound is exceeded."""
+    store = LogStore(max_lines=3, max_bytes=1000)
+    for i in range(5):
+        store.append("agent", f"line {i}")
+    assert [entry["line"] for entry in store.tail("agent", 10)] == ["line 2", "line 3", "line 4"]
+
+    store = LogStore(max_lines=100, max_bytes=25)
+    for i in range(5):
+        store.append("agent", f"{i}" * 10)
+    assert [entry["line"] for entry in store.tail("agent", 10)] == ["3" * 10, "4" * 10]
+
+
+def test_levels_are_classified_once_on_append():
+    """Verify the level precomputed for the line prefixes the runners produce."""
+    assert classify_level("[ERROR] Traceback (most recent call last):") == "error"
+    assert classify_level("[PIP_ERROR] No matching distribution") == "error"
+    assert classify_level("WARNING:  Invalid HTTP request received.") == "warning"
+    assert classify_level("INFO:     Uvicorn running on http://0.0.0.0:8001") == "info"
+    assert LogStore().append("agent", "DEBUG: loading")["level"] == "debug"
+
+
+@pytest.mark.asyncio
+async def test_logs_are_paged_and_backfilled_on_connect():
+    """Verify that older lines are served in pages and new /ws clients receive the recent ones."""
+    log_store.clear("paged_agent")
+    for i in range(5):
+        await broadcast_log("paged_agent", f"line {i}")
+
+    client = TestClient(main.app)
+    page = client.get("/agents/agents/paged_agent/logs", params={"limit": 2}).json()
+    assert [entry["line"] for entry in page["lines"]] == ["line 3", "line 4"]
+    assert page["has_more"]
+    older = client.get("/agents/agents/paged_agent/logs", params={"limit": 10, "before": page["lines"][0]["seq"]}).json()
+    assert [entry["line"] for entry in older["lines"]] == ["line 0", "line 1", "line 2"]
+    assert not older["has_more"]
+
+    with client.websocket_connect("/ws?backfill=2") as websocket:
+        config = websocket.receive_json()
+        assert config["log_instance"] == log_store.instance_id
+        messages = [websocket.receive_json() for _ in range(1 + len(log_store.agents()))]
+    backfill = next(message for message in messages if message["type"] == "log_backfill" and message["agent"] == "paged_agent")
+    assert [entry["line"] for entry in backfill["lines"]] == ["line 3", "line 4"]
+    assert backfill["lines"][0]["seq"] < backfill["lines"][1]["seq"]
+    log_store.clear("paged_agent")
+
+
+def _stream(*lines: str) -> asyncio.StreamReader:
+    stream = asyncio.StreamReader()
+    stream.feed_data("".join(f"{line}\n" for line in lines).encode())
+    stream.feed_eof()
+    return stream
+
+
+@pytest.mark.asyncio
+async def test_agent_lines_below_the_threshold_are_dropped():
+    """Verify that JSON records are classified by their level field and filtered before they are recorded."""
+    log_store.clear("threshold_agent")
+    started = asyncio.Event()
+    await _read_stream_and_signal_start(
+        _stream(
+            json.dumps({"level": "INFO", "logger": "uvicorn.error", "message": "Uvicorn running on http://0.0.0.0:8001"}),
+            json.dumps({"level": "WARNING", "logger": "google_adk", "message": "Tool schema is experimental"}),
+            json.dumps({"level": "ERROR", "logger": "uvicorn.error", "message": "Exception in ASGI application", "exc": "Traceback ..."}),
+            "DEBUG: GOOGLE_API_KEY not found.",
+            "ModuleNotFoundError: No module named 'missing'",
+        ),
+        "threshold_agent", True, started, min_level="warning",
+    )
+    assert started.is_set()
+    assert [(entry["level"], entry["line"]) for entry in log_store.tail("threshold_agent", 10)] == [
+        ("warning", "WARNING: Tool schema is experimental"),
+        ("error", "[ERROR] ERROR: Exception in ASGI application\nTraceback ..."),
+        ("error", "[ERROR] ModuleNotFoundError: No module named 'missing'"),
+    ]
+
+    log_store.clear("threshold_agent")
+    await _read_pip_stream(_stream("Resolved 12 packages in 40ms", "error: No solution found"), "threshold_agent", True, min_level="warning")
+    assert [entry["line"] for entry in log_store.tail("threshold_agent", 10)] == ["[PIP_ERROR] error: No solution found"]
+    log_store.clear("threshold_agent")
+
+
+def test_log_level_config_is_normalized():
+    """Verify that log_level accepts any case and aliases, and rejects unknown levels instead of disabling the filter."""
+    assert main.AgentConfig(log_level="WARNING").log_level == "warning"
+    assert main.AgentConfig(log_level="Critical").log_level == "error"
+    with pytest.raises(ValueError, match="log_level"):
+        main.AgentConfig(log_level="verbose")
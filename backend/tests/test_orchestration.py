@@ -0,0 +1,45 @@
+import os
+import sys
+import pytest
+from google.adk.runners import InMemoryRunner
+from google.genai import types
+
+from backend.fake_llm import install_fake_llm
+
+SUPPLY_CHAIN_AGENT_PATH = os.path.abspath("agents/supply_chain_agent")
+
+
+@pytest.fixture
+def supply_chain_agent():
+    """Imports the supply chain agent module from its agent directory."""
+    sys.path.insert(0, SUPPLY_CHAIN_AGENT_PATH)
+    try:
+        from supply_chain_agent import agent
+        yield agent
+    finally:
+        sys.path.remove(SUPPLY_CHAIN_AGENT_PATH)
+
+
+@pytest.mark.asyncio
+async def test_parallel_orchestration_synthesizes_both_results(supply_chain_agent):
+    """Verify that impact and research run as parallel branches whose outputs feed the synthesis."""
+    agent = supply_chain_agent.build_root_agent("parallel")
+    install_fake_llm(agent, seed=0)
+    runner = InMemoryRunner(agent=agent, app_name="test")
+    session = await runner.session_service.create_session(app_name="test", user_id="user")
+    message = types.Content(role="user", parts=[types.Part(text="ALERT: The Port of Shanghai is closed.")])
+
+    authors = [event.author async for event in runner.run_async(user_id="user", session_id=session.id, new_message=message)]
+    session = await runner.session_service.get_session(app_name="test", user_id="user", session_id=session.id)
+
+    assert {"ImpactAgent", "ResearchAgent"} <= set(authors)
+    assert authors[-1] == "SynthesisAgent"
+    assert session.state["impact_assessment"] and session.state["research_findings"]
+    # The module-level sub-agents are cloned, so the sequential mode can still use them as tools.
+    assert supply_chain_agent.impact_agent.parent_agent is None
+
+
+def test_unknown_orchestration_mode_is_rejected(supply_chain_agent):
+    """Verify that a mistyped orchestration mode fails at build time instead of falling back."""
+    with pytest.raises(ValueError, match="sequential, parallel"):
+        supply_chain_agent.build_root_agent("fanout")
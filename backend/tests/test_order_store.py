@@ -0,0 +1,94 @@
+import os
+import sys
+import pytest
+
+SUPPLY_CHAIN_AGENT_PATH = os.path.abspath("agents/supply_chain_agent")
+HEADER = "OrderNumber,SKU,Quantity,Customer,Revenue\n"
+
+
+@pytest.fixture
+def tools():
+    """Imports the supply chain agent's tools package from its agent directory."""
+    sys.path.insert(0, SUPPLY_CHAIN_AGENT_PATH)
+    try:
+        import supply_chain_agent.tools as tools
+        from supply_chain_agent.tools import csv_tail, impact_calculator, order_store  # noqa: F401
+        yield tools
+    finally:
+        sys.path.remove(SUPPLY_CHAIN_AGENT_PATH)
+
+
+def test_appends_are_loaded_incrementally(tools, tmp_path):
+    """Verify that appended orders are parsed on their own and rewrites reload the file."""
+    orders = tmp_path / "orders.csv"
+    orders.write_text(HEADER + "ORD001,8675,20,CustomerA,10000\nORD002,309,10,CustomerB,5000\n")
+    store = tools.order_store.OrderStore(str(orders))
+    store.refresh()
+    assert store.totals(["8675", "unknown"]) == (1, 20, 10000.0)
+
+    with open(orders, "a") as f:
+        f.write("ORD003,8675,5,CustomerC,2500.5\n")
+    store.refresh()
+    assert len(store) == 3
+    assert store.totals(["8675"]) == (2, 25, 12500.5)
+    assert store.totals(["8675", "309"]) == (3, 35, 17500.5)
+    assert store.skus() == ["8675", "309"]
+
+    orders.write_text(HEADER + "ORD009,309,1,CustomerD,1\n")
+    store.refresh()
+    assert store.totals(["8675"]) == (0, 0, 0.0)
+    assert store.totals(["309"]) == (1, 1, 1.0)
+
+
+def test_partial_lines_are_read_once_complete(tools, tmp_path):
+    """Verify that a row whose append is still in progress is parsed whole by the next read."""
+    path = tmp_path / "rows.csv"
+    path.write_text("Id,Name,Value\n1,A,5\n")
+    csv_file = tools.csv_tail.IncrementalCsvFile(str(path), required_columns=("Id", "Value"))
+    assert csv_file.read_changes() == (True, [(2, ["1", "A", "5"])])
+
+    with open(path, "a") as f:
+        f.write("2,B,12")
+    assert csv_file.read_changes() == (False, [])
+    with open(path, "a") as f:
+        f.write('345\n3,"C\nD",7\n')
+    assert csv_file.read_changes() == (False, [(3, ["2", "B", "12345"]), (5, ["3", "C\nD", "7"])])
+    assert csv_file.read_changes() is None
+
+
+def test_last_row_without_a_newline_is_read(tools, tmp_path):
+    """Verify that a file not ending in a newline keeps its last row, and that appends after it are numbered correctly."""
+    orders = tmp_path / "orders.csv"
+    orders.write_text(HEADER + "ORD001,8675,20,CustomerA,10000\nORD002,309,10,CustomerB,50")
+    store = tools.order_store.OrderStore(str(orders))
+    store.refresh()
+    assert len(store) == 2
+    assert store.totals(["309"]) == (1, 10, 50.0)
+
+    with open(orders, "a") as f:
+        f.write("\nORD003,309,x,CustomerC,5\n")
+    with pytest.raises(ValueError, match="line 4"):
+        store.refresh()
+
+    header_only = tmp_path / "header.csv"
+    header_only.write_text("Id,Value")
+    csv_file = tools.csv_tail.IncrementalCsvFile(str(header_only), required_columns=("Id", "Value"))
+    assert csv_file.read_changes() == (True, [])
+    assert csv_file.columns == {"Id": 0, "Value": 1}
+
+
+def test_malformed_rows_are_reported_and_not_kept(tools, tmp_path):
+    """Verify that a bad row raises with its line number and leaves no partial data behind."""
+    orders = tmp_path / "orders.csv"
+    orders.write_text(HEADER + "ORD001,8675,20,CustomerA,10000\nORD002,309,ten,CustomerB,5000\n")
+    store = tools.order_store.OrderStore(str(orders))
+    with pytest.raises(ValueError, match="line 3"):
+        store.refresh()
+    assert len(store) == 0
+
+
+def test_calculate_impact_uses_the_order_store(tools):
+    """Verify that the impact assessment still reports the demo orders."""
+    result = tools.impact_calculator.calculate_impact("The Port of Shanghai is closed.")
+    assert "Number of Affected Orders: 1" in result
+    assert "Total Revenue at Risk: $10,000.00" in result
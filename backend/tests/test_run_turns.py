@@ -0,0 +1,103 @@
+import asyncio
+import json
+import pytest
+from fastapi.testclient import TestClient
+
+from backend import main
+from backend.connection_manager import running_processes
+
+AGENT = "agents/echo_agent"
+
+
+class EchoRunner:
+    """Answers each prompt after a delay taken from the prompt, tracking how many turns overlap."""
+
+    def __init__(self):
+        self.active = 0
+        self.max_active = 0
+        self.session_ids = []
+        self.discarded_sessions = []
+
+    async def run_turn(self, prompt: str, session_id=None, discard_session=False) -> dict:
+        self.active += 1
+        if discard_session:
+            self.discarded_sessions.append(session_id)
+        self.max_active = max(self.max_active, self.active)
+        self.session_ids.append(session_id)
+        try:
+            if prompt == "fail":
+                raise RuntimeError("agent crashed")
+            if prompt == "unreachable":
+                return {"error": "Could not connect to the agent."}
+            await asyncio.sleep(float(prompt))
+            return {"response": f"echo {prompt}"}
+        finally:
+            self.active -= 1
+
+
+@pytest.fixture
+def echo_runner():
+    runner = EchoRunner()
+    running_processes[AGENT] = {"runner": runner}
+    yield runner
+    running_processes.pop(AGENT, None)
+
+
+def _post(prompts, **options) -> list:
+    response = TestClient(main.app).post("/run_turns", json={"agent_name": AGENT, "prompts": prompts, **options})
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    return [json.loads(line) for line in response.text.splitlines()]
+
+
+def test_isolated_turns_run_concurrently_and_stream_as_they_finish(echo_runner):
+    """Verify that results arrive in completion order with latency, errors and a summary line."""
+    lines = _post(["0.2", "0.01", "fail", "0.05"], isolated_sessions=True, concurrency=3, keep_sessions=True)
+    items, summary = lines[:-1], lines[-1]["summary"]
+
+    assert [item["index"] for item in items] == [2, 1, 3, 0]
+    assert items[0]["error"] == "RuntimeError: agent crashed"
+    assert items[-1]["response"] == "echo 0.2" and items[-1]["latency_ms"] >= 200
+    assert echo_runner.max_active == 3
+    assert len({item["session_id"] for item in items}) == 4
+    assert echo_runner.discarded_sessions == []
+    assert summary["turns"] == 4 and summary["errors"] == 1 and summary["concurrency"] == 3
+
+
+def test_isolated_sessions_are_discarded_and_reported_errors_counted(echo_runner):
+    """Verify that batch sessions are deleted after their turn, and a turn reporting an error counts as one."""
+    main.turn_metrics.clear(AGENT)
+    lines = _post(["0.01", "unreachable"], isolated_sessions=True)
+    assert len(echo_runner.discarded_sessions) == 2
+    assert all("session_id" not in item for item in lines[:-1])
+    assert lines[-1]["summary"]["errors"] == 1
+    assert main.turn_metrics.snapshot(AGENT)["errors"] == 1
+
+    response = TestClient(main.app).post("/run_turn", json={"agent_name": AGENT, "prompt": "unreachable"})
+    assert response.status_code == 502
+    assert main.turn_metrics.snapshot(AGENT)["errors"] == 2
+    main.turn_metrics.clear(AGENT)
+
+
+def test_shared_session_turns_run_in_order(echo_runner):
+    """Verify that turns in the agent's shared session are not interleaved."""
+    lines = _post(["0.05", "0.01"], concurrency=8)
+    assert [item["index"] for item in lines[:-1]] == [0, 1]
+    assert echo_runner.max_active == 1
+    assert echo_runner.session_ids == [None, None]
+
+
+def test_unknown_agent_is_rejected():
+    """Verify that a batch for an agent that is not running fails before streaming."""
+    response = TestClient(main.app).post("/run_turns", json={"agent_name": "agents/missing", "prompts": ["hi"]})
+    assert response.status_code == 404
+
+
+def test_turn_limits_follow_the_agent_config(monkeypatch):
+    """Verify that the turn metrics of an agent are rebuilt when its configured limits change."""
+    monkeypatch.setattr(main, "AGENT_CONFIGS", {AGENT: main.AgentConfig(max_concurrent_turns=2)})
+    metrics = main.get_turn_metrics(AGENT)
+    assert main.get_turn_metrics(AGENT) is metrics
+    monkeypatch.setattr(main, "AGENT_CONFIGS", {AGENT: main.AgentConfig(max_concurrent_turns=4)})
+    assert main.get_turn_metrics(AGENT).max_concurrent == 4
+    main.turn_metrics.clear(AGENT)
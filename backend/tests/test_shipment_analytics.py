@@ -0,0 +1,63 @@
+import os
+import sys
+import pytest
+
+SUPPLY_CHAIN_AGENT_PATH = os.path.abspath("agents/supply_chain_agent")
+HEADER = "OriginPort,DestinationPort,Carrier,TransitTimeDays\n"
+
+
+@pytest.fixture
+def shipment_analytics():
+    """Imports the shipment analytics module from the supply chain agent's tools package."""
+    sys.path.insert(0, SUPPLY_CHAIN_AGENT_PATH)
+    try:
+        from supply_chain_agent.tools import shipment_analytics
+        yield shipment_analytics
+    finally:
+        sys.path.remove(SUPPLY_CHAIN_AGENT_PATH)
+
+
+def test_delays_are_measured_against_the_fastest_transit_on_each_lane(shipment_analytics, tmp_path):
+    """Verify per-lane and per-carrier statistics, and that appended shipments update them."""
+    shipments = tmp_path / "shipments.csv"
+    shipments.write_text(
+        HEADER
+        + "Shanghai,LongBeach,CarrierA,14\nShanghai,LongBeach,CarrierA,15\n"
+        + "Shanghai,LongBeach,CarrierB,20\nNingbo,LongBeach,CarrierB,16\n"
+    )
+    analytics = shipment_analytics.ShipmentAnalytics(str(shipments))
+
+    lane = analytics.lane_statistics(origin="shanghai")["Shanghai -> LongBeach"]
+    assert lane["shipments"] == 3
+    assert lane["mean_delay_days"] == 2.33
+    assert (lane["p50_delay_days"], lane["p90_delay_days"], lane["max_delay_days"]) == (1, 6, 6)
+    assert lane["on_time_pct"] == 66.7
+
+    carriers = analytics.carrier_statistics()
+    assert carriers["CarrierA"]["on_time_pct"] == 100.0
+    assert carriers["CarrierB"]["shipments"] == 2
+    assert carriers["CarrierB"]["on_time_pct"] == 50.0
+    assert list(analytics.lane_statistics(carrier="CarrierA")) == ["Shanghai -> LongBeach"]
+
+    with open(shipments, "a") as f:
+        f.write("Ningbo,LongBeach,CarrierB,12\n")
+    ningbo = analytics.lane_statistics(origin="Ningbo")["Ningbo -> LongBeach"]
+    assert (ningbo["shipments"], ningbo["mean_transit_days"], ningbo["max_delay_days"]) == (2, 14.0, 4)
+
+
+def test_planned_transit_column_is_used_when_present(shipment_analytics, tmp_path, monkeypatch):
+    """Verify that a planned transit column replaces the lane baseline and the tool formats the result."""
+    shipments = tmp_path / "shipments.csv"
+    shipments.write_text(
+        "OriginPort,DestinationPort,Carrier,TransitTimeDays,PlannedTransitDays\n"
+        "Shanghai,LongBeach,CarrierA,18,14\nShanghai,LongBeach,CarrierA,14,14\n"
+    )
+    analytics = shipment_analytics.ShipmentAnalytics(str(shipments))
+    stats = analytics.carrier_statistics(carrier="CarrierA")["CarrierA"]
+    assert (stats["mean_delay_days"], stats["on_time_pct"]) == (2.0, 50.0)
+
+    monkeypatch.setattr(shipment_analytics, "SHIPMENTS_FILE_PATH", str(shipments))
+    report = shipment_analytics.get_shipment_statistics(carrier="CarrierA")
+    assert "- Shanghai -> LongBeach: 2 shipments" in report
+    assert "50.0% on time" in report
+    assert shipment_analytics.get_shipment_statistics(origin_port="Rotterdam") == "No shipments match the given filters."
@@ -0,0 +1,50 @@
+from backend.startup_profiler import StartupProfile, StartupProfileStore
+
+IMPORTTIME_OUTPUT = [
+    "import time: self [us] | cumulative | imported package",
+    "import time:       120 |        120 | _io",
+    "import time:       300 |        900 |   google.genai.types",
+    "import time:       500 |       2400 | google.adk.runners",
+    "import time:        80 |         80 | fastapi",
+]
+
+
+def test_parses_importtime_output():
+    """Verify that -X importtime lines are parsed and ranked by cumulative time."""
+    profile = StartupProfile("agents/greeting_agent")
+
+    assert all(profile.add_importtime_line(line) for line in IMPORTTIME_OUTPUT)
+    assert not profile.add_importtime_line("INFO:     Uvicorn running on http://0.0.0.0:8001")
+
+    summary = profile.to_dict(top=2)
+
+    assert summary["import_count"] == 4
+    assert [entry["module"] for entry in summary["slowest_imports"]] == ["google.adk.runners", "_io"]
+    assert summary["slowest_imports"][0]["cumulative_ms"] == 2.4
+    # Nested imports are already counted in their parent's cumulative time.
+    assert summary["import_total_s"] == 0.0026
+
+
+def test_records_spawn_to_ready():
+    """Verify that the time from spawn to ready is recorded once."""
+    profile = StartupProfile("agents/greeting_agent")
+    profile.mark_ready()
+    assert profile.spawn_to_ready_s is None
+
+    profile.mark_spawned()
+    profile.mark_ready()
+    first = profile.spawn_to_ready_s
+    profile.mark_ready()
+
+    assert first is not None
+    assert profile.spawn_to_ready_s == first
+
+
+def test_store_keeps_last_launches():
+    """Verify that only the most recent launches of an agent are kept."""
+    store = StartupProfileStore(max_launches=2)
+    for _ in range(3):
+        store.begin("agents/greeting_agent")
+
+    assert len(store.get_profiles("agents/greeting_agent")) == 2
+    assert store.latest("agents/weather_agent") is None
@@ -0,0 +1,66 @@
+import gzip
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from backend.static_frontend import IMMUTABLE_CACHE, mount_frontend
+
+SCRIPT = "console.log('gallery');\n" * 200
+
+
+def _client(tmp_path) -> TestClient:
+    (tmp_path / "assets").mkdir()
+    (tmp_path / "index.html").write_text("<!doctype html><div id=root></div>")
+    (tmp_path / "assets" / "index-BX3k9a2Q.js").write_text(SCRIPT)
+    (tmp_path / "favicon.svg").write_text("<svg/>")
+    app = FastAPI()
+
+    @app.get("/agents")
+    async def agents():
+        return []
+
+    assert mount_frontend(app, str(tmp_path)) is not None
+    return TestClient(app)
+
+
+def test_hashed_assets_are_compressed_and_immutable(tmp_path):
+    """Verify that bundle files are served precompressed to clients that accept it, with a year-long cache."""
+    client = _client(tmp_path)
+    response = client.get("/assets/index-BX3k9a2Q.js", headers={"Accept-Encoding": "gzip"})
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.headers["cache-control"] == IMMUTABLE_CACHE
+    assert response.headers["vary"] == "Accept-Encoding"
+    assert response.text == SCRIPT
+
+    plain = client.get("/assets/index-BX3k9a2Q.js", headers={"Accept-Encoding": "identity"})
+    assert "content-encoding" not in plain.headers
+    assert plain.text == SCRIPT
+    assert plain.headers["etag"] != response.headers["etag"]
+
+    assert client.get("/favicon.svg").headers["cache-control"] == "no-cache"
+    assert client.get("/assets/missing-00000000.js").status_code == 404
+
+
+def test_build_time_compression_is_preferred(tmp_path):
+    """Verify that a .gz file written by the build is served instead of compressing at startup."""
+    (tmp_path / "assets").mkdir()
+    (tmp_path / "assets" / "app-CDEFGHIJ.css").write_text("body{}" * 400)
+    (tmp_path / "assets" / "app-CDEFGHIJ.css.gz").write_bytes(gzip.compress(b"prebuilt"))
+    (tmp_path / "index.html").write_text("<html></html>")
+    app = FastAPI()
+    mount_frontend(app, str(tmp_path))
+    response = TestClient(app).get("/assets/app-CDEFGHIJ.css", headers={"Accept-Encoding": "gzip"})
+    assert response.content == b"prebuilt"
+    assert TestClient(app).get("/assets/app-CDEFGHIJ.css.gz").status_code == 404
+
+
+def test_index_is_revalidated_and_routes_fall_back_to_it(tmp_path):
+    """Verify the index's ETag round trip, the SPA fallback, and that API routes still take precedence."""
+    client = _client(tmp_path)
+    index = client.get("/")
+    assert index.headers["cache-control"] == "no-cache"
+    assert index.headers["content-type"].startswith("text/html")
+    assert client.get("/", headers={"If-None-Match": index.headers["etag"]}).status_code == 304
+
+    route = client.get("/agents/supply_chain_agent/chat")
+    assert route.text == index.text
+    assert client.get("/agents").json() == []
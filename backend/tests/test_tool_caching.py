@@ -0,0 +1,87 @@
+import io
+import json
+import os
+import sys
+import pytest
+from google.adk.tools import FunctionTool
+from backend.event_streaming_plugin import EventStreamingPlugin
+
+SUPPLY_CHAIN_AGENT_PATH = os.path.abspath("agents/supply_chain_agent")
+
+
+@pytest.fixture
+def cached_tool():
+    """Imports the tool caching decorator from the supply chain agent's tools package."""
+    sys.path.insert(0, SUPPLY_CHAIN_AGENT_PATH)
+    try:
+        from supply_chain_agent.tools.caching import cached_tool
+        yield cached_tool
+    finally:
+        sys.path.remove(SUPPLY_CHAIN_AGENT_PATH)
+
+
+def test_results_are_reused_until_a_dependency_changes(cached_tool, tmp_path):
+    """Verify that equivalent calls hit the cache and editing a data file invalidates it."""
+    data_file = tmp_path / "orders.csv"
+    data_file.write_text("SKU,Revenue\n8675,100\n")
+    calls = []
+
+    @cached_tool(depends_on=[str(data_file)], maxsize=2)
+    def count_rows(sku: str, header: bool = True) -> int:
+        """Counts the rows of a SKU."""
+        calls.append(sku)
+        return sum(line.startswith(sku) for line in data_file.read_text().splitlines())
+
+    assert count_rows("8675") == 1
+    assert count_rows(sku="8675", header=True) == 1
+    assert calls == ["8675"]
+    assert count_rows.cache_status({"sku": "8675"}) == {"status": "hit", "size": 1, "hits": 1, "misses": 1}
+
+    # Same size, so only the modification time tells the versions apart.
+    data_file.write_text("SKU,Revenue\n8675,999\n")
+    os.utime(data_file, ns=(0, 1))
+    assert count_rows("8675") == 1
+    assert calls == ["8675", "8675"]
+
+    count_rows("1"), count_rows("2")
+    count_rows("8675")
+    assert calls == ["8675", "8675", "1", "2", "8675"]
+
+
+@pytest.mark.asyncio
+async def test_after_tool_call_reports_cache_status(cached_tool, tmp_path):
+    """Verify that the event streaming plugin includes the cache outcome of a memoized tool."""
+    @cached_tool(depends_on=[str(tmp_path)])
+    def lookup(query: str) -> str:
+        """Looks up an answer."""
+        return f"result for {query}"
+
+    tool = FunctionTool(lookup)
+    assert tool.name == "lookup"
+    assert tool._get_declaration().description == "Looks up an answer."
+
+    pipe = io.StringIO()
+    plugin = EventStreamingPlugin(pipe_writer=pipe)
+    for _ in range(2):
+        result = await tool.run_async(args={"query": "shanghai"}, tool_context=None)
+        await plugin.after_tool_callback(tool=tool, tool_args={"query": "shanghai"}, tool_context=None, result=result)
+
+    events = [json.loads(line) for line in pipe.getvalue().splitlines()]
+    assert [event["data"]["cache"]["status"] for event in events] == ["miss", "hit"]
+
+
+def test_research_results_follow_the_token_budget(monkeypatch):
+    """Verify that changing RESEARCH_TOKEN_BUDGET is not answered with context packed for the old budget."""
+    sys.path.insert(0, SUPPLY_CHAIN_AGENT_PATH)
+    try:
+        from supply_chain_agent.tools.knowledge_retriever import research_solutions
+    finally:
+        sys.path.remove(SUPPLY_CHAIN_AGENT_PATH)
+    query = "Alternative ports if Shanghai is closed"
+    monkeypatch.setenv("RESEARCH_TOKEN_BUDGET", "4000")
+    generous = research_solutions(query)
+    monkeypatch.setenv("RESEARCH_TOKEN_BUDGET", "20")
+    assert research_solutions(query) != generous
+    assert research_solutions.cache_status({"query": query})["status"] == "miss"
+    monkeypatch.setenv("RESEARCH_TOKEN_BUDGET", "4000")
+    assert research_solutions(query) == generous
@@ -0,0 +1,83 @@
+import pytest
+from backend.turn_timeline import TurnTimelineStore
+
+
+def _event(name, ts, span_id, parent_span_id=None, turn_id="turn-1", **data):
+    return {
+        "event": name,
+        "data": data,
+        "ts": ts,
+        "turn_id": turn_id,
+        "span_id": span_id,
+        "parent_span_id": parent_span_id,
+    }
+
+
+def _agent_tool_turn(turn_id="turn-1"):
+    """Events for a turn where the root agent hops to a sub-agent through an AgentTool."""
+    return [
+        _event("on_run_start", 10.0, "root", turn_id=turn_id, agent="RapidResolveAgent"),
+        _event("on_llm_start", 10.1, "llm-1", "root", turn_id=turn_id, agent="RapidResolveAgent", model="gemini-2.5-flash"),
+        _event("on_llm_end", 10.6, "llm-1", "root", turn_id=turn_id),
+        _event("before_tool_call", 10.6, "hop", "root", turn_id=turn_id, tool_call={"name": "ImpactAgent"}, is_agent_tool=True),
+        _event("on_run_start", 10.7, "sub", "hop", turn_id=turn_id, agent="ImpactAgent"),
+        _event("before_tool_call", 10.8, "tool-1", "sub", turn_id=turn_id, tool_call={"name": "calculate_impact"}),
+        _event("after_tool_call", 10.9, "tool-1", "sub", turn_id=turn_id, tool_call={"name": "calculate_impact"}),
+        _event("on_run_end", 11.0, "sub", "hop", turn_id=turn_id, agent="ImpactAgent"),
+        _event("on_run_end", 11.5, "root", turn_id=turn_id, agent="RapidResolveAgent"),
+    ]
+
+
+def test_assembles_turn_with_agent_tool_hop():
+    """Verify that spans are nested and timed relative to the start of the turn."""
+    store = TurnTimelineStore()
+    for event in _agent_tool_turn():
+        store.record("agents/supply_chain_agent", event)
+
+    [turn] = store.get_turns("agents/supply_chain_agent")
+    spans = {span["span_id"]: span for span in turn["spans"]}
+
+    assert turn["turn_id"] == "turn-1"
+    assert turn["duration_ms"] == pytest.approx(1500)
+    assert spans["root"]["kind"] == "turn"
+    assert spans["llm-1"]["name"] == "RapidResolveAgent: gemini-2.5-flash"
+    assert spans["llm-1"]["duration_ms"] == pytest.approx(500)
+    assert spans["hop"]["kind"] == "agent_tool"
+    assert spans["sub"]["kind"] == "agent"
+    assert spans["tool-1"]["offset_ms"] == pytest.approx(800)
+    # The AgentTool hop ends when the sub-agent run it wraps ends.
+    assert spans["hop"]["duration_ms"] == pytest.approx(400)
+    assert all(span["complete"] for span in turn["spans"])
+
+
+def test_open_spans_end_with_turn():
+    """Verify that a span without an end event is closed at the end of its turn."""
+    store = TurnTimelineStore()
+    store.record("agent", _event("on_run_start", 1.0, "root", agent="Agent"))
+    store.record("agent", _event("on_llm_start", 1.5, "llm", "root", agent="Agent"))
+    store.record("agent", _event("on_run_end", 2.0, "root", agent="Agent"))
+
+    [turn] = store.get_turns("agent")
+    llm_span = next(span for span in turn["spans"] if span["span_id"] == "llm")
+
+    assert llm_span["duration_ms"] == pytest.approx(500)
+    assert llm_span["complete"] is False
+
+
+def test_keeps_only_last_turns():
+    """Verify that the store is bounded to the configured number of turns per agent."""
+    store = TurnTimelineStore(max_turns=2)
+    for index in range(3):
+        for event in _agent_tool_turn(turn_id=f"turn-{index}"):
+            store.record("agent", event)
+
+    assert [turn["turn_id"] for turn in store.get_turns("agent")] == ["turn-1", "turn-2"]
+    assert [turn["turn_id"] for turn in store.get_turns("agent", limit=1)] == ["turn-2"]
+
+
+def test_ignores_unstamped_events():
+    """Verify that events without correlation ids do not create turns."""
+    store = TurnTimelineStore()
+    store.record("agent", {"event": "on_llm_start", "data": {}})
+
+    assert store.get_turns("agent") == []
@@ -0,0 +1,112 @@
+import asyncio
+import json
+import pytest
+from fastapi.testclient import TestClient
+
+from backend import main
+from backend.connection_manager import ConnectionManager, manager
+
+
+class _Client:
+    def __init__(self):
+        self.messages = []
+
+    async def send_text(self, message: str):
+        self.messages.append(json.loads(message))
+
+
+@pytest.mark.asyncio
+async def test_broadcasts_are_stamped_and_replayed_in_order():
+    """Verify that a resuming client receives exactly the broadcasts after its last seq, including ones made mid-replay."""
+    stream = ConnectionManager(replay_size=10)
+    for i in range(5):
+        await stream.broadcast(json.dumps({"type": "log", "line": f"line {i}"}))
+    await stream.broadcast("{}")
+    assert [seq for seq, _ in stream._replay] == [1, 2, 3, 4, 5, 6]
+    assert json.loads(stream._replay[-1][1]) == {"stream_seq": 6}
+
+    client = _Client()
+    replay = asyncio.create_task(stream.connect(client, last_seq=3))
+    await asyncio.sleep(0)
+    await stream.broadcast(json.dumps({"type": "log", "line": "live"}))
+    assert await replay
+    assert [message["stream_seq"] for message in client.messages] == [4, 5, 6, 7]
+    assert client.messages[0] == {"stream_seq": 4, "type": "log", "line": "line 3"}
+
+
+@pytest.mark.asyncio
+async def test_resume_requires_same_instance_and_buffered_gap():
+    """Verify that clients of another backend instance, or behind the replay buffer, need a snapshot."""
+    stream = ConnectionManager(replay_size=3)
+    for i in range(5):
+        await stream.broadcast(json.dumps({"i": i}))
+    assert stream.can_resume(stream.instance_id, 2)
+    assert stream.can_resume(stream.instance_id, 5)
+    assert not stream.can_resume(stream.instance_id, 1)
+    assert not stream.can_resume(stream.instance_id, 6)
+    assert not stream.can_resume("other", 4)
+    assert not await stream.connect(_Client(), last_seq=1)
+
+
+@pytest.mark.asyncio
+async def test_snapshot_is_sent_before_live_broadcasts():
+    """Verify that a client needing a snapshot joins the live stream only after it, and is sent what was broadcast meanwhile."""
+    stream = ConnectionManager(replay_size=10)
+    await stream.broadcast(json.dumps({"type": "log", "line": "before"}))
+    client = _Client()
+
+    async def snapshot(websocket):
+        assert websocket not in stream.active_connections
+        await websocket.send_text(json.dumps({"type": "log_backfill", "lines": ["before"]}))
+        await stream.broadcast(json.dumps({"type": "log", "line": "during"}))
+
+    assert not await stream.connect(client, snapshot=snapshot)
+    await stream.broadcast(json.dumps({"type": "log", "line": "after"}))
+    assert [message.get("line") for message in client.messages] == [None, "during", "after"]
+    assert client.messages[0]["type"] == "log_backfill"
+
+
+def test_reconnecting_client_resumes_without_snapshot(monkeypatch):
+    """Verify that /ws replays the missed broadcasts to a reconnecting client instead of sending a snapshot."""
+    monkeypatch.setattr(main, "IDLE_STOP_SECONDS", -1)
+    client = TestClient(main.app)
+    with client.websocket_connect("/ws?backfill=0") as websocket:
+        config = websocket.receive_json()
+        assert not config["resumed"]
+        assert websocket.receive_json()["line"] == "Connection established."
+    asyncio.run(manager.broadcast(json.dumps({"type": "status", "agent": "agents/x", "status": "stopped"})))
+
+    query = f"instance={config['stream_instance']}&last_seq={config['stream_seq']}"
+    with client.websocket_connect(f"/ws?{query}") as websocket:
+        assert websocket.receive_json()["resumed"]
+        missed = websocket.receive_json()
+        assert missed == {"stream_seq": config["stream_seq"] + 1, "type": "status", "agent": "agents/x", "status": "stopped"}
+
+    with client.websocket_connect("/ws?backfill=0&instance=stale&last_seq=1") as websocket:
+        assert not websocket.receive_json()["resumed"]
+        assert websocket.receive_json()["line"] == "Connection established."
+
+
+@pytest.mark.asyncio
+async def test_idle_agents_are_stopped_after_grace_period(monkeypatch):
+    """Verify that agents serving turns outlive the grace period and the others are stopped."""
+    stopped = []
+
+    async def fake_stop(agent_name):
+        stopped.append(agent_name)
+        main.running_processes.pop(agent_name, None)
+
+    monkeypatch.setattr(main, "stop_agent_process", fake_stop)
+    monkeypatch.setattr(manager, "active_connections", [])
+    for agent_name in ("agents/idle", "agents/busy"):
+        monkeypatch.setitem(main.running_processes, agent_name, {"runner": None})
+    metrics = main.turn_metrics.get("agents/busy")
+    started = await metrics.acquire()
+
+    task = asyncio.create_task(main.stop_agents_when_idle(0.01))
+    await asyncio.sleep(0.015)
+    assert stopped == ["agents/idle"]
+    metrics.release(started)
+    await asyncio.wait_for(task, 1)
+    assert stopped == ["agents/idle", "agents/busy"]
+    main.turn_metrics.clear("agents/busy")
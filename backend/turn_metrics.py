@@ -0,0 +1,116 @@
+import asyncio
+import time
+from collections import deque
+from typing import Deque, Dict, List, Optional
+
+# Latency samples kept per agent for the percentiles.
+MAX_SAMPLES = 512
+
+
+class AdmissionRejected(Exception):
+    """Raised when an agent already has as many turns queued as it allows."""
+
+
+def _percentile(ordered: List[float], pct: float) -> float:
+    """Returns the nearest-rank percentile of sorted values."""
+    rank = max(int(round(pct / 100 * len(ordered) + 0.5)) - 1, 0)
+    return ordered[min(rank, len(ordered) - 1)]
+
+
+class AgentTurnMetrics:
+    """
+    Admission control and latency metrics for the turns sent to one agent.
+
+    At most `max_concurrent` turns run at once; up to `max_queued` more wait
+    for a slot, and turns beyond that are rejected rather than left to time
+    out behind the queue.
+    """
+
+    def __init__(self, max_concurrent: int, max_queued: int):
+        self.max_concurrent = max_concurrent
+        self.max_queued = max_queued
+        self._semaphore = asyncio.Semaphore(max_concurrent)
+        self.running = 0
+        self.queued = 0
+        self.completed = 0
+        self.errors = 0
+        self.rejected = 0
+        self._latency_ms: Deque[float] = deque(maxlen=MAX_SAMPLES)
+        self._queue_ms: Deque[float] = deque(maxlen=MAX_SAMPLES)
+
+    async def acquire(self) -> float:
+        """Waits for a turn slot and returns the time the turn started."""
+        if self._semaphore.locked() and self.queued >= self.max_queued:
+            self.rejected += 1
+            raise AdmissionRejected(f"{self.running} turns running and {self.queued} queued")
+        queued_at = time.perf_counter()
+        self.queued += 1
+        try:
+            await self._semaphore.acquire()
+        finally:
+            self.queued -= 1
+        started = time.perf_counter()
+        self._queue_ms.append((started - queued_at) * 1000)
+        self.running += 1
+        return started
+
+    def release(self, started: float, error: bool = False) -> None:
+        """Frees the slot of a turn that started at `started` and records its latency."""
+        self.running -= 1
+        self._semaphore.release()
+        self._latency_ms.append((time.perf_counter() - started) * 1000)
+        self.completed += 1
+        self.errors += error
+
+    def snapshot(self) -> dict:
+        latencies = sorted(self._latency_ms)
+        queue_waits = sorted(self._queue_ms)
+        snapshot = {
+            "max_concurrent": self.max_concurrent,
+            "max_queued": self.max_queued,
+            "running": self.running,
+            "queued": self.queued,
+            "completed": self.completed,
+            "errors": self.errors,
+            "rejected": self.rejected,
+        }
+        if latencies:
+            snapshot["latency_ms"] = {
+                "mean": round(sum(latencies) / len(latencies), 3),
+                "p50": round(_percentile(latencies, 50), 3),
+                "p95": round(_percentile(latencies, 95), 3),
+                "max": round(latencies[-1], 3),
+            }
+            snapshot["queue_wait_ms"] = {
+                "p50": round(_percentile(queue_waits, 50), 3),
+                "p95": round(_percentile(queue_waits, 95), 3),
+            }
+        return snapshot
+
+
+class TurnMetricsStore:
+    """
+    Keeps the turn metrics of each agent, created on the agent's first turn
+    and replaced when the agent's configured limits change, so an edited
+    config takes effect without a backend restart.
+    """
+
+    def __init__(self):
+        self._agents: Dict[str, AgentTurnMetrics] = {}
+
+    def get(self, agent_id: str, max_concurrent: int = 8, max_queued: int = 32) -> AgentTurnMetrics:
+        metrics = self._agents.get(agent_id)
+        if metrics is None or (metrics.max_concurrent, metrics.max_queued) != (max_concurrent, max_queued):
+            # Turns already running release the slots of the metrics they started with.
+            metrics = self._agents[agent_id] = AgentTurnMetrics(max_concurrent, max_queued)
+        return metrics
+
+    def snapshot(self, agent_id: str) -> Optional[dict]:
+        metrics = self._agents.get(agent_id)
+        return metrics.snapshot() if metrics else None
+
+    def clear(self, agent_id: str) -> None:
+        self._agents.pop(agent_id, None)
+
+
+turn_metrics = TurnMetricsStore()
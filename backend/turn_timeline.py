@@ -0,0 +1,127 @@
+from collections import deque
+from typing import Deque, Dict, List, Optional
+
+# Maps the events that open a span to the kind of span they open, and the
+# events that close a span. Everything else is ignored by the timeline.
+_SPAN_START_EVENTS = {
+    "on_run_start": "agent",
+    "on_llm_start": "llm",
+    "before_tool_call": "tool",
+}
+_SPAN_END_EVENTS = {"on_run_end", "on_llm_end", "after_tool_call"}
+
+# Upper bound on turns that may be in flight per agent, so a host that never
+# closes its turns cannot grow the store without limit.
+MAX_OPEN_TURNS = 16
+
+
+class TurnTimelineStore:
+    """Assembles stamped agent events into per-turn span timelines and keeps the last N turns per agent."""
+
+    def __init__(self, max_turns: int = 20):
+        self.max_turns = max_turns
+        self._completed: Dict[str, Deque[dict]] = {}
+        self._open: Dict[str, Dict[str, dict]] = {}
+
+    def record(self, agent_id: str, event: dict) -> None:
+        """Folds a single event from an agent's event pipe into its timeline."""
+        turn_id = event.get("turn_id")
+        span_id = event.get("span_id")
+        ts = event.get("ts")
+        event_name = event.get("event")
+        if turn_id is None or span_id is None or ts is None:
+            return
+
+        open_turns = self._open.setdefault(agent_id, {})
+        turn = open_turns.get(turn_id)
+
+        if event_name in _SPAN_START_EVENTS:
+            if turn is None:
+                if len(open_turns) >= MAX_OPEN_TURNS:
+                    open_turns.pop(next(iter(open_turns)))
+                turn = {"turn_id": turn_id, "root_span_id": None, "spans": {}}
+                open_turns[turn_id] = turn
+            turn["spans"][span_id] = self._new_span(event, turn)
+        elif event_name in _SPAN_END_EVENTS and turn is not None:
+            span = turn["spans"].get(span_id)
+            if span is None:
+                return
+            span["end"] = ts
+            parent = turn["spans"].get(span["parent_span_id"])
+            # AgentTool hops emit no end event of their own; they finish
+            # when the sub-agent run they wrap finishes.
+            if span["kind"] == "agent" and parent is not None and parent["kind"] == "agent_tool":
+                parent["end"] = ts
+            if span_id == turn["root_span_id"]:
+                self._complete(agent_id, open_turns.pop(turn_id))
+
+    def _new_span(self, event: dict, turn: dict) -> dict:
+        data = event.get("data") or {}
+        kind = _SPAN_START_EVENTS[event["event"]]
+        parent_span_id = event.get("parent_span_id")
+
+        if kind == "agent":
+            name = data.get("agent", "agent")
+            if parent_span_id is None:
+                kind = "turn"
+                turn["root_span_id"] = event["span_id"]
+        elif kind == "llm":
+            name = data.get("model") or "llm"
+            if data.get("agent"):
+                name = f"{data['agent']}: {name}"
+        else:
+            name = (data.get("tool_call") or {}).get("name", "tool")
+            if data.get("is_agent_tool"):
+                kind = "agent_tool"
+
+        return {
+            "span_id": event["span_id"],
+            "parent_span_id": parent_span_id,
+            "kind": kind,
+            "name": name,
+            "start": event["ts"],
+            "end": None,
+        }
+
+    def _complete(self, agent_id: str, turn: dict) -> None:
+        """Converts a finished turn into its serializable form and stores it."""
+        spans = list(turn["spans"].values())
+        root = turn["spans"][turn["root_span_id"]]
+        turn_start = root["start"]
+        turn_end = root["end"]
+
+        timeline_spans = []
+        for span in sorted(spans, key=lambda s: s["start"]):
+            # Spans left open (e.g. a short-circuited model call) end with the turn.
+            end = span["end"] if span["end"] is not None else turn_end
+            timeline_spans.append({
+                "span_id": span["span_id"],
+                "parent_span_id": span["parent_span_id"],
+                "kind": span["kind"],
+                "name": span["name"],
+                "offset_ms": round((span["start"] - turn_start) * 1000, 3),
+                "duration_ms": round((end - span["start"]) * 1000, 3),
+                "complete": span["end"] is not None,
+            })
+
+        completed = self._completed.setdefault(agent_id, deque(maxlen=self.max_turns))
+        completed.append({
+            "turn_id": turn["turn_id"],
+            "agent": root["name"],
+            "duration_ms": round((turn_end - turn_start) * 1000, 3),
+            "spans": timeline_spans,
+        })
+
+    def get_turns(self, agent_id: str, limit: Optional[int] = None) -> List[dict]:
+        """Returns the most recent completed turns for an agent, oldest first."""
+        turns = list(self._completed.get(agent_id, ()))
+        if limit is not None:
+            turns = turns[-limit:] if limit > 0 else []
+        return turns
+
+    def clear(self, agent_id: str) -> None:
+        self._completed.pop(agent_id, None)
+        self._open.pop(agent_id, None)
+
+
+timeline_store = TurnTimelineStore()
@@ -1,16 +1,30 @@
-import React, { useState } from 'react';
-import { AgentEvent } from '../types';
+import React, { useState, useEffect } from 'react';
+import { AgentEvent, TimelineSpan, TurnTimeline } from '../types';
 import { ChevronDownIcon, ChevronRightIcon } from './icons';
 import SyntaxHighlighter from 'react-syntax-highlighter';
 import { tomorrowNight } from 'react-syntax-highlighter/dist/esm/styles/hljs';
+import { getAgentTimeline } from '../services/agentService';
 
 interface EventViewerProps {
+  agentId?: string;
   events: AgentEvent[];
   onClear: () => void;
 }
 
+type ViewMode = 'Events' | 'Timeline';
+
+const SPAN_COLORS: Record<TimelineSpan['kind'], string> = {
+  turn: 'bg-adk-dark-3',
+  agent: 'bg-purple-600',
+  agent_tool: 'bg-purple-400',
+  llm: 'bg-adk-accent',
+  tool: 'bg-green-600',
+};
+
 const EventItem: React.FC<{ event: AgentEvent }> = ({ event }) => {
   const [isExpanded, setIsExpanded] = useState(false);
+  // Model responses replayed by the LLM cache and results of memoized tools.
+  const isCacheHit = event.data.data?.cached === true || event.data.data?.cache?.status === 'hit';
 
   return (
     <div className="border-b border-adk-dark-3">
@@ -24,6 +38,9 @@ const EventItem: React.FC<{ event: AgentEvent }> = ({ event }) => {
           <ChevronRightIcon className="w-4 h-4 mr-2 text-adk-text-secondary" />
         )}
         <span className="font-semibold text-adk-text">{event.data.event}</span>
+        {isCacheHit && (
+          <span className="ml-2 px-1.5 py-0.5 text-xs rounded bg-green-600 text-white">cached</span>
+        )}
       </button>
       {isExpanded && (
         <div className="p-2 bg-adk-dark-1">
@@ -36,10 +53,108 @@ const EventItem: React.FC<{ event: AgentEvent }> = ({ event }) => {
   );
 };
 
-export const EventViewer: React.FC<EventViewerProps> = ({ events, onClear }) => {
+const getSpanDepth = (span: TimelineSpan, spansById: Map<string, TimelineSpan>): number => {
+  let depth = 0;
+  let parentId = span.parent_span_id;
+  while (parentId && spansById.has(parentId)) {
+    depth += 1;
+    parentId = spansById.get(parentId)!.parent_span_id;
+  }
+  return depth;
+};
+
+const TurnWaterfall: React.FC<{ turn: TurnTimeline }> = ({ turn }) => {
+  const spansById = new Map(turn.spans.map(span => [span.span_id, span]));
+  const total = turn.duration_ms || 1;
+
+  return (
+    <div className="border-b border-adk-dark-3 p-2">
+      <div className="flex justify-between text-xs text-adk-text-secondary mb-1">
+        <span className="font-semibold text-adk-text">{turn.agent}</span>
+        <span>{turn.duration_ms.toFixed(0)} ms</span>
+      </div>
+      {turn.spans.map(span => (
+        <div key={span.span_id} className="flex items-center text-xs h-5">
+          <span
+            className="w-48 flex-shrink-0 truncate text-adk-text-secondary"
+            style={{ paddingLeft: `${getSpanDepth(span, spansById) * 0.75}rem` }}
+            title={span.name}
+          >
+            {span.name}
+          </span>
+          <div className="relative flex-1 h-3">
+            <div
+              className={`absolute h-3 rounded-sm ${SPAN_COLORS[span.kind]} ${span.complete ? '' : 'opacity-50'}`}
+              style={{
+                left: `${(span.offset_ms / total) * 100}%`,
+                width: `${Math.max((span.duration_ms / total) * 100, 0.5)}%`,
+              }}
+              title={`${span.kind}: ${span.duration_ms.toFixed(1)} ms`}
+            />
+          </div>
+          <span className="w-16 flex-shrink-0 text-right text-adk-text-secondary">{span.duration_ms.toFixed(0)} ms</span>
+        </div>
+      ))}
+    </div>
+  );
+};
+
+export const EventViewer: React.FC<EventViewerProps> = ({ agentId, events, onClear }) => {
+  const [viewMode, setViewMode] = useState<ViewMode>('Events');
+  const [turns, setTurns] = useState<TurnTimeline[]>([]);
+
+  // A turn is only added to the timeline once its root run has ended.
+  const completedRuns = events.filter(event => event.data.event === 'on_run_end').length;
+
+  useEffect(() => {
+    if (viewMode !== 'Timeline' || !agentId) {
+      return;
+    }
+    getAgentTimeline(agentId)
+      .then(data => setTurns([...data].reverse()))
+      .catch(() => setTurns([]));
+  }, [viewMode, agentId, completedRuns]);
+
+  const getModeClass = (mode: ViewMode) => {
+    return `px-3 py-1 text-xs rounded transition-colors ${
+      viewMode === mode
+      ? 'bg-adk-accent text-white'
+      : 'bg-adk-dark-3 text-adk-text-secondary hover:bg-adk-dark-4'
+    }`;
+  };
+
+  const renderContent = () => {
+    if (viewMode === 'Timeline') {
+      return turns.length > 0 ? (
+        turns.map(turn => <TurnWaterfall key={turn.turn_id} turn={turn} />)
+      ) : (
+        <div className="flex items-center justify-center h-full text-adk-text-secondary">
+          No completed turns to display.
+        </div>
+      );
+    }
+    return events.length > 0 ? (
+      events.map((event, index) => (
+        <EventItem key={index} event={event} />
+      ))
+    ) : (
+      <div className="flex items-center justify-center h-full text-adk-text-secondary">
+        No events to display.
+      </div>
+    );
+  };
+
   return (
     <div className="h-full flex flex-col">
-      <div className="flex-shrink-0 p-2 border-b border-adk-dark-3 flex justify-end">
+      <div className="flex-shrink-0 p-2 border-b border-adk-dark-3 flex justify-between">
+        <div className="flex space-x-1">
+          <button onClick={() => setViewMode('Events')} className={getModeClass('Events')}>
+            Events
+          </button>
+          <button onClick={() => setViewMode('Timeline')} className={getModeClass('Timeline')}>
+            Timeline
+          </button>
+        </div>
         <button
           onClick={onClear}
           className="px-3 py-1 text-xs bg-adk-dark-3 text-adk-text-secondary rounded hover:bg-adk-dark-4 transition-colors"
@@ -48,15 +163,7 @@ export const EventViewer: React.FC<EventViewerProps> = ({ events, onClear }) =>
         </button>
       </div>
       <div className="flex-1 overflow-y-auto">
-        {events.length > 0 ? (
-          events.map((event, index) => (
-            <EventItem key={index} event={event} />
-          ))
-        ) : (
-          <div className="flex items-center justify-center h-full text-adk-text-secondary">
-            No events to display.
-          </div>
-        )}
+        {renderContent()}
       </div>
     </div>
   );
@@ -103,6 +103,7 @@ export const InfoPane: React.FC<InfoPaneProps> = ({ logs, agents, selectedAgent,
         return (
           <div data-testid="info-pane-events" className="h-full">
             <EventViewer 
+              agentId={selectedAgent?.id}
               events={filteredEvents} 
               onClear={() => selectedAgent && onClearAgentEvents(selectedAgent.id)} 
             />
@@ -1,2 +1,9 @@
 // config.ts
-export const API_BASE_URL = 'http://localhost:8000';
+// The Vite dev server runs on its own port and talks to the backend on
+// localhost:8000. A build served by the backend talks to the origin it was
+// loaded from, so it works behind any host, port or TLS proxy.
+const DEV_SERVER_PORT = '5173';
+const servedByBackend = window.location.protocol.startsWith('http') && window.location.port !== DEV_SERVER_PORT;
+
+export const API_BASE_URL = servedByBackend ? window.location.origin : 'http://localhost:8000';
+export const WS_BASE_URL = API_BASE_URL.replace(/^http/, 'ws');
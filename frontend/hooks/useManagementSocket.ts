@@ -1,9 +1,10 @@
 import { useState, useEffect, useRef, useCallback } from 'react';
 import { Agent, AgentStatus, ServerMessage, AgentEvent, AgentGroup } from '../types';
 import { sessionManager } from '../services/sessionManager';
+import { API_BASE_URL, WS_BASE_URL } from '../config';
 
-const MANAGEMENT_URL = 'ws://localhost:8000/ws';
-const AGENTS_URL = 'http://localhost:8000/agents';
+const MANAGEMENT_URL = `${WS_BASE_URL}/ws`;
+const AGENTS_URL = `${API_BASE_URL}/agents`;
 
 export const useManagementSocket = ({ onAgentStarted }: { onAgentStarted: (agent: Agent) => void; }) => {
   const [agents, setAgents] = useState<Agent[]>([]);
@@ -16,6 +17,12 @@ export const useManagementSocket = ({ onAgentStarted }: { onAgentStarted: (agent
   const onAgentStartedRef = useRef(onAgentStarted);
   const reconnectTimer = useRef<NodeJS.Timeout | null>(null);
   const isInitialConnection = useRef(true);
+  // The newest log seq shown per agent, so lines replayed on reconnect are not shown twice.
+  const lastLogSeq = useRef<Record<string, number>>({});
+  const logInstance = useRef<string | null>(null);
+  // The last broadcast received, sent on reconnect so the server replays only what was missed.
+  const streamInstance = useRef<string | null>(null);
+  const lastStreamSeq = useRef<number | null>(null);
 
   useEffect(() => {
     onAgentStartedRef.current = onAgentStarted;
@@ -25,6 +32,16 @@ export const useManagementSocket = ({ onAgentStarted }: { onAgentStarted: (agent
     setLogs(prev => [...prev.slice(-200), log]);
   }, []);
 
+  const appendAgentLog = useCallback((agent: string, line: string, seq?: number) => {
+    if (seq !== undefined) {
+      if (seq <= (lastLogSeq.current[agent] ?? 0)) {
+        return;
+      }
+      lastLogSeq.current[agent] = seq;
+    }
+    appendLog(`[${agent}] ${line}`);
+  }, [appendLog]);
+
   const clearAgentEvents = useCallback((agentId: string) => {
     setAgentEvents(prev => ({ ...prev, [agentId]: [] }));
   }, []);
@@ -96,11 +113,11 @@ export const useManagementSocket = ({ onAgentStarted }: { onAgentStarted: (agent
           throw new Error(`Server responded with status: ${response.status}`);
         }
         const data = await response.json();
-        const agentsWithStatus = data.map((agent: any) => ({
-          ...agent,
-          status: AgentStatus.STOPPED,
+        // Statuses are kept across a reconnect; a server that cannot resume the stream resets them.
+        setAgents(prev => data.map((agent: any) => {
+          const known = prev.find(a => a.id === agent.id);
+          return { ...agent, status: known?.status ?? AgentStatus.STOPPED, url: known?.url };
         }));
-        setAgents(agentsWithStatus);
       } catch (error) {
         console.error("Failed to fetch agents, retrying in 3s:", error);
         appendLog('--- Management server offline, trying to connect... ---');
@@ -110,7 +127,10 @@ export const useManagementSocket = ({ onAgentStarted }: { onAgentStarted: (agent
       }
 
       // If fetching agents is successful, connect to WebSocket
-      ws.current = new WebSocket(MANAGEMENT_URL);
+      const resumeQuery = streamInstance.current && lastStreamSeq.current !== null
+        ? `?instance=${streamInstance.current}&last_seq=${lastStreamSeq.current}`
+        : '';
+      ws.current = new WebSocket(MANAGEMENT_URL + resumeQuery);
 
       ws.current.onopen = () => {
         setIsConnected(true);
@@ -123,7 +143,6 @@ export const useManagementSocket = ({ onAgentStarted }: { onAgentStarted: (agent
       ws.current.onclose = () => {
         setIsConnected(false);
         appendLog('--- Disconnected. Attempting to reconnect... ---');
-        setAgents(prev => prev.map(a => ({ ...a, status: AgentStatus.STOPPED, url: undefined })));
         // Don't use a timer here, as the fetch logic handles retries.
         // Instead, we'll trigger a reconnect directly.
         if (!reconnectTimer.current) {
@@ -134,8 +153,36 @@ export const useManagementSocket = ({ onAgentStarted }: { onAgentStarted: (agent
       ws.current.onmessage = (event) => {
         try {
           const message: ServerMessage = JSON.parse(event.data);
+          if (message.stream_seq !== undefined && message.type !== 'config') {
+            if (lastStreamSeq.current !== null && message.stream_seq <= lastStreamSeq.current) {
+              return;
+            }
+            lastStreamSeq.current = message.stream_seq;
+          }
           if (message.type === 'config') {
+            if (!message.resumed) {
+              // Running agents are re-announced in the snapshot that follows.
+              streamInstance.current = message.stream_instance ?? null;
+              lastStreamSeq.current = message.stream_seq ?? null;
+              setAgents(prev => prev.map(a => ({ ...a, status: AgentStatus.STOPPED, url: undefined })));
+            }
+            setAgentRoots(message.data);
+            // A restarted backend numbers its log lines from the start again.
+            if (message.log_instance && message.log_instance !== logInstance.current) {
+              logInstance.current = message.log_instance;
+              lastLogSeq.current = {};
+            }
+          } else if (message.type === 'config_delta') {
             setAgentRoots(message.data);
+            const removed = new Set(message.agents_removed);
+            const updated = new Map(message.agents_updated.map(agent => [agent.id, agent]));
+            // Statuses are kept; running agents are not restarted by a config change.
+            setAgents(prev => [
+              ...prev.filter(a => !removed.has(a.id)).map(a => updated.has(a.id) ? { ...a, ...updated.get(a.id) } : a),
+              ...message.agents_added.map(agent => ({ ...agent, status: AgentStatus.STOPPED })),
+            ]);
+            message.restart_required.forEach(agentId =>
+              appendLog(`--- Config of ${agentId} changed; restart it to apply ---`));
           } else if (message.type === 'status') {
             const { agent: agentId, status, url } = message;
             setAgents(prevAgents => {
@@ -172,8 +219,11 @@ export const useManagementSocket = ({ onAgentStarted }: { onAgentStarted: (agent
               return newAgents;
             });
           } else if (message.type === 'log') {
-            const { agent, line } = message;
-            appendLog(`[${agent}] ${line}`);
+            const { agent, line, seq } = message;
+            appendAgentLog(agent, line, seq);
+          } else if (message.type === 'log_backfill') {
+            const { agent, lines } = message;
+            lines.forEach(entry => appendAgentLog(agent, entry.line, entry.seq));
           } else if (message.type === 'agent_event') {
             const { agent: agentId } = message;
             setAgentEvents(prev => ({
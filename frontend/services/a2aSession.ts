@@ -1,51 +1,59 @@
+import { v4 as uuidv4 } from 'uuid';
 import { BaseSession } from './baseSession';
 import { HttpError } from '../types';
+import { API_BASE_URL } from '../config';
+
+// Collects the text parts of an A2A Message or Task result.
+function resultText(result: any): string {
+    const texts = (parts: any[] | undefined) =>
+        (parts || []).filter((part: any) => (part.kind ?? 'text') === 'text' && part.text).map((part: any) => part.text);
+
+    if (!result) {
+        return '';
+    }
+    if (result.kind === 'message' || result.parts) {
+        return texts(result.parts).join('');
+    }
+    const artifactText = (result.artifacts || [])
+        .map((artifact: any) => texts(artifact.parts).join(''))
+        .filter((text: string) => text);
+    if (artifactText.length > 0) {
+        return artifactText.join('\n');
+    }
+    return texts(result.status?.message?.parts).join('');
+}
 
 export class A2aSession extends BaseSession {
+    // Assigned by the agent on the first turn and sent with every later one.
+    private contextId?: string;
+
     constructor(agentId: string, agentName: string, agentType: 'adk' | 'a2a', agentUrl?: string) {
         super(agentId, agentName, agentType, agentUrl);
-        this.createA2ASession();
-    }
-
-    private async createA2ASession(): Promise<void> {
-        if (!this.agentUrl) {
-            console.error("Cannot create A2A session: agent URL is not defined.");
-            return;
-        }
-        const url = `${this.agentUrl}/apps/${this.agentName}/users/${this.userId}/sessions/${this.sessionId}`;
-        const options = {
-            method: 'POST',
-            headers: { 'Content-Type': 'application/json' },
-        };
-        const request = new Request(url, options);
-        try {
-            const response = await fetch(request);
-            if (!response.ok) {
-                const errorText = await response.text();
-                console.error("Failed to create A2A session:", errorText);
-                throw new HttpError(`Failed to create session: ${response.statusText}`, response.status);
-            }
-        } catch (error) {
-            console.error("Error creating A2A session:", error);
-        }
     }
 
     async runTurn(prompt: string, file: File | null = null): Promise<string> {
-        if (!this.agentUrl) {
-            throw new Error("Agent URL is not available.");
-        }
-        const url = `${this.agentUrl}/run`;
-        
+        // Turns go through the backend, which pools connections to the agent and applies its admission control.
+        const url = `${API_BASE_URL}/a2a/${this.agentId}/rpc`;
+
         let historyPrompt = prompt;
         if (file) {
             historyPrompt += `\n[File attached: ${file.name}]`;
         }
 
+        const message: Record<string, any> = {
+            role: 'user',
+            kind: 'message',
+            messageId: uuidv4(),
+            parts: [{ kind: 'text', text: prompt }],
+        };
+        if (this.contextId) {
+            message.contextId = this.contextId;
+        }
         const body = {
-            appName: this.agentName,
-            userId: this.userId,
-            sessionId: this.sessionId,
-            newMessage: { parts: [{ text: prompt }] }
+            jsonrpc: '2.0',
+            id: uuidv4(),
+            method: 'message/send',
+            params: { message },
         };
 
         const controller = new AbortController();
@@ -60,12 +68,12 @@ export class A2aSession extends BaseSession {
 
         const request = new Request(url, options);
         const requestClone = request.clone();
-        
+
         this.history.push({ role: 'user', content: historyPrompt });
 
         try {
             const response = await fetch(request);
-            
+
             if (!response.ok) {
                 const errorText = await response.text();
                 console.error("Error response from server:", errorText);
@@ -74,25 +82,17 @@ export class A2aSession extends BaseSession {
             }
 
             const responseData = await response.json();
-            
-            // Find the last event with a text part in the content
-            let agentResponse = '';
-            if (Array.isArray(responseData)) {
-                for (let i = responseData.length - 1; i >= 0; i--) {
-                    const event = responseData[i];
-                    if (event.content && event.content.parts && event.content.parts.length > 0) {
-                        const textPart = event.content.parts.find((part: any) => 'text' in part);
-                        if (textPart) {
-                            agentResponse = textPart.text;
-                            break;
-                        }
-                    }
-                }
+            await this.recordRequest(requestClone, response, JSON.stringify(responseData));
+
+            if (responseData.error) {
+                throw new HttpError(`Agent returned an error: ${responseData.error.message}`, response.status);
+            }
+            if (responseData.result?.contextId) {
+                this.contextId = responseData.result.contextId;
             }
 
+            const agentResponse = resultText(responseData.result);
             this.history.push({ role: 'model', content: agentResponse });
-            
-            await this.recordRequest(requestClone, response, JSON.stringify(responseData));
 
             return agentResponse;
         } finally {
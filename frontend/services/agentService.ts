@@ -1,4 +1,4 @@
-import type { Agent, AgentCodeFile, AgentCodeComplex } from '../types';
+import type { Agent, AgentCodeFile, AgentCodeComplex, TurnTimeline } from '../types';
 import { HttpError } from '../types';
 import { API_BASE_URL } from '../config';
 
@@ -47,6 +47,21 @@ export const getAgentReadme = async (agentId: string): Promise<string> => {
   }
 };
 
+export const getAgentTimeline = async (agentId: string): Promise<TurnTimeline[]> => {
+  try {
+    const encodedAgentId = encodeURIComponent(agentId);
+    const response = await fetch(`${API_BASE_URL}/agents/${encodedAgentId}/timeline`);
+    if (!response.ok) {
+      throw new HttpError(`HTTP error! status: ${response.status}`, response.status);
+    }
+    const data = await response.json();
+    return data.turns;
+  } catch (error) {
+    console.error(`Error fetching timeline for agent ${agentId}:`, error);
+    throw error;
+  }
+};
+
 export const causeError = async (agent: Agent): Promise<void> => {
   try {
     const response = await fetch(`${agent.url}/nonexistent-endpoint`, {
@@ -60,15 +60,43 @@ export interface StatusMessage {
     pid?: number;
 }
 
-export interface LogMessage {
+export interface LogEntry {
+    seq: number;
+    ts: number;
+    level: 'error' | 'warning' | 'info' | 'debug';
+    line: string;
+}
+
+export interface LogMessage extends Partial<LogEntry> {
     type: 'log';
     agent: string;
     line: string;
 }
 
+export interface LogBackfillMessage {
+    type: 'log_backfill';
+    agent: string;
+    lines: LogEntry[];
+}
+
 export interface ConfigMessage {
   type: 'config';
   data: { name: string; path: string }[];
+  log_instance?: string;
+  stream_instance?: string;
+  // The last broadcast before this connection, and whether the broadcasts missed since the previous one were replayed.
+  stream_seq?: number;
+  resumed?: boolean;
+}
+
+// Sent when gallery.config.yaml is reloaded; the agents are those of the rescanned roots.
+export interface ConfigDeltaMessage {
+  type: 'config_delta';
+  data: { name: string; path: string }[];
+  agents_added: Omit<Agent, 'status'>[];
+  agents_removed: string[];
+  agents_updated: Omit<Agent, 'status'>[];
+  restart_required: string[];
 }
 
 export interface AgentEvent {
@@ -77,10 +105,32 @@ export interface AgentEvent {
   data: {
     event: string;
     data: any;
+    ts?: number;
+    turn_id?: string | null;
+    span_id?: string | null;
+    parent_span_id?: string | null;
   };
 }
 
-export type ServerMessage = StatusMessage | LogMessage | ConfigMessage | AgentEvent;
+export interface TimelineSpan {
+  span_id: string;
+  parent_span_id: string | null;
+  kind: 'turn' | 'agent' | 'agent_tool' | 'llm' | 'tool';
+  name: string;
+  offset_ms: number;
+  duration_ms: number;
+  complete: boolean;
+}
+
+export interface TurnTimeline {
+  turn_id: string;
+  agent: string;
+  duration_ms: number;
+  spans: TimelineSpan[];
+}
+
+// Broadcasts carry a stream_seq, used to resume the stream after a reconnect.
+export type ServerMessage = (StatusMessage | LogMessage | LogBackfillMessage | ConfigMessage | ConfigDeltaMessage | AgentEvent) & { stream_seq?: number };
 
 
 // WebSocket message types from client